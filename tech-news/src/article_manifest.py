@@ -0,0 +1,164 @@
+import glob
+import json
+import os
+import re
+from typing import Dict, List, Optional
+from file_lock import FileLock
+from state_manager import atomic_write
+
+HEADER_FIELDS = {
+    'source': re.compile(r'^\*\*Source:\*\* (.+?)\s*$', re.MULTILINE),
+    'date': re.compile(r'^\*\*Date:\*\* (.+?)\s*$', re.MULTILINE),
+    'url': re.compile(r'^\*\*URL:\*\* (.+?)\s*$', re.MULTILINE)
+}
+BODY_SEPARATOR = b'\n---\n'
+
+# Article headers are a handful of lines; anything longer has no separator
+MAX_HEADER_BYTES = 4096
+
+def parse_article_header(filepath) -> Dict:
+    """Read just the header of an article file and locate its body"""
+    with open(filepath, 'rb') as f:
+        head = f.read(MAX_HEADER_BYTES)
+    
+    separator = head.find(BODY_SEPARATOR)
+    body_offset = separator + len(BODY_SEPARATOR) if separator >= 0 else 0
+    header = head[:separator if separator >= 0 else len(head)].decode('utf-8', errors='replace')
+    
+    title_match = re.search(r'^# (.+?)\s*$', header, re.MULTILINE)
+    entry = {
+        'filename': os.path.basename(filepath),
+        'title': title_match.group(1) if title_match else "Unknown Title",
+        'body_offset': body_offset
+    }
+    for field, pattern in HEADER_FIELDS.items():
+        match = pattern.search(header)
+        entry[field] = match.group(1) if match else ""
+    return entry
+
+class ArticleManifest:
+    """Append-only JSONL index of fetched articles keyed by filename and URL
+
+    The fetcher appends an entry for every article it writes, including the
+    byte offset where the body starts, so runs can select candidates and
+    load articles without listing or re-parsing the articles directory.
+    """
+    
+    def __init__(self, state_dir, articles_dir):
+        os.makedirs(state_dir, exist_ok=True)
+        self.manifest_file = os.path.join(state_dir, 'article_manifest.jsonl')
+        self.articles_dir = articles_dir
+        self.lock = FileLock(os.path.join(state_dir, 'manifest.lock'))
+        self.entries = None
+        self.by_url = {}
+        self.read_offset = 0
+    
+    def _ensure_loaded(self):
+        if self.entries is None:
+            self.refresh()
+    
+    @staticmethod
+    def _index(entry, entries, by_url):
+        entries[entry['filename']] = entry
+        if entry.get('url'):
+            by_url[entry['url']] = entry
+    
+    def refresh(self):
+        """Pick up entries appended by other processes since the last read
+
+        Loading and refreshing hold the lock, like writes, so concurrent
+        threads never see a half-read manifest; the first load is built
+        aside and published whole.
+        """
+        with self.lock:
+            if self.entries is None and not os.path.exists(self.manifest_file):
+                self.rebuild()
+                return
+            if not os.path.exists(self.manifest_file):
+                return
+            
+            entries, by_url = (self.entries, self.by_url) if self.entries is not None else ({}, {})
+            with open(self.manifest_file, 'rb') as f:
+                f.seek(self.read_offset)
+                for line in f:
+                    # A partially written trailing line is picked up on the next refresh
+                    if not line.endswith(b'\n'):
+                        break
+                    self.read_offset += len(line)
+                    try:
+                        self._index(json.loads(line), entries, by_url)
+                    except json.JSONDecodeError:
+                        continue
+            self.by_url = by_url
+            self.entries = entries
+    
+    def rebuild(self):
+        """Regenerate the manifest from the article files on disk"""
+        with self.lock:
+            entries, by_url = {}, {}
+            for filepath in sorted(glob.glob(os.path.join(self.articles_dir, '*.md'))):
+                try:
+                    self._index(parse_article_header(filepath), entries, by_url)
+                except OSError as e:
+                    print(f"Error indexing {filepath}: {e}")
+            
+            lines = ''.join(json.dumps(entry) + '\n' for entry in entries.values())
+            atomic_write(self.manifest_file, lambda f: f.write(lines))
+            self.read_offset = os.path.getsize(self.manifest_file)
+            self.by_url = by_url
+            self.entries = entries
+        return len(entries)
+    
+    def add(self, filename, title, source, date, url, body_offset):
+        """Record an article the fetcher has just written"""
+        self._ensure_loaded()
+        entry = {
+            'filename': filename,
+            'title': title,
+            'source': source,
+            'date': date,
+            'url': url,
+            'body_offset': body_offset
+        }
+        
+        # Refetching an unchanged article must not grow the manifest
+        if self.entries.get(filename) == entry:
+            return
+        
+        with self.lock:
+            self.refresh()
+            with open(self.manifest_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            self.refresh()
+    
+    def get(self, filename) -> Optional[Dict]:
+        self._ensure_loaded()
+        return self.entries.get(filename)
+    
+    def get_by_url(self, url) -> Optional[Dict]:
+        self._ensure_loaded()
+        return self.by_url.get(url)
+    
+    def article_paths(self) -> List[str]:
+        """Paths of all known articles, without touching the files themselves"""
+        self._ensure_loaded()
+        return [os.path.join(self.articles_dir, filename) for filename in sorted(self.entries)]
+    
+    def load_article(self, filepath) -> Optional[Dict]:
+        """Return article metadata plus body, reading only the body bytes from disk"""
+        entry = self.get(os.path.basename(filepath))
+        if entry is None:
+            return None
+        
+        with open(os.path.join(self.articles_dir, entry['filename']), 'rb') as f:
+            f.seek(entry['body_offset'])
+            content = f.read().decode('utf-8').strip()
+        
+        return {
+            'title': entry['title'],
+            'source': entry['source'],
+            'date': entry['date'],
+            'url': entry['url'],
+            'content': content,
+            'filename': entry['filename']
+        }
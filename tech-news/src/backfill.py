@@ -0,0 +1,192 @@
+import json
+import os
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from rate_limiter import RateLimiter
+from state_manager import atomic_write_json
+
+class ArchiveBackfiller:
+    """Page through a Substack's archive and fetch its full post history"""
+    
+    def __init__(self, fetcher, state_dir, max_workers=4, requests_per_second=2.0, page_size=12):
+        self.fetcher = fetcher
+        self.checkpoint_dir = os.path.join(state_dir, 'backfill')
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.rate_limiter = RateLimiter(requests_per_second, 1.0)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        }
+        
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+    
+    def checkpoint_path(self, slug):
+        return os.path.join(self.checkpoint_dir, f'{slug}.json')
+    
+    def load_checkpoint(self, slug):
+        """Load backfill progress for a source, or a fresh checkpoint"""
+        path = self.checkpoint_path(slug)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                data['done_urls'] = set(data.get('done_urls', []))
+                data.setdefault('failed_posts', {})
+                return data
+            except (json.JSONDecodeError, KeyError):
+                pass
+        
+        return {'offset': 0, 'done_urls': set(), 'failed_posts': {}, 'complete': False}
+    
+    def save_checkpoint(self, slug, checkpoint):
+        """Atomically persist backfill progress for a source"""
+        data = {
+            'offset': checkpoint['offset'],
+            'done_urls': sorted(checkpoint['done_urls']),
+            'failed_posts': checkpoint.get('failed_posts', {}),
+            'complete': checkpoint['complete'],
+            'last_updated': datetime.now().isoformat()
+        }
+        
+        atomic_write_json(self.checkpoint_path(slug), data)
+    
+    def fetch_archive_page(self, substack, offset):
+        """Fetch one page of post listings from the Substack archive API"""
+        url = f"{substack['base_url'].rstrip('/')}/api/v1/archive"
+        params = {'sort': 'new', 'offset': offset, 'limit': self.page_size}
+        
+        self.rate_limiter.acquire()
+        response = requests.get(url, params=params, headers=self.headers, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
+    def parse_post_date(self, post):
+        """Parse the publication date of an archive listing entry"""
+        post_date = post.get('post_date')
+        if not post_date:
+            return None
+        try:
+            return datetime.fromisoformat(post_date.replace('Z', '+00:00')).replace(tzinfo=None)
+        except ValueError:
+            return None
+    
+    def backfill_post(self, post, substack):
+        """Fetch and save a single archived post, returning its path"""
+        url = post.get('canonical_url')
+        title = post.get('title')
+        pub_date = self.parse_post_date(post)
+        if not url or not title or not pub_date:
+            return None
+        
+        # Posts already on disk (e.g. from the RSS fetch) don't need refetching
+        if self.fetcher.manifest:
+            known = self.fetcher.manifest.get_by_url(url)
+            if known:
+                return os.path.join(self.fetcher.articles_dir, known['filename'])
+        filename = self.fetcher.format_article_filename(substack['slug'], title, pub_date)
+        filepath = os.path.join(self.fetcher.articles_dir, filename)
+        if os.path.exists(filepath):
+            return filepath
+        
+        self.rate_limiter.acquire()
+        content = self.fetcher.extract_article_content(url)
+        if not content:
+            return None
+        
+        return self.fetcher.write_article(
+            substack['slug'],
+            substack['name'],
+            title,
+            url,
+            pub_date,
+            content
+        )
+    
+    def try_backfill_post(self, post, substack):
+        """backfill_post, with errors reported as a failed post instead of stopping the page"""
+        try:
+            return self.backfill_post(post, substack)
+        except Exception as e:
+            print(f"  Error backfilling {post.get('canonical_url') or post.get('title')}: {e}")
+            return None
+    
+    def process_posts(self, executor, posts, substack, checkpoint, results):
+        """Backfill listing entries concurrently, recording each as done or failed in the checkpoint"""
+        filepaths = executor.map(lambda post: self.try_backfill_post(post, substack), posts)
+        
+        for post, filepath in zip(posts, filepaths):
+            url = post.get('canonical_url')
+            if filepath:
+                checkpoint['done_urls'].add(url)
+                checkpoint['failed_posts'].pop(url, None)
+                results['success'].append({
+                    'substack': substack['name'],
+                    'title': post['title'],
+                    'file': filepath
+                })
+            else:
+                results['failed'].append(url or post.get('title'))
+                # Listing entries missing a URL, title or date can never succeed
+                if url and post.get('title') and self.parse_post_date(post):
+                    checkpoint['failed_posts'][url] = post
+    
+    def backfill_substack(self, substack):
+        """Backfill the full archive of a single Substack, resuming from its checkpoint"""
+        results = {'success': [], 'failed': []}
+        checkpoint = self.load_checkpoint(substack['slug'])
+        
+        if checkpoint['complete']:
+            print(f"  Archive already backfilled for {substack['name']}")
+            return results
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Posts that failed on an earlier run are retried before paging on
+            if checkpoint['failed_posts']:
+                print(f"  Retrying {len(checkpoint['failed_posts'])} previously failed posts")
+                self.process_posts(executor, list(checkpoint['failed_posts'].values()), substack, checkpoint, results)
+                self.save_checkpoint(substack['slug'], checkpoint)
+            
+            while True:
+                try:
+                    posts = self.fetch_archive_page(substack, checkpoint['offset'])
+                except Exception as e:
+                    print(f"  Error fetching archive page at offset {checkpoint['offset']}: {e}")
+                    break
+                
+                if not posts:
+                    # The archive only counts as done once no failed posts are left to retry
+                    checkpoint['complete'] = not checkpoint['failed_posts']
+                    self.save_checkpoint(substack['slug'], checkpoint)
+                    if checkpoint['failed_posts']:
+                        print(f"  {substack['name']}: {len(checkpoint['failed_posts'])} posts failed; "
+                              f"they are retried on the next backfill")
+                    break
+                
+                pending = [post for post in posts if post.get('canonical_url') not in checkpoint['done_urls']
+                           and post.get('canonical_url') not in checkpoint['failed_posts']]
+                self.process_posts(executor, pending, substack, checkpoint, results)
+                
+                # Only advance past a page once every post on it has been attempted;
+                # failed posts stay in the checkpoint for retry
+                checkpoint['offset'] += len(posts)
+                self.save_checkpoint(substack['slug'], checkpoint)
+                print(f"  {substack['name']}: {checkpoint['offset']} archive entries processed")
+        
+        return results
+    
+    def backfill(self, slugs=None):
+        """Backfill all configured Substacks, or only those whose slug is given"""
+        results = {'success': [], 'failed': []}
+        
+        for substack in self.fetcher.substacks:
+            if slugs and substack['slug'] not in slugs:
+                continue
+            
+            print(f"\nBackfilling archive of {substack['name']}...")
+            source_results = self.backfill_substack(substack)
+            results['success'].extend(source_results['success'])
+            if source_results['failed']:
+                results['failed'].append(substack['name'])
+        
+        return results
@@ -0,0 +1,60 @@
+import hashlib
+import math
+import os
+import struct
+
+MAGIC = b'TNBF'
+HEADER = struct.Struct('>4sQII')
+
+class BloomFilter:
+    """Fixed-size Bloom filter answering "definitely new" vs "maybe seen" for filenames"""
+    
+    def __init__(self, capacity=1000000, error_rate=0.01, num_bits=None, num_hashes=None, bits=None):
+        if num_bits is None:
+            num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        if num_hashes is None:
+            num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        
+        self.capacity = capacity
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+    
+    def _positions(self, item):
+        # Double hashing: derive all k positions from two 64-bit hashes
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def update(self, items):
+        for item in items:
+            self.add(item)
+    
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def write(self, f):
+        f.write(HEADER.pack(MAGIC, self.num_bits, self.num_hashes, self.capacity))
+        f.write(self.bits)
+    
+    @classmethod
+    def load(cls, path):
+        """Load a filter saved with write(), or None if missing or unreadable"""
+        if not os.path.exists(path):
+            return None
+        
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+            magic, num_bits, num_hashes, capacity = HEADER.unpack(header)
+            bits = bytearray(f.read())
+        
+        if magic != MAGIC or len(bits) != (num_bits + 7) // 8:
+            return None
+        return cls(capacity, num_bits=num_bits, num_hashes=num_hashes, bits=bits)
@@ -0,0 +1,129 @@
+import re
+from typing import Iterable, List, Optional
+
+# Whole lines that carry no article content on most sites
+GENERIC_LINE_PATTERNS = [
+    r'share (this( post| article)?|on (twitter|x|facebook|linkedin|reddit|email))',
+    r'(copy link|back to top)',
+    r'[\d,.]+k? (likes?|comments?|replies|shares?|restacks?)',
+    r'\[\d+\]',
+    r'↩︎?',
+    # Bare links only when they are share intents or carry campaign tracking; resource links are content
+    r'https?://(www\.)?(twitter\.com|x\.com)/(intent|share)\S*',
+    r'https?://(www\.)?(facebook\.com/shar|linkedin\.com/(share|shareArticle)|reddit\.com/submit)\S*',
+    r'https?://\S*[?&]utm_[a-z]+=\S*',
+    r'(read more|continue reading|skip to (main )?content)',
+    r'sign (in|up)( for (our|the|my) newsletter)?',
+    r'(accept|manage) (all )?cookies',
+]
+
+# Substack's subscribe widgets, share bar, paywall and page footer
+SUBSTACK_LINE_PATTERNS = [
+    r'(subscribe now|upgrade to paid|give a gift subscription)',
+    r'type your email…?\.*',
+    r'thanks for reading .+?! subscribe for free to receive new posts and support (my|our) work\.?',
+    r'.+ is a reader-supported publication\. to receive new posts and support (my|our) work, consider becoming a free or paid subscriber\.?',
+    r'(this post is for paid subscribers|keep reading with a \d+-day free trial|already a paid subscriber\? sign in)',
+    r'(?-i:Share [A-Z][^.!?,:;]{0,60})',
+    r'leave a comment',
+    r'https?://\S+/(subscribe|comments|share)(\?\S*)?',
+    r'https?://(\S+\.)?substack\.com/(app-link|redirect|refer|subscribe|sign-in|share)\S*',
+    r'listen now',
+    r'©\s*\d{4}.*',
+    r'privacy ∙ terms ∙ collection notice',
+    r'(start writing|get the app)',
+    r'substack is the home for great culture',
+]
+
+# Share bar and footer labels that are also ordinary words. Extracted text has
+# one line per HTML element, so an inline link reading "latest" sits on a line
+# of its own between two fragments of its sentence; these only go when they
+# sit next to other page chrome or stand alone as a paragraph.
+CHROME_WORD_PATTERNS = [
+    r'(share|tweet|facebook|linkedin|reddit|email|print)',
+    r'(like|likes|comment|comments|reply|replies|more|top|latest|next|previous)',
+    r'(subscribe|subscribed|restack|restacks|advertisement|sponsored)',
+]
+
+# Like and comment counts render as bare numbers between share bar buttons;
+# elsewhere (e.g. benchmark table cells) a bare number is content
+COUNT_PATTERN = re.compile(r'[\d,.]+[kKmM]?')
+
+# Everything after these lines is the comment section and "more from" lists
+TAIL_MARKERS = [
+    r'discussion about this post',
+    r'ready for more\?',
+]
+
+def compile_rules(patterns: Iterable[str]):
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+
+DEFAULT_LINE_RULES = compile_rules(GENERIC_LINE_PATTERNS + SUBSTACK_LINE_PATTERNS)
+TAIL_RULES = compile_rules(TAIL_MARKERS)
+CHROME_WORD_RULES = compile_rules(CHROME_WORD_PATTERNS)
+
+def line_kind(stripped, line_rules):
+    """'rule' for a line that is always boilerplate, 'word' or 'count' for one that depends on its neighbours"""
+    if not stripped:
+        return None
+    if line_rules.fullmatch(stripped):
+        return 'rule'
+    if CHROME_WORD_RULES.fullmatch(stripped):
+        return 'word'
+    if COUNT_PATTERN.fullmatch(stripped):
+        return 'count'
+    return None
+
+def chrome_runs(lines, nonempty):
+    """Yield the indices of each run of consecutive chrome word and count lines that reads as page chrome"""
+    position = 0
+    while position < len(nonempty):
+        if lines[nonempty[position]][2] not in ('word', 'count'):
+            position += 1
+            continue
+        end = position
+        while end + 1 < len(nonempty) and lines[nonempty[end + 1]][2] in ('word', 'count'):
+            end += 1
+        run = nonempty[position:end + 1]
+        outside = nonempty[max(0, position - 1):position] + nonempty[end + 1:end + 2]
+        words = sum(lines[i][2] == 'word' for i in run)
+        
+        if words:
+            # A share bar is several labels in a row (often the same one twice),
+            # or one next to other chrome
+            touches_rule = any(lines[i][2] == 'rule' for i in outside)
+            alone = ((run[0] == 0 or not lines[run[0] - 1][1])
+                     and (run[-1] == len(lines) - 1 or not lines[run[-1] + 1][1]))
+            is_chrome = words > 1 or touches_rule or alone
+        else:
+            is_chrome = bool(outside) and all(lines[i][2] == 'rule' for i in outside)
+        if is_chrome:
+            yield from run
+        position = end + 1
+
+def clean_article_text(text, extra_patterns: Optional[List[str]] = None) -> str:
+    """Strip share bars, subscribe prompts, footnote link lists and page chrome from extracted text"""
+    line_rules = compile_rules(GENERIC_LINE_PATTERNS + SUBSTACK_LINE_PATTERNS + extra_patterns) if extra_patterns else DEFAULT_LINE_RULES
+    
+    lines = []
+    for line in text.split('\n'):
+        stripped = line.strip()
+        if TAIL_RULES.fullmatch(stripped):
+            break
+        lines.append((line, stripped, line_kind(stripped, line_rules)))
+    
+    nonempty = [i for i, (_, stripped, _) in enumerate(lines) if stripped]
+    chrome = set(chrome_runs(lines, nonempty))
+    
+    kept = []
+    for i, (line, stripped, kind) in enumerate(lines):
+        if not stripped:
+            # Keep paragraph breaks, but never more than one blank line
+            if kept and kept[-1].strip():
+                kept.append('')
+            continue
+        if kind == 'rule' or i in chrome:
+            continue
+        kept.append(line)
+    
+    return '\n'.join(kept).strip()
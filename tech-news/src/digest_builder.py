@@ -1,6 +1,9 @@
 import os
 from datetime import datetime
 import re
+from file_lock import FileLock
+from state_manager import atomic_write
+from structured_summary import SUMMARY_SECTIONS
 
 class DigestBuilder:
     def __init__(self, config, state_manager=None):
@@ -21,15 +24,19 @@ class DigestBuilder:
         
         return sorted(summaries, key=lambda x: parse_date(x['date']), reverse=True)
     
-    def format_article_summary(self, article):
-        """Format a single article summary"""
-        # Clean up the title for display
-        title = article['title']
-        if len(title) > 80:
-            title = title[:77] + "..."
-        
-        # Format the summary with proper structure
-        summary_lines = article['summary'].split('\n')
+    def format_structured_summary(self, structured):
+        """Render a structured summary's tldr and non-empty sections"""
+        formatted_summary = [structured['tldr']] if structured.get('tldr') else []
+        for field, heading, _ in SUMMARY_SECTIONS:
+            items = structured.get(field) or []
+            if items:
+                formatted_summary.append(f"\n**{heading}**")
+                formatted_summary.extend(f"  - {item}" for item in items)
+        return '\n'.join(formatted_summary)
+    
+    def format_markdown_summary(self, summary):
+        """Render a free-form markdown summary, normalizing its headings and bullets"""
+        summary_lines = summary.split('\n')
         formatted_summary = []
         
         for line in summary_lines:
@@ -52,46 +59,78 @@ class DigestBuilder:
                     # Regular text - add bullet point
                     formatted_summary.append(f"  • {line}")
         
-        summary_text = '\n'.join(formatted_summary)
+        return '\n'.join(formatted_summary)
+    
+    def format_article_summary(self, article):
+        """Format a single article summary"""
+        # Clean up the title for display
+        title = article['title']
+        if len(title) > 80:
+            title = title[:77] + "..."
+        
+        # Structured summaries are rendered from their fields; older ones are markdown text
+        if article.get('structured'):
+            summary_text = self.format_structured_summary(article['structured'])
+        else:
+            summary_text = self.format_markdown_summary(article['summary'])
+        
+        # Point near-duplicates at the article whose summary they reuse
+        duplicate_note = ""
+        duplicate = article.get('duplicate_of')
+        if duplicate:
+            duplicate_note = f"\n*Near-duplicate of [{duplicate['title']}]({duplicate['url']}) ({duplicate['source']}); summary reused.*\n"
         
         # Create the formatted entry
         entry = f"""### [{title}]({article['url']})
 **{article['source']}** • {article['date']}
-
+{duplicate_note}
 {summary_text}
 
 ---"""
         
         return entry
     
-    def build_daily_digest(self, summaries, output_dir, is_update=False):
-        """Build or update the daily digest"""
+    def digest_path(self, output_dir, date=None):
+        """Path of today's (or the given day's) digest"""
+        return os.path.join(output_dir, f"{date or datetime.now().strftime('%Y-%m-%d')}-daily-digest.md")
+    
+    def append_article(self, summary, output_dir, date=None):
+        """Add one finished article to today's (or the given day's) digest, creating the digest if needed"""
+        return self.build_daily_digest([summary], output_dir, is_update=True, date=date)
+    
+    def build_daily_digest(self, summaries, output_dir, is_update=False, date=None, rebuild=False):
+        """Build or update the daily digest (rebuild replaces an existing one)"""
         if not summaries:
             return None
         
         # Sort articles chronologically
         sorted_summaries = self.sort_articles_chronologically(summaries)
         
-        # Get today's date for filename
-        today = datetime.now().strftime('%Y-%m-%d')
-        
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
         # Check if digest already exists
-        filename = f"{today}-daily-digest.md"
-        filepath = os.path.join(output_dir, filename)
+        filepath = self.digest_path(output_dir, date)
+        filename = os.path.basename(filepath)
         
-        if is_update and os.path.exists(filepath):
-            # Update existing digest
-            return self.update_existing_digest(filepath, sorted_summaries)
-        else:
-            # Create new digest
-            return self.create_new_digest(filepath, sorted_summaries)
+        # Hold the digest lock so overlapping runs merge their articles instead of
+        # overwriting each other; an existing digest is always updated, even if it
+        # was created by another run after is_update was determined
+        with FileLock(os.path.join(output_dir, f".{filename}.lock")):
+            if os.path.exists(filepath) and not rebuild:
+                # Update existing digest
+                return self.update_existing_digest(filepath, sorted_summaries)
+            else:
+                # Create new digest
+                return self.create_new_digest(filepath, sorted_summaries, date)
+    
+    def build_from_journal(self, journal, output_dir, date=None, rebuild=False):
+        """Build or update a day's digest from the summary journal alone"""
+        return self.build_daily_digest(journal.entries(date), output_dir, date=date, rebuild=rebuild)
     
-    def create_new_digest(self, filepath, sorted_summaries):
+    def create_new_digest(self, filepath, sorted_summaries, date=None):
         """Create a new daily digest"""
-        digest_content = f"""# Daily Tech News Digest - {datetime.now().strftime('%Y-%m-%d')}
+        digest_content = f"""# Daily Tech News Digest - {date or datetime.now().strftime('%Y-%m-%d')}
 
 *Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')}*
 
@@ -116,8 +155,7 @@ Today's digest contains {len(sorted_summaries)} articles from {len(set(s['source
 """
         
         # Save digest
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(digest_content)
+        atomic_write(filepath, lambda f: f.write(digest_content))
         
         return filepath
     
@@ -170,8 +208,7 @@ Today's digest contains {len(sorted_summaries)} articles from {len(set(s['source
                                        f'*Generated on {datetime.now().strftime("%Y-%m-%d %H:%M")}*', 
                                        updated_content)
                 
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(updated_content)
+                atomic_write(filepath, lambda f: f.write(updated_content))
                 
                 print(f"  ✅ Added {len(new_articles)} new articles to existing digest")
             else:
@@ -180,8 +217,7 @@ Today's digest contains {len(sorted_summaries)} articles from {len(set(s['source
                 for article in new_articles:
                     new_articles_text += self.format_article_summary(article) + "\n\n"
                 
-                with open(filepath, 'a', encoding='utf-8') as f:
-                    f.write(new_articles_text)
+                atomic_write(filepath, lambda f: f.write(existing_content + new_articles_text))
                 
                 print(f"  ✅ Appended {len(new_articles)} new articles to digest")
             
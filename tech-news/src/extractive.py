@@ -0,0 +1,135 @@
+import re
+from collections import Counter
+from typing import Callable, List, Tuple
+import numpy as np
+
+# Sentence ends followed by what looks like the start of the next sentence
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])["”’)\]]*\s+(?=["“(\[]?[A-Z0-9])')
+WORD = re.compile(r"[a-z0-9][a-z0-9'+-]*")
+
+# Bounds on the dense matrices: sentences ranked together (longer articles are
+# ranked window by window) and vocabulary columns (the most widespread words)
+MAX_SENTENCES = 1000
+MAX_VOCABULARY = 4096
+
+# Stands in for left-out sentences
+GAP_MARKER = '[...]'
+GAP_SEPARATOR = f'\n\n{GAP_MARKER}\n\n'
+
+STOP_WORDS = frozenset("""
+a about after all also an and any are as at be been but by can could do does for from had has have he her his
+how i if in into is it its just like more most my no not of on one or our out over she so some such than that
+the their them then there these they this to up us was we were what when which who will with would you your
+""".split())
+
+def split_sentences(text) -> List[Tuple[int, str]]:
+    """Split text into (paragraph number, sentence) pairs; lines without punctuation count as sentences"""
+    sentences = []
+    for paragraph, block in enumerate(re.split(r'\n\s*\n', text)):
+        for line in block.split('\n'):
+            for sentence in SENTENCE_BREAK.split(line.strip()):
+                if sentence.strip():
+                    sentences.append((paragraph, sentence.strip()))
+    return sentences
+
+def sentence_vectors(sentences: List[str], max_vocabulary=MAX_VOCABULARY) -> np.ndarray:
+    """L2-normalized float32 TF-IDF rows, one per sentence"""
+    words = [[word for word in WORD.findall(sentence.lower()) if word not in STOP_WORDS and len(word) > 1]
+             for sentence in sentences]
+    
+    # Words in the fewest sentences are the first to go; a word in a single sentence links it to nothing
+    document_frequency = Counter(word for sentence_words in words for word in set(sentence_words))
+    vocabulary = {word: column for column, (word, _) in enumerate(document_frequency.most_common(max_vocabulary))}
+    rows, columns = [], []
+    for row, sentence_words in enumerate(words):
+        for word in sentence_words:
+            if word in vocabulary:
+                rows.append(row)
+                columns.append(vocabulary[word])
+    
+    counts = np.zeros((len(sentences), max(1, len(vocabulary))), dtype=np.float32)
+    np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)), 1.0)
+    
+    # Sublinear term frequency, smoothed inverse document frequency
+    frequency = np.count_nonzero(counts, axis=0)
+    idf = (np.log((1 + len(sentences)) / (1 + frequency)) + 1).astype(np.float32)
+    vectors = np.log1p(counts, out=counts)
+    vectors *= idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.where(norms == 0, 1, norms)
+    return vectors
+
+def textrank(similarity: np.ndarray, damping=0.85, iterations=50, tolerance=1e-6) -> np.ndarray:
+    """PageRank over the sentence similarity graph"""
+    count = similarity.shape[0]
+    weights = similarity.astype(np.float32)
+    np.fill_diagonal(weights, 0)
+    
+    # Sentences sharing no words with any other link to every sentence equally
+    totals = weights.sum(axis=1, keepdims=True)
+    transition = np.where(totals > 0, weights / np.where(totals == 0, 1, totals), np.float32(1.0 / count))
+    
+    scores = np.full(count, 1.0 / count, dtype=np.float32)
+    for _ in range(iterations):
+        updated = np.float32((1 - damping) / count) + np.float32(damping) * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+def rank_sentences(sentences: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """TextRank scores and whether each sentence shares words with any other, at most MAX_SENTENCES at a time"""
+    scores = np.zeros(len(sentences), dtype=np.float32)
+    connected = np.zeros(len(sentences), dtype=bool)
+    for start in range(0, len(sentences), MAX_SENTENCES):
+        window = slice(start, start + MAX_SENTENCES)
+        vectors = sentence_vectors(sentences[window])
+        similarity = vectors @ vectors.T
+        # Scores sum to one within a window; scaling by its size lets windows be compared
+        scores[window] = textrank(similarity) * similarity.shape[0]
+        connected[window] = similarity.sum(axis=1) - similarity.diagonal() > 0
+    return scores, connected
+
+def condense_text(text, budget, measure: Callable[[str], int] = len) -> str:
+    """Keep the most central sentences that fit the budget, in their original order
+
+    measure gives a sentence's size in the budget's unit (characters by
+    default, or a token estimate). Text that already fits is returned as is.
+    """
+    if measure(text) <= budget:
+        return text
+    
+    sentences = split_sentences(text)
+    if len(sentences) < 2:
+        return text
+    
+    # Sentences sharing no words with the rest of the article are asides, never used as filler
+    scores, connected = rank_sentences([sentence for _, sentence in sentences])
+    
+    # Each sentence is charged for a gap marker too, so the result always fits
+    separator = measure(GAP_SEPARATOR)
+    kept, used = set(), 0
+    for index in np.argsort(-scores, kind='stable'):
+        if not connected[index]:
+            continue
+        size = measure(sentences[index][1]) + separator
+        if used + size <= budget:
+            kept.add(int(index))
+            used += size
+    if not kept:
+        return text
+    
+    # Rebuild paragraphs from the kept sentences, marking where text was left out
+    paragraphs, current, last_paragraph, last_index = [], [], None, None
+    for index in sorted(kept):
+        paragraph, sentence = sentences[index]
+        if current and (paragraph != last_paragraph or index != last_index + 1):
+            paragraphs.append(' '.join(current))
+            current = []
+            if index != last_index + 1:
+                paragraphs.append(GAP_MARKER)
+        current.append(sentence)
+        last_paragraph, last_index = paragraph, index
+    if current:
+        paragraphs.append(' '.join(current))
+    return '\n\n'.join(paragraphs)
@@ -10,14 +10,16 @@ import time
 from blog_scraper import BlogScraper
 
 class SubstackFetcher:
-    def __init__(self, config_path):
+    def __init__(self, config_path, manifest=None):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
         self.substacks = self.config.get('substacks', [])
         self.blogs = self.config.get('blogs', [])
         self.settings = self.config['settings']
         self.blog_scraper = BlogScraper(self.config)
-        
+        self.articles_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'articles')
+        self.manifest = manifest
+    
     def fetch_rss_feed(self, rss_url):
         """Fetch and parse RSS feed"""
         try:
@@ -88,42 +90,53 @@ class SubstackFetcher:
         safe_title = self.sanitize_filename(title)
         return f"{substack_slug}-{date_str}-{safe_title}.md"
     
+    def write_article(self, slug, source_name, title, link, pub_date, content):
+        """Write an article to the articles directory and return its path"""
+        filename = self.format_article_filename(slug, title, pub_date)
+        
+        # Create articles directory if it doesn't exist
+        os.makedirs(self.articles_dir, exist_ok=True)
+        
+        filepath = os.path.join(self.articles_dir, filename)
+        
+        # Prepare markdown content
+        date_str = pub_date.strftime('%Y-%m-%d %H:%M')
+        header = f"""# {title}
+
+**Source:** {source_name}  
+**Date:** {date_str}  
+**URL:** {link}  
+
+---
+"""
+        markdown_content = f"""{header}
+{content}
+"""
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(markdown_content)
+        
+        # Index the article so later runs never have to rescan the directory
+        if self.manifest:
+            self.manifest.add(filename, title, source_name, date_str, link, len(header.encode('utf-8')))
+        
+        return filepath
+    
     def save_article(self, article, substack, content):
         """Save article to markdown file"""
         try:
             # Parse publication date
             pub_date = datetime(*article.published_parsed[:6])
             
-            # Create filename
-            filename = self.format_article_filename(
-                substack['slug'], 
-                article.title, 
-                pub_date
+            return self.write_article(
+                substack['slug'],
+                substack['name'],
+                article.title,
+                article.link,
+                pub_date,
+                content
             )
             
-            # Create articles directory if it doesn't exist
-            articles_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'articles')
-            os.makedirs(articles_dir, exist_ok=True)
-            
-            filepath = os.path.join(articles_dir, filename)
-            
-            # Prepare markdown content
-            markdown_content = f"""# {article.title}
-
-**Source:** {substack['name']}  
-**Date:** {pub_date.strftime('%Y-%m-%d %H:%M')}  
-**URL:** {article.link}  
-
----
-
-{content}
-"""
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            
-            return filepath
-            
         except Exception as e:
             print(f"Error saving article: {e}")
             return None
@@ -134,36 +147,15 @@ class SubstackFetcher:
             # Parse publication date
             pub_date = datetime(*article['published_parsed'][:6])
             
-            # Create filename
-            filename = self.format_article_filename(
-                blog['slug'], 
-                article['title'], 
-                pub_date
+            return self.write_article(
+                blog['slug'],
+                blog['name'],
+                article['title'],
+                article['link'],
+                pub_date,
+                article['content']
             )
             
-            # Create articles directory if it doesn't exist
-            articles_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'articles')
-            os.makedirs(articles_dir, exist_ok=True)
-            
-            filepath = os.path.join(articles_dir, filename)
-            
-            # Prepare markdown content
-            markdown_content = f"""# {article['title']}
-
-**Source:** {blog['name']}  
-**Date:** {pub_date.strftime('%Y-%m-%d %H:%M')}  
-**URL:** {article['link']}  
-
----
-
-{article['content']}
-"""
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            
-            return filepath
-            
         except Exception as e:
             print(f"Error saving blog article: {e}")
             return None
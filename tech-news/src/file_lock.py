@@ -0,0 +1,53 @@
+import fcntl
+import os
+import threading
+import time
+
+class FileLock:
+    """Reentrant inter-process lock held with flock on a lock file"""
+    
+    def __init__(self, path, timeout=60):
+        self.path = path
+        self.timeout = timeout
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+    
+    def acquire(self):
+        self.thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                self._acquire_file_lock()
+            except BaseException:
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+    
+    def _acquire_file_lock(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.fd = fd
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.05)
+    
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+        self.thread_lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List
+from file_lock import FileLock
+from state_manager import atomic_write_json
+
+FINGERPRINT_BITS = 64
+
+def simhash(text, shingle_size=3):
+    """Compute a 64-bit SimHash over word shingles of the text"""
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < shingle_size:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+def similarity(a, b):
+    """Fraction of matching bits between two fingerprints"""
+    return 1 - bin(a ^ b).count('1') / FINGERPRINT_BITS
+
+def band_ranges(threshold):
+    """Bit ranges to bucket fingerprints by; any pair at or above the threshold shares at least one band exactly
+
+    A pair within the threshold differs in at most max_distance bits, so
+    with max_distance + 1 bands some band has no differing bit.
+    """
+    max_distance = int((1 - threshold) * FINGERPRINT_BITS + 1e-9)
+    bands = min(FINGERPRINT_BITS, max_distance + 1)
+    bounds = [round(i * FINGERPRINT_BITS / bands) for i in range(bands + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+class FingerprintIndex:
+    """Persistent SimHash index of summarized articles, used to spot near-duplicates
+
+    Only each article's fingerprint and indexing day are kept; the summary
+    to reuse is looked up by filename elsewhere (the summary cache).
+    Lookups only compare fingerprints sharing a band bucket, and entries
+    older than retention_days are dropped on save.
+    """
+    
+    def __init__(self, state_dir, threshold=0.9, min_words=100, retention_days=None):
+        self.index_file = os.path.join(state_dir, 'fingerprints.json')
+        self.lock = FileLock(os.path.join(state_dir, 'state.lock'))
+        self.threshold = threshold
+        self.min_words = min_words
+        self.retention_days = retention_days
+        self.bands = band_ranges(threshold)
+        self.entries = None
+        self.buckets = None
+        self.new_entries = {}
+    
+    def _ensure_loaded(self):
+        if self.entries is not None:
+            return
+        
+        articles = {}
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f:
+                    articles = json.load(f).get('articles', {})
+            except (json.JSONDecodeError, KeyError):
+                articles = {}
+        
+        # Older indexes kept whole summaries per entry; only the fingerprint and day are needed
+        self.entries = {}
+        for filename, entry in articles.items():
+            self.entries[filename] = {
+                'simhash': entry['simhash'],
+                'date': entry.get('date') or entry.get('indexed_at', '')[:10]
+            }
+        
+        self.buckets = [{} for _ in self.bands]
+        for filename, entry in self.entries.items():
+            self._bucket(filename, int(entry['simhash'], 16))
+    
+    def _band_keys(self, fingerprint):
+        return [(fingerprint >> start) & ((1 << (end - start)) - 1) for start, end in self.bands]
+    
+    def _bucket(self, filename, fingerprint):
+        for buckets, key in zip(self.buckets, self._band_keys(fingerprint)):
+            buckets.setdefault(key, set()).add(filename)
+    
+    def fingerprint(self, content):
+        """Return the content's fingerprint, or None if it is too short to compare reliably"""
+        if len(re.findall(r'\w+', content)) < self.min_words:
+            return None
+        return simhash(content)
+    
+    def near_duplicates(self, fingerprint, exclude_filename=None) -> List[Dict]:
+        """Indexed articles at or above the threshold, most similar first"""
+        if fingerprint is None:
+            return []
+        
+        self._ensure_loaded()
+        candidates = set()
+        for buckets, key in zip(self.buckets, self._band_keys(fingerprint)):
+            candidates.update(buckets.get(key, ()))
+        candidates.discard(exclude_filename)
+        
+        matches = []
+        for filename in candidates:
+            score = similarity(fingerprint, int(self.entries[filename]['simhash'], 16))
+            if score >= self.threshold:
+                matches.append(dict(self.entries[filename], filename=filename, similarity=score))
+        return sorted(matches, key=lambda match: (-match['similarity'], match['filename']))
+    
+    def find_near_duplicate(self, fingerprint, exclude_filename=None):
+        """Return the most similar indexed article at or above the threshold"""
+        matches = self.near_duplicates(fingerprint, exclude_filename)
+        return matches[0] if matches else None
+    
+    def matches_any(self, fingerprint, others):
+        """Whether the fingerprint is a near-duplicate of any of the others"""
+        if fingerprint is None:
+            return False
+        return any(other is not None and similarity(fingerprint, other) >= self.threshold for other in others)
+    
+    def add(self, fingerprint, filename):
+        """Index a freshly summarized article"""
+        if fingerprint is None:
+            return
+        
+        self._ensure_loaded()
+        entry = {'simhash': f'{fingerprint:016x}', 'date': datetime.now().strftime('%Y-%m-%d')}
+        self.entries[filename] = entry
+        self.new_entries[filename] = entry
+        self._bucket(filename, fingerprint)
+    
+    def _write(self):
+        atomic_write_json(self.index_file, {
+            'articles': self.entries,
+            'last_updated': datetime.now().isoformat()
+        })
+    
+    def _reload(self):
+        self.entries = None
+        self._ensure_loaded()
+    
+    def _drop_before(self, horizon) -> int:
+        old = [filename for filename, entry in self.entries.items() if entry['date'] < horizon]
+        for filename in old:
+            del self.entries[filename]
+        if old:
+            # Rebuilding is simpler than unbucketing and only happens when something aged out
+            self.buckets = [{} for _ in self.bands]
+            for filename, entry in self.entries.items():
+                self._bucket(filename, int(entry['simhash'], 16))
+        return len(old)
+    
+    def retention_horizon(self):
+        if self.retention_days is None:
+            return None
+        return (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+    
+    def save(self):
+        """Merge newly indexed articles into the on-disk index, dropping entries past retention"""
+        if not self.new_entries:
+            return
+        
+        with self.lock:
+            self._reload()
+            self.entries.update(self.new_entries)
+            for filename, entry in self.new_entries.items():
+                self._bucket(filename, int(entry['simhash'], 16))
+            horizon = self.retention_horizon()
+            if horizon:
+                self._drop_before(horizon)
+            self._write()
+            self.new_entries = {}
+    
+    def prune(self, horizon) -> int:
+        """Drop entries indexed before the horizon day, returning how many went"""
+        with self.lock:
+            self._reload()
+            removed = self._drop_before(horizon)
+            if removed:
+                self._write()
+        return removed
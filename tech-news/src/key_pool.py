@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Dict, List, Optional
+from rate_limiter import RateLimiter
+
+class KeyPool:
+    """API keys (or projects) with their own per-minute quotas, sharing one run's requests
+
+    Each request goes to the key with the most headroom left in its
+    requests- and tokens-per-minute buckets, the least recently used one
+    among equals (so keys without limits take turns). A key that gets throttled
+    leaves the rotation until its quota window resets (or the server's
+    retry hint), while the other keys keep serving.
+    """
+    
+    def __init__(self, keys: List[Dict], requests_per_minute=None, tokens_per_minute=None, window=60.0):
+        if not keys:
+            raise ValueError("A key pool needs at least one API key")
+        self.window = window
+        self.keys = []
+        for i, key in enumerate(keys):
+            if isinstance(key, str):
+                key = {'api_key': key}
+            if not key.get('api_key'):
+                raise ValueError(f"API key pool entry {key.get('name', i + 1)} has no api_key")
+            rpm = key.get('requests_per_minute', requests_per_minute)
+            tpm = key.get('tokens_per_minute', tokens_per_minute)
+            self.keys.append({
+                'name': key.get('name', f'key-{i + 1}'),
+                'api_key': key['api_key'],
+                'requests': RateLimiter(rpm, window) if rpm else None,
+                'tokens': RateLimiter(tpm, window) if tpm else None,
+                'throttled_until': 0.0,
+                'last_used': 0,
+                'stats': {'requests': 0, 'tokens': 0, 'throttled': 0}
+            })
+        self.uses = 0
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config, requests_per_minute=None, tokens_per_minute=None) -> Optional['KeyPool']:
+        """Build the pool from api_keys in the backend's section of gemini.yaml, or None if there is none
+
+        Keys without their own limits get the summarization section's
+        requests_per_minute and tokens_per_minute, which are per key here.
+        """
+        llm_config = config.get('llm') or {}
+        if llm_config.get('backend', 'gemini') == 'gemini':
+            keys = (config.get('gemini') or {}).get('api_keys')
+        else:
+            keys = llm_config.get('api_keys')
+        if not keys:
+            return None
+        return cls(keys, requests_per_minute, tokens_per_minute)
+    
+    @staticmethod
+    def headroom(key) -> float:
+        return min(limiter.headroom() if limiter else 1.0 for limiter in (key['requests'], key['tokens']))
+    
+    @staticmethod
+    def wait_time(key, tokens) -> float:
+        waits = [0.0]
+        if key['requests']:
+            waits.append(key['requests'].wait_time(1))
+        if key['tokens'] and tokens:
+            waits.append(key['tokens'].wait_time(tokens))
+        return max(waits)
+    
+    def acquire(self, tokens=0) -> Dict:
+        """Block until some key in rotation has quota for one request of this many tokens, and claim it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                ready = [key for key in self.keys if key['throttled_until'] <= now]
+                for key in sorted(ready, key=lambda key: (-self.headroom(key), key['last_used'])):
+                    if self.wait_time(key, tokens) == 0:
+                        if key['requests']:
+                            key['requests'].try_acquire(1)
+                        if key['tokens'] and tokens:
+                            key['tokens'].try_acquire(tokens)
+                        self.uses += 1
+                        key['last_used'] = self.uses
+                        key['stats']['requests'] += 1
+                        key['stats']['tokens'] += tokens
+                        return key
+                wait = min(max(key['throttled_until'] - now, self.wait_time(key, tokens)) for key in self.keys)
+            time.sleep(max(wait, 0.01))
+    
+    def throttle(self, key, retry_after=None):
+        """Take a key out of rotation until its quota window resets, or for the server's retry hint"""
+        delay = self.window if retry_after is None else retry_after
+        with self.lock:
+            key['throttled_until'] = max(key['throttled_until'], time.monotonic() + delay)
+            key['stats']['throttled'] += 1
+        print(f"    🔑 {key['name']} throttled; out of rotation for {delay:.0f}s")
+    
+    def available(self) -> bool:
+        """Whether any key is in rotation right now"""
+        with self.lock:
+            now = time.monotonic()
+            return any(key['throttled_until'] <= now for key in self.keys)
+    
+    def stats(self) -> Dict[str, Dict]:
+        """Requests, estimated tokens and throttles per key name"""
+        with self.lock:
+            return {key['name']: dict(key['stats']) for key in self.keys}
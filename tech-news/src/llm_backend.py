@@ -0,0 +1,221 @@
+import hashlib
+import inspect
+import json
+import re
+import threading
+import time
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+import requests
+
+def inline_system(system, prompt):
+    """Prepend a system instruction for backends that cannot send it separately"""
+    return f"{system}\n\n{prompt}" if system else prompt
+
+def accepts_system_instruction(model_class):
+    """Whether this google.generativeai version lets models carry a system instruction"""
+    try:
+        return 'system_instruction' in inspect.signature(model_class).parameters
+    except (TypeError, ValueError):
+        return False
+
+def accepts_generation_field(config_class, field):
+    """Whether this google.generativeai version's GenerationConfig has a field (e.g. response_mime_type)"""
+    try:
+        parameters = inspect.signature(config_class).parameters
+    except (TypeError, ValueError):
+        return False
+    return field in parameters or any(p.kind == inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+
+class GeminiBackend:
+    """Google Gemini models via google.generativeai"""
+    
+    def __init__(self, api_key, model_name, dedicated_client=False):
+        # genai.configure sets one process-wide key; pooled keys each need their own client
+        self.client = None
+        if dedicated_client:
+            self.client = glm.GenerativeServiceClient(client_options={'api_key': api_key})
+        else:
+            genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = self._bind(genai.GenerativeModel(model_name))
+        
+        # One model per distinct system instruction, reused for every call in the run
+        self.supports_system_instruction = accepts_system_instruction(genai.GenerativeModel)
+        # Older SDKs have no JSON mode; the instructions still ask for JSON
+        self.supports_json_output = accepts_generation_field(genai.types.GenerationConfig, 'response_mime_type')
+        self.system_models = {}
+        self.lock = threading.Lock()
+    
+    def _model_for(self, system):
+        with self.lock:
+            if system not in self.system_models:
+                self.system_models[system] = self._bind(genai.GenerativeModel(self.model_name, system_instruction=system))
+            return self.system_models[system]
+    
+    def _bind(self, model):
+        # Relies on google-generativeai 0.3.2, where GenerativeModel keeps its client
+        # in the private _client attribute and only creates the default (configured)
+        # one lazily when it is still None
+        if self.client is not None:
+            if not hasattr(model, '_client'):
+                raise RuntimeError(
+                    "This google-generativeai version does not expose GenerativeModel._client, "
+                    "so pooled API keys cannot get their own clients; pin google-generativeai==0.3.2 "
+                    "or configure a single api_key"
+                )
+            model._client = self.client
+        return model
+    
+    def generate(self, prompt, stream=False, system=None, max_output_tokens=None, temperature=None,
+                 json_output=False) -> str:
+        model = self.model
+        if system and self.supports_system_instruction:
+            model = self._model_for(system)
+        else:
+            prompt = inline_system(system, prompt)
+        
+        generation_config = {}
+        if max_output_tokens:
+            generation_config['max_output_tokens'] = max_output_tokens
+        if temperature is not None:
+            generation_config['temperature'] = temperature
+        if json_output and self.supports_json_output:
+            generation_config['response_mime_type'] = 'application/json'
+        kwargs = {'generation_config': generation_config} if generation_config else {}
+        if stream:
+            return ''.join(chunk.text for chunk in model.generate_content(prompt, stream=True, **kwargs)).strip()
+        return model.generate_content(prompt, **kwargs).text.strip()
+    
+    def count_tokens(self, text) -> int:
+        return self.model.count_tokens(text).total_tokens
+
+class OpenAICompatibleBackend:
+    """Any server speaking the OpenAI chat completions API, e.g. a local llama.cpp or vLLM server"""
+    
+    # A fixed leading system message lets the server reuse its cached prefix across requests
+    supports_system_instruction = True
+    
+    # There is no standard token counting endpoint, so token estimates use the default ratio
+    count_tokens = None
+    
+    def __init__(self, base_url, model_name, api_key=None, timeout=600):
+        self.base_url = base_url.rstrip('/')
+        self.model_name = model_name
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+        if api_key:
+            self.headers['Authorization'] = f'Bearer {api_key}'
+    
+    def generate(self, prompt, stream=False, system=None, max_output_tokens=None, temperature=None,
+                 json_output=False) -> str:
+        messages = [{'role': 'user', 'content': prompt}]
+        if system:
+            messages.insert(0, {'role': 'system', 'content': system})
+        
+        body = {
+            'model': self.model_name,
+            'messages': messages,
+            'stream': stream
+        }
+        if max_output_tokens:
+            body['max_tokens'] = max_output_tokens
+        if temperature is not None:
+            body['temperature'] = temperature
+        if json_output:
+            body['response_format'] = {'type': 'json_object'}
+        
+        response = requests.post(
+            f'{self.base_url}/chat/completions',
+            headers=self.headers,
+            json=body,
+            timeout=self.timeout,
+            stream=stream
+        )
+        # A streamed response holds its connection until it is read to the end or closed
+        try:
+            response.raise_for_status()
+            
+            if not stream:
+                return response.json()['choices'][0]['message']['content'].strip()
+            
+            # Server-sent events: one JSON delta per "data:" line until [DONE]
+            parts = []
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                delta = json.loads(data)['choices'][0].get('delta', {})
+                parts.append(delta.get('content') or '')
+            return ''.join(parts).strip()
+        finally:
+            response.close()
+
+
+class StubBackend:
+    """Deterministic offline backend for tests, dry runs and load tests"""
+    
+    supports_system_instruction = False
+    
+    def __init__(self, model_name='stub', latency=0.0):
+        self.model_name = model_name
+        self.latency = latency
+        self.calls = 0
+    
+    def generate(self, prompt, stream=False, system=None, max_output_tokens=None, temperature=None,
+                 json_output=False) -> str:
+        prompt = inline_system(system, prompt)
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        
+        # Batched prompts expect one analysis per numbered article
+        titles = re.findall(r'^=== Article (\d+) ===\nArticle Title: (.+)$', prompt, re.MULTILINE)
+        if titles:
+            return json.dumps({number: self._summary(title, prompt, json_output) for number, title in titles})
+        
+        title = re.search(r'^Article Title: (.+)$', prompt, re.MULTILINE)
+        summary = self._summary(title.group(1) if title else 'Untitled', prompt, json_output)
+        return json.dumps(summary) if json_output else summary
+    
+    def _summary(self, title, prompt, json_output=False):
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+        if json_output:
+            return {'tldr': f"Stub analysis of {title} ({digest})", 'insights': [f"Stub insight about {title}"]}
+        return f"## Key Technical Insights & Findings\n- Stub analysis of {title} ({digest})"
+    
+    def count_tokens(self, text) -> int:
+        return max(1, len(text) // 4)
+
+def configured_key(section):
+    """The section's api_key, or with only an api_keys pool configured, its first key (for one-off calls like synthesis)"""
+    if section.get('api_key') or not section.get('api_keys'):
+        return section.get('api_key')
+    first = section['api_keys'][0]
+    return first['api_key'] if isinstance(first, dict) else first
+
+def create_backend(config, model=None, api_key=None):
+    """Build the LLM backend selected by the llm section of gemini.yaml (Gemini by default)
+
+    model, if given, overrides the configured model name (used by routing rules);
+    api_key, if given, overrides the configured key (used by the key pool).
+    """
+    llm_config = config.get('llm') or {}
+    backend = llm_config.get('backend', 'gemini')
+    
+    if backend == 'gemini':
+        if api_key:
+            return GeminiBackend(api_key, model or config['gemini']['model'], dedicated_client=True)
+        return GeminiBackend(configured_key(config['gemini']), model or config['gemini']['model'])
+    if backend == 'openai_compatible':
+        return OpenAICompatibleBackend(
+            llm_config.get('base_url', 'http://localhost:8080/v1'),
+            model or llm_config.get('model', 'local'),
+            api_key=api_key or configured_key(llm_config),
+            timeout=llm_config.get('timeout', 600)
+        )
+    if backend == 'stub':
+        return StubBackend(model or llm_config.get('model', 'stub'), latency=llm_config.get('latency', 0.0))
+    raise ValueError(f"Unknown LLM backend: {backend}")
@@ -6,12 +6,19 @@ Tech News Fetcher - Fetch latest articles from AI/tech Substacks and create dail
 import os
 import sys
 import argparse
-import glob
+import yaml
+from datetime import datetime
 from fetcher import SubstackFetcher
+from article_manifest import ArticleManifest
+from backfill import ArchiveBackfiller
 from summarizer import GeminiSummarizer
 from digest_builder import DigestBuilder
-from state_manager import StateManager
+from state_manager import StateManager, RetryPolicy
 from synthesis_analyzer import SynthesisAnalyzer
+from telemetry import RunTelemetry
+from run_budget import RunBudget, parse_deadline, prioritize, source_priorities
+from summary_journal import SummaryJournal
+from fingerprint_index import FingerprintIndex
 
 def main():
     parser = argparse.ArgumentParser(description='Fetch and summarize tech news from Substacks')
@@ -19,8 +26,35 @@ def main():
                        help='Create daily digest after fetching articles')
     parser.add_argument('--synthesize', action='store_true',
                        help='Analyze all articles and create synthesis post')
+    parser.add_argument('--backfill', nargs='*', metavar='SLUG',
+                       help='Fetch the full archive of all (or the given) Substacks, resuming from the last checkpoint')
+    parser.add_argument('--compact-state', action='store_true',
+                       help='Drop processed-article history older than settings.retention_days and rebuild the Bloom prefilter')
+    parser.add_argument('--rebuild-manifest', action='store_true',
+                       help='Re-index the articles directory (e.g. after adding or deleting article files by hand)')
+    parser.add_argument('--dead-letters', action='store_true',
+                       help='List articles that exhausted their summarization retries')
+    parser.add_argument('--requeue-dead-letters', nargs='*', metavar='FILENAME',
+                       help='Give all (or the given) dead-lettered articles a fresh set of retries')
+    parser.add_argument('--filtered', action='store_true',
+                       help='List articles the relevance filter kept from the model')
+    parser.add_argument('--unfilter', nargs='*', metavar='FILENAME',
+                       help='Queue all (or the given) filtered articles for summarization again')
+    parser.add_argument('--rebuild-digest', nargs='?', const=datetime.now().strftime('%Y-%m-%d'), metavar='YYYY-MM-DD',
+                       help="Rewrite today's (or the given day's) digest from the summary journal alone")
+    parser.add_argument('--deadline', metavar='MINUTES|HH:MM',
+                       help='With --summarize, stop starting model calls after this many minutes (or at this time); the rest stays queued')
+    parser.add_argument('--token-budget', type=int, metavar='TOKENS',
+                       help='With --summarize, stop starting model calls once about this many tokens are spent; the rest stays queued')
     args = parser.parse_args()
     
+    deadline = None
+    if args.deadline:
+        try:
+            deadline = parse_deadline(args.deadline)
+        except ValueError as e:
+            parser.error(str(e))
+    
     # Get the directory of this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     substacks_config = os.path.join(script_dir, '..', 'config', 'substacks.yaml')
@@ -36,20 +70,112 @@ def main():
         print(f"Error: Gemini config file not found at {gemini_config}")
         sys.exit(1)
     
+    with open(substacks_config, 'r') as f:
+        sources_config = yaml.safe_load(f)
+    settings = sources_config.get('settings', {})
+    
     # Initialize state manager
-    state_manager = StateManager(state_dir)
+    state_manager = StateManager(
+        state_dir,
+        backend=settings.get('state_backend', 'json'),
+        claim_ttl=settings.get('claim_ttl_seconds', 1800),
+        retention_days=settings.get('retention_days'),
+        bloom_prefilter=settings.get('bloom_prefilter', False),
+        bloom_capacity=settings.get('bloom_capacity', 1000000),
+        retry_policy=RetryPolicy(
+            base_delay=settings.get('retry_base_delay_hours', 1) * 3600,
+            max_delay=settings.get('retry_max_delay_hours', 48) * 3600,
+            max_attempts=settings.get('retry_max_attempts', 6)
+        )
+    )
+    
+    manifest = ArticleManifest(state_dir, os.path.join(script_dir, '..', 'articles'))
+    
+    # Every finished summary is journaled at once, so an interrupted run loses no paid work;
+    # the journal and digest stay on the run's start date even past midnight
+    run_date = datetime.now().strftime('%Y-%m-%d')
+    journal = SummaryJournal(
+        state_dir,
+        fsync_every=settings.get('journal_fsync_every', 10),
+        retention_days=settings.get('journal_retention_days', 14),
+        date=run_date
+    )
+    digests_dir = os.path.join(script_dir, '..', 'digests')
+    
+    if args.rebuild_manifest:
+        count = manifest.rebuild()
+        print(f"🗂️  Rebuilt article manifest with {count} articles")
+        return
+    
+    if args.compact_state:
+        stats = state_manager.compact_state()
+        if stats['horizon']:
+            print(f"🗜️  Compacted state: removed {stats['removed']} entries processed before {stats['horizon']}, "
+                  f"{stats['remaining']} remain")
+            pruned = FingerprintIndex(state_manager.state_dir).prune(stats['horizon'])
+            if pruned:
+                print(f"🗜️  Dropped {pruned} near-duplicate fingerprints indexed before {stats['horizon']}")
+        else:
+            print(f"🗜️  No retention_days configured; kept all {stats['remaining']} processed entries")
+        return
+    
+    if args.dead_letters:
+        dead_letters = state_manager.get_dead_letter_articles()
+        print(f"☠️  {len(dead_letters)} dead-lettered articles")
+        for filename, record in sorted(dead_letters.items()):
+            last_failed = datetime.fromtimestamp(record['last_failed']).strftime('%Y-%m-%d %H:%M')
+            print(f"  {filename}: {record['attempts']} attempts, last failed {last_failed} ({record['last_error'] or 'unknown error'})")
+        return
+    
+    if args.requeue_dead_letters is not None:
+        requeued = state_manager.requeue_dead_letter_articles(args.requeue_dead_letters or None)
+        print(f"🔁 Requeued {len(requeued)} dead-lettered articles")
+        return
+    
+    if args.filtered:
+        filtered = state_manager.get_filtered_articles()
+        print(f"🚫 {len(filtered)} filtered articles")
+        for filename, record in sorted(filtered.items()):
+            print(f"  {filename}: relevance {record['score']:.1f} (filtered {record['filtered_at'][:10]})")
+        return
+    
+    if args.unfilter is not None:
+        unfiltered = state_manager.unfilter_articles(args.unfilter or None)
+        print(f"🔁 Queued {len(unfiltered)} filtered articles for summarization")
+        return
+    
+    if args.rebuild_digest:
+        entries = journal.entries(args.rebuild_digest)
+        if not entries:
+            print(f"No journaled summaries for {args.rebuild_digest}")
+            return
+        digest_path = DigestBuilder({}).build_from_journal(journal, digests_dir, date=args.rebuild_digest, rebuild=True)
+        print(f"📄 Rebuilt digest with {len(entries)} articles from the journal: {digest_path}")
+        return
     
     print("🚀 Starting Tech News Fetcher...")
     print("=" * 50)
     
+    # Model calls from summarization and synthesis are reported together
+    telemetry = RunTelemetry()
+    
     try:
         # Only fetch articles if not doing synthesis only
         if not args.synthesize:
             # Initialize fetcher
-            fetcher = SubstackFetcher(substacks_config)
+            fetcher = SubstackFetcher(substacks_config, manifest)
             
             # Fetch articles
-            results = fetcher.fetch_latest_articles()
+            if args.backfill is not None:
+                backfiller = ArchiveBackfiller(
+                    fetcher,
+                    state_dir,
+                    max_workers=fetcher.settings.get('backfill_workers', 4),
+                    requests_per_second=fetcher.settings.get('backfill_requests_per_second', 2.0)
+                )
+                results = backfiller.backfill(args.backfill)
+            else:
+                results = fetcher.fetch_latest_articles()
         
         # Print fetch summary only if we fetched articles
         if not args.synthesize:
@@ -75,23 +201,40 @@ def main():
             print("🤖 CREATING DAILY DIGEST")
             print("=" * 50)
             
-            # Get all article files
-            articles_dir = os.path.join(script_dir, '..', 'articles')
-            all_article_files = glob.glob(os.path.join(articles_dir, '*.md'))
+            # Get all article files from the manifest instead of scanning the directory
+            manifest.refresh()
+            all_article_files = manifest.article_paths()
             
             if not all_article_files:
                 print("No articles found to summarize")
                 return
             
+            # Summaries an interrupted run paid for but never recorded are taken from the journal
+            recovered = journal.recover(state_manager.get_processed_articles())
+            if recovered:
+                recovered_files = [summary['filename'] for summary in recovered]
+                with state_manager.batch():
+                    state_manager.add_processed_articles(recovered_files)
+                    state_manager.clear_failed_articles(recovered_files)
+                print(f"♻️  Recovered {len(recovered)} summaries from the journal of an interrupted run")
+            
             # Get articles that need processing (new + failed retries)
             articles_to_process = state_manager.get_articles_to_process(all_article_files)
+            if state_manager.skipped_compacted:
+                print(f"🗜️  Skipped {state_manager.skipped_compacted} articles published and fetched before compacted history")
             
-            if not articles_to_process:
+            if not articles_to_process and not recovered:
                 print("No new articles to process (all articles already summarized)")
                 return
             
             print(f"Found {len(articles_to_process)} articles to process ({len(all_article_files)} total articles)")
             
+            # Newest articles and highest-priority sources first, so a budget cut drops the least useful work
+            articles_to_process = prioritize(articles_to_process, source_priorities(sources_config), manifest)
+            budget = None
+            if deadline is not None or args.token_budget is not None:
+                budget = RunBudget(deadline=deadline, token_budget=args.token_budget)
+            
             # Check if digest already exists for today
             digest_info = state_manager.get_digest_info()
             is_update = digest_info['exists']
@@ -102,18 +245,65 @@ def main():
                 print("📄 Creating new daily digest")
             
             # Initialize summarizer with state manager
-            summarizer = GeminiSummarizer(gemini_config, state_manager)
+            summarizer = GeminiSummarizer(gemini_config, state_manager, manifest, telemetry, budget)
+            digest_builder = DigestBuilder(summarizer.summary_config, state_manager)
             
-            # Summarize articles
-            summaries = summarizer.summarize_articles(articles_to_process)
+            # When streaming, each article also lands in the digest as soon as it
+            # is summarized, so an interrupted run still leaves a usable partial digest
+            def on_summary(summary):
+                journal.append(summary)
+                if summarizer.stream:
+                    digest_builder.append_article(summary, digests_dir, date=run_date)
             
-            if summaries:
-                print(f"✅ Successfully summarized {len(summaries)} articles")
+            # Lease articles a batch at a time so overlapping runs and extra
+            # worker processes split the backlog instead of duplicating work
+            claim_batch_size = settings.get('claim_batch_size', 10)
+            summaries = []
+            attempted = set()
+            while not (budget and budget.exhausted):
+                remaining = [f for f in articles_to_process if f not in attempted]
+                batch = state_manager.claim_articles(remaining, limit=claim_batch_size)
+                if not batch:
+                    break
                 
-                # Build or update digest
-                digest_builder = DigestBuilder(summarizer.summary_config, state_manager)
-                digests_dir = os.path.join(script_dir, '..', 'digests')
-                digest_path = digest_builder.build_daily_digest(summaries, digests_dir, is_update)
+                attempted.update(batch)
+                try:
+                    # Summarize articles
+                    summaries.extend(summarizer.summarize_articles(batch, on_summary))
+                finally:
+                    state_manager.release_claims(batch)
+            
+            if budget and budget.exhausted:
+                left = state_manager.get_articles_to_process(articles_to_process)
+                print(f"⏳ Run budget exhausted ({budget.reason()}); {len(left)} articles left queued for the next run")
+            
+            if summarizer.filtered_count:
+                print(f"🚫 Relevance filter skipped {summarizer.filtered_count} off-topic articles")
+            
+            if summaries or recovered:
+                if summaries:
+                    print(f"✅ Successfully summarized {len(summaries)} articles")
+                if summarizer.summary_cache:
+                    cache_stats = summarizer.summary_cache.stats()
+                    print(f"💾 Summary cache: {cache_stats['hits']}/{cache_stats['lookups']} hits "
+                          f"({cache_stats['hit_rate']:.0%})")
+                if summarizer.key_pool:
+                    for name, stats in summarizer.key_pool.stats().items():
+                        print(f"🔑 {name}: {stats['requests']} requests, ~{stats['tokens']:,} input tokens, "
+                              f"throttled {stats['throttled']}x")
+                if summarizer.tokens_saved:
+                    print(f"🧹 Boilerplate stripping saved ~{summarizer.tokens_saved:,} input tokens")
+                if summarizer.condensed_count:
+                    print(f"✂️  Condensed {summarizer.condensed_count} long articles, saving ~{summarizer.tokens_condensed:,} input tokens")
+                
+                # Build or update digest from the run's journal (already written article by article when streaming)
+                journal.sync()
+                if summarizer.stream and not recovered:
+                    digest_path = digest_builder.digest_path(digests_dir, run_date)
+                    if not os.path.exists(digest_path):
+                        digest_path = None
+                else:
+                    digest_path = digest_builder.build_from_journal(journal, digests_dir, date=run_date)
                 
                 if digest_path:
                     print(f"📄 Daily digest saved to: {digest_path}")
@@ -135,7 +325,7 @@ def main():
                 return
             
             # Initialize synthesis analyzer
-            analyzer = SynthesisAnalyzer(gemini_config, state_manager)
+            analyzer = SynthesisAnalyzer(gemini_config, state_manager, telemetry)
             
             # Analyze all articles
             articles = analyzer.analyze_all_articles()
@@ -162,6 +352,16 @@ def main():
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
+    finally:
+        journal.close()
+        report_path = telemetry.write(state_dir, retention_days=settings.get('run_report_retention_days', 30))
+        if report_path:
+            totals = telemetry.summary()['totals']
+            print(f"📈 {totals['calls']} model calls ({totals['failures']} failed, {totals['retries']} retries, "
+                  f"{totals['cache_hits']} cache hits), ~{totals['input_tokens']:,} input / "
+                  f"~{totals['output_tokens']:,} output tokens, ${totals['cost_usd']:.4f}, "
+                  f"p95 latency {totals['latency_p95_seconds']:.1f}s")
+            print(f"📈 Run report saved to: {report_path}")
 
 if __name__ == "__main__":
     main()
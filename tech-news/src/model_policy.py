@@ -0,0 +1,164 @@
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+RETRYABLE = 'retryable'
+QUOTA = 'quota'
+FATAL = 'fatal'
+
+RETRYABLE_STATUS_CODES = {408, 500, 502, 503, 504}
+
+# Exception class names for errors raised without an HTTP status (requests, grpc transports)
+RETRYABLE_ERROR_NAMES = {
+    'ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout',
+    'ServiceUnavailable', 'InternalServerError', 'DeadlineExceeded', 'BadGateway', 'GatewayTimeout'
+}
+QUOTA_ERROR_NAMES = {'ResourceExhausted', 'TooManyRequests'}
+
+# Servers phrase retry hints differently: "retry in 12.5s", "retry_delay { seconds: 30 }"
+RETRY_HINT_PATTERNS = [
+    re.compile(r'retry in (\d+(?:\.\d+)?)\s*s', re.IGNORECASE),
+    re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)', re.IGNORECASE)
+]
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model that is currently being throttled"""
+
+class QuotaExhaustedError(Exception):
+    """Raised when a call is still over quota after its retries, which says nothing about the request itself"""
+
+def status_code(error):
+    """HTTP status of an API error, from google.api_core or requests exceptions"""
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+def classify_error(error) -> str:
+    """Classify a model call failure as retryable, quota or fatal"""
+    if isinstance(error, CircuitOpenError):
+        return FATAL
+    
+    code = status_code(error)
+    if code == 429:
+        return QUOTA
+    if code in RETRYABLE_STATUS_CODES:
+        return RETRYABLE
+    if code is not None:
+        return FATAL
+    
+    # Network trouble without a status (dropped connections, timeouts)
+    name = type(error).__name__
+    if isinstance(error, (ConnectionError, TimeoutError)) or name in RETRYABLE_ERROR_NAMES:
+        return RETRYABLE
+    if name in QUOTA_ERROR_NAMES:
+        return QUOTA
+    return FATAL
+
+def retry_after(error):
+    """Seconds the server asked us to wait before retrying, if it said"""
+    response = getattr(error, 'response', None)
+    header = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    
+    message = str(error)
+    for pattern in RETRY_HINT_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
+
+class CircuitBreaker:
+    """Stops calling a throttling API after repeated failures until a cooldown has passed"""
+    
+    def __init__(self, failure_threshold=5, cooldown=120):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+    
+    def before_call(self):
+        with self.lock:
+            remaining = self.open_until - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(f"Model API is throttling us; not retrying for another {remaining:.0f}s")
+    
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+    
+    def record_failure(self, hint=None):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                # After the cooldown one trial call gets through; another failure reopens it
+                self.open_until = time.monotonic() + max(self.cooldown, hint or 0)
+                self.failures = self.failure_threshold - 1
+    
+    @property
+    def is_open(self):
+        with self.lock:
+            return self.open_until > time.monotonic()
+
+class ModelCallPolicy:
+    """Retries transient model call failures with backoff, honouring server retry hints"""
+    
+    def __init__(self, max_retries=3, base_delay=2.0, max_delay=60.0, breaker=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+    
+    @classmethod
+    def from_config(cls, config):
+        """Build a policy from the summarization section of gemini.yaml"""
+        return cls(
+            max_retries=config.get('model_retries', 3),
+            base_delay=config.get('model_retry_base_delay', 2.0),
+            max_delay=config.get('model_retry_max_delay', 60.0),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get('circuit_breaker_threshold', 5),
+                cooldown=config.get('circuit_breaker_cooldown', 120)
+            )
+        )
+    
+    def backoff(self, attempt, hint=None):
+        if hint is not None:
+            return hint
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * (0.5 + random.random() / 2)
+    
+    def call(self, fn, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                if kind == FATAL:
+                    raise
+                
+                hint = retry_after(e)
+                self.breaker.record_failure(hint if kind == QUOTA else None)
+                delay = self.backoff(attempt, hint)
+                
+                # Hints beyond max_delay mean the quota window is long; leave it to the next run
+                if attempt == self.max_retries or delay > self.max_delay:
+                    if kind == QUOTA:
+                        raise QuotaExhaustedError(f"Model quota exhausted ({type(e).__name__}: {e})"[:200]) from e
+                    raise
+                print(f"    {kind.capitalize()} error ({type(e).__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
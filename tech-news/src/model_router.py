@@ -0,0 +1,34 @@
+from typing import Dict, List, Optional
+
+class ModelRouter:
+    """Picks a model and output budget for each article from the routing rules in gemini.yaml
+
+    Rules are tried in order and the first whose conditions all hold wins:
+    min_tokens / max_tokens bound the article's estimated token count and
+    sources restricts it to the named sources. Articles no rule matches use
+    the default route, i.e. the configured model with no output cap.
+    """
+    
+    def __init__(self, routes: Optional[List[Dict]], default_model):
+        self.routes = []
+        for i, route in enumerate(routes or []):
+            if 'model' not in route:
+                raise ValueError(f"Routing rule {route.get('name', i)} has no model")
+            self.routes.append(dict(route, name=route.get('name', f'route-{i + 1}')))
+        self.default = {'name': 'default', 'model': default_model}
+    
+    @staticmethod
+    def matches(route, source, tokens) -> bool:
+        if 'min_tokens' in route and tokens < route['min_tokens']:
+            return False
+        if 'max_tokens' in route and tokens > route['max_tokens']:
+            return False
+        if 'sources' in route and source not in route['sources']:
+            return False
+        return True
+    
+    def route(self, source, tokens) -> Dict:
+        for route in self.routes:
+            if self.matches(route, source, tokens):
+                return route
+        return self.default
@@ -0,0 +1,51 @@
+import threading
+import time
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `max_calls` units per `period` seconds"""
+    
+    def __init__(self, max_calls, period=1.0):
+        self.capacity = float(max_calls)
+        self.period = float(period)
+        self.refill_rate = self.capacity / self.period
+        self.available = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.available = min(self.capacity, self.available + elapsed * self.refill_rate)
+        self.last_refill = now
+    
+    def acquire(self, cost=1):
+        """Block until `cost` units are available, then consume them"""
+        while True:
+            wait = self.try_acquire(cost)
+            if wait == 0:
+                return
+            time.sleep(wait)
+    
+    def try_acquire(self, cost=1) -> float:
+        """Consume `cost` units if they are available and return 0, else return the seconds to wait"""
+        # A single request larger than the bucket can never fit, so cap it
+        cost = min(float(cost), self.capacity)
+        with self.lock:
+            self._refill()
+            if self.available >= cost:
+                self.available -= cost
+                return 0.0
+            return (cost - self.available) / self.refill_rate
+    
+    def wait_time(self, cost=1) -> float:
+        """Seconds until `cost` units are available, without consuming them"""
+        cost = min(float(cost), self.capacity)
+        with self.lock:
+            self._refill()
+            return max(0.0, (cost - self.available) / self.refill_rate)
+    
+    def headroom(self) -> float:
+        """Fraction of the bucket currently available"""
+        with self.lock:
+            self._refill()
+            return self.available / self.capacity
@@ -0,0 +1,80 @@
+import math
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+# Topic profiles: term -> weight (lists mean weight 1 for every term)
+DEFAULT_TOPICS = {
+    'ai': {
+        'ai': 1, 'llm': 2, 'llms': 2, 'language model': 2, 'machine learning': 2, 'deep learning': 2,
+        'neural': 1, 'transformer': 1, 'agent': 1, 'agents': 1, 'inference': 1, 'training': 1,
+        'fine-tuning': 2, 'gpt': 1, 'rag': 1, 'embedding': 1, 'embeddings': 1, 'benchmark': 1,
+        'dataset': 1, 'gpu': 1, 'prompt': 1, 'reasoning': 1, 'open-weight': 1, 'evals': 1
+    },
+    'engineering': {
+        'api': 1, 'open source': 1, 'framework': 1, 'python': 1, 'kubernetes': 1, 'database': 1,
+        'latency': 1, 'deployment': 1, 'mlops': 2, 'pipeline': 1, 'architecture': 1, 'infrastructure': 1,
+        'developer': 1, 'developers': 1, 'library': 1
+    }
+}
+
+# Sponsor posts, job listings and event announcements
+DEFAULT_EXCLUDE = {
+    'sponsored': 2, 'sponsor': 1, 'our sponsor': 2, 'partner content': 2, 'advertisement': 2,
+    "we're hiring": 3, 'we are hiring': 3, 'job opening': 2, 'job openings': 2, 'apply now': 2, 'job board': 2,
+    'webinar': 2, 'register now': 2, 'rsvp': 2, 'meetup': 1, 'early bird': 2, 'tickets': 1,
+    'promo code': 2, 'discount code': 2
+}
+
+Profile = Union[Dict[str, float], List[str]]
+
+def compile_profile(profile: Profile) -> List[Tuple[re.Pattern, float]]:
+    if isinstance(profile, list):
+        profile = dict.fromkeys(profile, 1)
+    return [(re.compile(rf'(?<!\w){re.escape(term.lower())}(?!\w)'), float(weight))
+            for term, weight in profile.items()]
+
+class RelevanceFilter:
+    """Local keyword scoring that keeps off-topic articles away from the model
+
+    Each topic profile scores the article by its weighted terms, with
+    sublinear term frequency (1 + log count) so long articles do not win on
+    length alone, and title matches count title_weight times. The best topic
+    score minus the exclusion score must reach the threshold.
+    """
+    
+    def __init__(self, topics: Optional[Dict[str, Profile]] = None, exclude: Optional[Profile] = None,
+                 threshold=2.0, title_weight=3.0):
+        self.topics = {name: compile_profile(profile) for name, profile in (topics or DEFAULT_TOPICS).items()}
+        self.exclude = compile_profile(DEFAULT_EXCLUDE if exclude is None else exclude)
+        self.threshold = threshold
+        self.title_weight = title_weight
+    
+    @classmethod
+    def from_config(cls, config) -> Optional['RelevanceFilter']:
+        """Build the filter from the relevance section of gemini.yaml, or None if it is disabled"""
+        if not config or not config.get('enabled', False):
+            return None
+        return cls(
+            topics=config.get('topics'),
+            exclude=config.get('exclude'),
+            threshold=config.get('threshold', 2.0),
+            title_weight=config.get('title_weight', 3.0)
+        )
+    
+    def _profile_score(self, terms, title, content) -> float:
+        score = 0.0
+        for pattern, weight in terms:
+            count = self.title_weight * len(pattern.findall(title)) + len(pattern.findall(content))
+            if count:
+                score += weight * (1 + math.log(count))
+        return score
+    
+    def score(self, title, content) -> float:
+        title, content = title.lower(), content.lower()
+        topic_score = max((self._profile_score(terms, title, content) for terms in self.topics.values()), default=0.0)
+        return topic_score - self._profile_score(self.exclude, title, content)
+    
+    def check(self, article_metadata) -> Tuple[bool, float]:
+        """Return whether the article is worth summarizing, and its score"""
+        score = self.score(article_metadata['title'], article_metadata['content'])
+        return score >= self.threshold, score
@@ -0,0 +1,98 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from state_manager import article_date
+
+class BudgetExhaustedError(Exception):
+    """Raised instead of starting a model call once the run's time or token budget is spent"""
+
+def parse_deadline(value, now: Optional[datetime] = None) -> float:
+    """Turn --deadline (minutes from now, or the next HH:MM clock time) into a timestamp"""
+    now = now or datetime.now()
+    match = re.fullmatch(r'(\d{1,2}):(\d{2})', value.strip())
+    if match:
+        deadline = now.replace(hour=int(match.group(1)), minute=int(match.group(2)), second=0, microsecond=0)
+        # A clock time already past today means that time tomorrow (e.g. 07:30 given at 23:00)
+        if deadline <= now:
+            deadline += timedelta(days=1)
+        return deadline.timestamp()
+    try:
+        return (now + timedelta(minutes=float(value))).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid deadline {value!r}: expected minutes (e.g. 30) or a clock time (e.g. 07:30)")
+
+class RunBudget:
+    """Wall-clock deadline and token budget for one summarization run
+
+    Input tokens are reserved before a call starts and output tokens charged
+    once it returns, so concurrent workers cannot jointly overshoot by more
+    than the calls already in flight.
+    """
+    
+    def __init__(self, deadline: Optional[float] = None, token_budget: Optional[int] = None):
+        self.deadline = deadline
+        self.token_budget = token_budget
+        self.tokens_used = 0
+        self.refused = None
+        self.lock = threading.Lock()
+    
+    def reason(self, tokens=0) -> Optional[str]:
+        """Why a call of this many input tokens may not start, or None if it may"""
+        if self.refused:
+            return self.refused
+        if self.deadline is not None and time.time() >= self.deadline:
+            return 'deadline reached'
+        if self.token_budget is not None and (self.tokens_used >= self.token_budget
+                                              or self.tokens_used + tokens > self.token_budget):
+            return 'token budget spent'
+        return None
+    
+    @property
+    def exhausted(self) -> bool:
+        with self.lock:
+            return self.reason() is not None
+    
+    def reserve(self, tokens):
+        """Claim input tokens for a call about to start, or raise BudgetExhaustedError"""
+        with self.lock:
+            reason = self.reason(tokens)
+            if reason:
+                # Once one call is refused the run winds down, rather than hunting for smaller articles
+                self.refused = reason
+                raise BudgetExhaustedError(f"Run budget exhausted ({reason})")
+            self.tokens_used += tokens
+    
+    def charge(self, tokens):
+        with self.lock:
+            self.tokens_used += tokens
+
+def source_priorities(config) -> Dict[str, int]:
+    """Map each source's name and slug in substacks.yaml to its priority (default 0, higher first)"""
+    priorities = {}
+    for source in (config.get('substacks') or []) + (config.get('blogs') or []):
+        priority = source.get('priority', 0)
+        priorities[source['name']] = priority
+        priorities[source['slug']] = priority
+    return priorities
+
+def prioritize(article_files: List[str], priorities: Dict[str, int], manifest=None) -> List[str]:
+    """Order articles newest day first, then by source priority, then newest first within that"""
+    def key(filepath):
+        filename = os.path.basename(filepath)
+        entry = manifest.get(filename) if manifest else None
+        published = (entry or {}).get('date') or article_date(filename) or ''
+        
+        priority = 0
+        if entry and entry.get('source') in priorities:
+            priority = priorities[entry['source']]
+        else:
+            # Filenames start with the source slug
+            slugs = [slug for slug in priorities if filename.startswith(f'{slug}-')]
+            if slugs:
+                priority = priorities[max(slugs, key=len)]
+        return (published[:10], priority, published)
+    
+    return sorted(article_files, key=key, reverse=True)
@@ -0,0 +1,297 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Set
+from state_manager import RetryPolicy, failure_batch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_articles (
+    filename TEXT PRIMARY KEY,
+    processed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_processed_at ON processed_articles (processed_at);
+CREATE TABLE IF NOT EXISTS failed_articles (
+    filename TEXT PRIMARY KEY,
+    failed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dead_letter_articles (
+    filename TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    first_failed REAL NOT NULL,
+    last_failed REAL NOT NULL,
+    next_eligible REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS filtered_articles (
+    filename TEXT PRIMARY KEY,
+    score REAL NOT NULL,
+    filtered_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS unfiltered_articles (
+    filename TEXT PRIMARY KEY,
+    unfiltered_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Retry bookkeeping columns, added to failed_articles tables created before retries were scheduled
+RETRY_COLUMNS = {
+    'attempts': 'INTEGER NOT NULL DEFAULT 1',
+    'last_error': 'TEXT',
+    'first_failed': 'REAL NOT NULL DEFAULT 0',
+    'last_failed': 'REAL NOT NULL DEFAULT 0',
+    'next_eligible': 'REAL NOT NULL DEFAULT 0'
+}
+RECORD_FIELDS = list(RETRY_COLUMNS)
+
+# SQLite limits the number of bound parameters per statement
+QUERY_CHUNK_SIZE = 500
+
+class SqliteStateStore:
+    """Article tracking state kept in a SQLite database in WAL mode"""
+    
+    def __init__(self, db_path, legacy_json_file=None, retry_policy=None):
+        self.db_path = db_path
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        
+        # WAL lets readers proceed while a writer commits
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self._add_retry_columns()
+        
+        if legacy_json_file:
+            self.migrate_from_json(legacy_json_file)
+    
+    def _add_retry_columns(self):
+        with self.lock, self.conn:
+            existing = {row[1] for row in self.conn.execute('PRAGMA table_info(failed_articles)')}
+            for column, definition in RETRY_COLUMNS.items():
+                if column not in existing:
+                    self.conn.execute(f'ALTER TABLE failed_articles ADD COLUMN {column} {definition}')
+    
+    def migrate_from_json(self, json_file):
+        """One-time import of processed/failed lists from processed_articles.json"""
+        with self.lock, self.conn:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone()
+            if row or not os.path.exists(json_file):
+                return
+            
+            try:
+                with open(json_file, 'r') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, KeyError):
+                data = {}
+            
+            now = datetime.now().isoformat()
+            processed = data.get('processed_articles', [])
+            if isinstance(processed, list):
+                # Legacy flat list: filed under the day it was last written, as the JSON store does
+                processed = {(data.get('last_updated') or now)[:10]: processed}
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO processed_articles (filename, processed_at) VALUES (?, ?)',
+                [(name, bucket) for bucket, names in processed.items() for name in names]
+            )
+            
+            failed = data.get('failed_articles', [])
+            if isinstance(failed, list):
+                failed = {name: {'attempts': 1, 'next_eligible': 0} for name in failed}
+            for name, record in failed.items():
+                self._write_record('failed_articles', name, record)
+            for name, record in data.get('dead_letter_articles', {}).items():
+                self._write_record('dead_letter_articles', name, record)
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO filtered_articles (filename, score, filtered_at) VALUES (?, ?, ?)',
+                [(name, record['score'], record['filtered_at'])
+                 for name, record in data.get('filtered_articles', {}).items()]
+            )
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO unfiltered_articles (filename, unfiltered_at) VALUES (?, ?)',
+                list(data.get('unfiltered_articles', {}).items())
+            )
+            
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)", (now,)
+            )
+    
+    def flush(self):
+        """Every update is committed in its own transaction, so there is nothing to flush"""
+    
+    def refresh(self):
+        """Queries always read the latest committed state, so there is nothing to reload"""
+    
+    def _names(self, table) -> Set[str]:
+        with self.lock:
+            return {row[0] for row in self.conn.execute(f'SELECT filename FROM {table}')}
+    
+    def _records(self, table) -> Dict[str, Dict]:
+        with self.lock:
+            rows = self.conn.execute(f"SELECT filename, {', '.join(RECORD_FIELDS)} FROM {table}")
+            return {row[0]: dict(zip(RECORD_FIELDS, row[1:])) for row in rows}
+    
+    def _read_record(self, table, filename):
+        row = self.conn.execute(
+            f"SELECT {', '.join(RECORD_FIELDS)} FROM {table} WHERE filename = ?", (filename,)
+        ).fetchone()
+        return dict(zip(RECORD_FIELDS, row)) if row else None
+    
+    def _write_record(self, table, filename, record):
+        values = [
+            record.get('attempts', 0),
+            record.get('last_error'),
+            record.get('first_failed') or 0,
+            record.get('last_failed') or 0,
+            record.get('next_eligible', 0)
+        ]
+        if table == 'failed_articles':
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO failed_articles (filename, failed_at, {', '.join(RECORD_FIELDS)}) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [filename, datetime.now().isoformat()] + values
+            )
+        else:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {table} (filename, {', '.join(RECORD_FIELDS)}) "
+                f"VALUES (?, ?, ?, ?, ?, ?)",
+                [filename] + values
+            )
+    
+    def get_processed(self) -> Set[str]:
+        return self._names('processed_articles')
+    
+    def add_processed(self, filenames: List[str]):
+        now = datetime.now().isoformat()
+        with self.lock, self.conn:
+            # Keep the first processing time so retention buckets stay stable
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO processed_articles (filename, processed_at) VALUES (?, ?)',
+                [(name, now) for name in filenames]
+            )
+    
+    def get_failed(self) -> Set[str]:
+        return self._names('failed_articles')
+    
+    def get_failed_details(self) -> Dict[str, Dict]:
+        return self._records('failed_articles')
+    
+    def add_failed(self, filenames: List[str], errors=None):
+        batch = failure_batch(filenames, errors)
+        with self.lock, self.conn:
+            for name, failure in batch['failures'].items():
+                record = self.retry_policy.record_failure(
+                    self._read_record('failed_articles', name), failure['error'], batch['time'], failure['jitter']
+                )
+                if self.retry_policy.exhausted(record):
+                    self.conn.execute('DELETE FROM failed_articles WHERE filename = ?', (name,))
+                    self._write_record('dead_letter_articles', name, record)
+                else:
+                    self._write_record('failed_articles', name, record)
+    
+    def clear_failed(self, filenames: List[str]):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'DELETE FROM failed_articles WHERE filename = ?',
+                [(name,) for name in filenames]
+            )
+    
+    def get_dead_letters(self) -> Dict[str, Dict]:
+        return self._records('dead_letter_articles')
+    
+    def requeue_dead_letters(self, filenames: List[str]):
+        with self.lock, self.conn:
+            for name in filenames:
+                record = self._read_record('dead_letter_articles', name)
+                if record is None:
+                    continue
+                self.conn.execute('DELETE FROM dead_letter_articles WHERE filename = ?', (name,))
+                self._write_record('failed_articles', name, dict(record, attempts=0, next_eligible=0))
+    
+    def get_filtered(self) -> Dict[str, Dict]:
+        with self.lock:
+            rows = self.conn.execute('SELECT filename, score, filtered_at FROM filtered_articles')
+            return {row[0]: {'score': row[1], 'filtered_at': row[2]} for row in rows}
+    
+    def add_filtered(self, scores: Dict[str, float]):
+        now = datetime.now().isoformat()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO filtered_articles (filename, score, filtered_at) VALUES (?, ?, ?)',
+                [(name, score, now) for name, score in scores.items()]
+            )
+    
+    def unfilter(self, filenames: List[str]):
+        now = datetime.now().isoformat()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'DELETE FROM filtered_articles WHERE filename = ?',
+                [(name,) for name in filenames]
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO unfiltered_articles (filename, unfiltered_at) VALUES (?, ?)',
+                [(name, now) for name in filenames]
+            )
+    
+    def get_unfiltered(self) -> Set[str]:
+        return self._names('unfiltered_articles')
+    
+    def _existing(self, table, filenames: List[str], columns='filename') -> List[tuple]:
+        """Return rows for the given filenames present in a table (primary key lookups)"""
+        found = []
+        for i in range(0, len(filenames), QUERY_CHUNK_SIZE):
+            chunk = filenames[i:i + QUERY_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            found.extend(self.conn.execute(
+                f'SELECT {columns} FROM {table} WHERE filename IN ({placeholders})', chunk
+            ))
+        return found
+    
+    def select_pending(self, filenames: List[str]) -> Set[str]:
+        """Return the filenames that are new or whose retry is due"""
+        now = time.time()
+        with self.lock:
+            processed = {row[0] for row in self._existing('processed_articles', filenames)}
+            # Dead letters and filtered articles are never picked up again on their own
+            skipped = {row[0] for row in self._existing('dead_letter_articles', filenames)}
+            skipped.update(row[0] for row in self._existing('filtered_articles', filenames))
+            failed = dict(self._existing('failed_articles', filenames, 'filename, next_eligible'))
+        
+        pending = set()
+        for name in filenames:
+            if name in skipped:
+                continue
+            if name in failed:
+                if failed[name] <= now:
+                    pending.add(name)
+            elif name not in processed:
+                pending.add(name)
+        return pending
+    
+    def compact(self, horizon: str) -> int:
+        """Drop processed (and filtered and unfiltered) entries from before the horizon day, returning how many processed entries went"""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM filtered_articles WHERE filtered_at < ?', (horizon,))
+            self.conn.execute('DELETE FROM unfiltered_articles WHERE unfiltered_at < ?', (horizon,))
+            cursor = self.conn.execute('DELETE FROM processed_articles WHERE processed_at < ?', (horizon,))
+            if cursor.rowcount:
+                self.conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('compacted_before', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)", (horizon,)
+                )
+            return cursor.rowcount
+    
+    def get_compacted_before(self):
+        """Day before which processed entries have been dropped, or None if compaction never dropped any"""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'compacted_before'").fetchone()
+        return row[0] if row else None
+    
+    def close(self):
+        self.conn.close()
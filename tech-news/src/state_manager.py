@@ -1,16 +1,350 @@
 import json
 import os
-from datetime import datetime
+import random
+import re
+import socket
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import List, Dict, Set
+from file_lock import FileLock
+from bloom_filter import BloomFilter
+
+def atomic_write(path, write, binary=False):
+    """Call write(f) on a temp file in the same directory, then rename it over path"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8')) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file in the same directory and rename it into place"""
+    atomic_write(path, lambda f: json.dump(data, f, indent=2))
+
+def date_bucket(when=None):
+    """Day bucket ('YYYY-MM-DD') that processed articles are filed under"""
+    return (when or datetime.now()).strftime('%Y-%m-%d')
+
+def article_date(filename):
+    """Publication date embedded in an article filename by format_article_filename"""
+    match = re.search(r'-(\d{4}-\d{2}-\d{2})-', filename)
+    return match.group(1) if match else None
+
+class RetryPolicy:
+    """Exponential backoff with jitter for articles that fail to summarize"""
+    
+    def __init__(self, base_delay=3600, max_delay=172800, max_attempts=6):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+    
+    def delay(self, attempts, jitter):
+        """Seconds to wait after the given number of consecutive failures"""
+        # A first failure is usually transient, so it is retried on the next run
+        if attempts <= 1:
+            return 0
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 2))
+        return delay * (0.5 + jitter / 2)
+    
+    def record_failure(self, previous, error, now, jitter) -> Dict:
+        """Build the failure record for one more failed attempt"""
+        previous = previous or {}
+        attempts = previous.get('attempts', 0) + 1
+        return {
+            'attempts': attempts,
+            'last_error': error,
+            'first_failed': previous.get('first_failed', now),
+            'last_failed': now,
+            'next_eligible': now + self.delay(attempts, jitter)
+        }
+    
+    def exhausted(self, record) -> bool:
+        return record['attempts'] >= self.max_attempts
+
+def failure_batch(filenames: List[str], errors=None) -> Dict:
+    """Timestamp and pre-drawn jitter for a batch of failures, so replays are deterministic"""
+    errors = errors or {}
+    return {
+        'time': time.time(),
+        'failures': {name: {'error': errors.get(name), 'jitter': random.random()} for name in filenames}
+    }
+
+class JsonStateStore:
+    """Article tracking state loaded once from processed_articles.json and written back on flush
+    
+    Changes are kept as an operation log. A flush takes the state lock,
+    re-reads the file, replays the log on top of whatever other processes
+    wrote in the meantime and writes the merged result, so concurrent runs
+    never lose each other's updates.
+    """
+    
+    def __init__(self, processed_file, lock, retry_policy):
+        self.processed_file = processed_file
+        self.lock = lock
+        self.retry_policy = retry_policy
+        self.processed = None
+        self.buckets = None
+        self.failed = None
+        self.dead_letters = None
+        self.filtered = None
+        self.unfiltered = None
+        self.compacted_before = None
+        self.extra = {}
+        self.pending_ops = []
+    
+    @property
+    def dirty(self):
+        return bool(self.pending_ops)
+    
+    def _read(self):
+        data = {}
+        if os.path.exists(self.processed_file):
+            try:
+                with open(self.processed_file, 'r') as f:
+                    data = json.load(f)
+            except (json.JSONDecodeError, KeyError):
+                data = {}
+        
+        last_updated = data.pop('last_updated', None)
+        processed = data.pop('processed_articles', {})
+        if isinstance(processed, list):
+            # Legacy flat list: file everything under the day it was last written
+            processed = {(last_updated or datetime.now().isoformat())[:10]: processed}
+        
+        # Processed filenames grouped by the day they were processed
+        self.buckets = {bucket: set(names) for bucket, names in processed.items()}
+        self.processed = set().union(*self.buckets.values())
+        
+        failed = data.pop('failed_articles', {})
+        if isinstance(failed, list):
+            # Legacy list: one failure each, eligible for retry straight away
+            failed = {name: {'attempts': 1, 'last_error': None, 'next_eligible': 0} for name in failed}
+        self.failed = failed
+        self.dead_letters = data.pop('dead_letter_articles', {})
+        self.filtered = data.pop('filtered_articles', {})
+        self.unfiltered = data.pop('unfiltered_articles', {})
+        # Day before which compaction has dropped processed entries
+        self.compacted_before = data.pop('compacted_before', None)
+        
+        # Keep unknown keys so a flush never drops data written by newer code
+        self.extra = data
+        
+        # Local changes that haven't been flushed yet stay visible
+        for op, filenames, arg in self.pending_ops:
+            self._apply(op, filenames, arg)
+    
+    def _ensure_loaded(self):
+        if self.processed is None:
+            self._read()
+    
+    def _apply(self, op, filenames, arg):
+        if op == 'add_processed':
+            new = [name for name in filenames if name not in self.processed]
+            if new:
+                self.buckets.setdefault(arg, set()).update(new)
+                self.processed.update(new)
+        elif op == 'add_failed':
+            for name in filenames:
+                failure = arg['failures'][name]
+                record = self.retry_policy.record_failure(
+                    self.failed.get(name), failure['error'], arg['time'], failure['jitter']
+                )
+                if self.retry_policy.exhausted(record):
+                    self.failed.pop(name, None)
+                    self.dead_letters[name] = record
+                else:
+                    self.failed[name] = record
+        elif op == 'clear_failed':
+            for name in filenames:
+                self.failed.pop(name, None)
+        elif op == 'requeue':
+            for name in filenames:
+                record = self.dead_letters.pop(name, None)
+                if record:
+                    self.failed[name] = dict(record, attempts=0, next_eligible=0)
+        elif op == 'add_filtered':
+            for name in filenames:
+                self.filtered[name] = arg[name]
+        elif op == 'unfilter':
+            for name in filenames:
+                self.filtered.pop(name, None)
+                self.unfiltered[name] = arg
+        elif op == 'compact':
+            dropped = [b for b in self.buckets if b < arg]
+            for bucket in dropped:
+                self.processed -= self.buckets.pop(bucket)
+            if dropped:
+                self.compacted_before = max(self.compacted_before or arg, arg)
+            for name in [n for n, record in self.filtered.items() if record['filtered_at'][:10] < arg]:
+                del self.filtered[name]
+            for name in [n for n, unfiltered_at in self.unfiltered.items() if unfiltered_at[:10] < arg]:
+                del self.unfiltered[name]
+    
+    def _record(self, op, filenames: List[str], arg=None):
+        self._ensure_loaded()
+        filenames = list(filenames)
+        self._apply(op, filenames, arg)
+        self.pending_ops.append((op, filenames, arg))
+    
+    def refresh(self):
+        """Reload state written by other processes"""
+        with self.lock:
+            self._read()
+    
+    def flush(self):
+        """Merge the pending changes into the on-disk state"""
+        if not self.dirty:
+            return
+        
+        with self.lock:
+            self._read()
+            
+            data = dict(self.extra)
+            data['processed_articles'] = {bucket: sorted(self.buckets[bucket])
+                                          for bucket in sorted(self.buckets) if self.buckets[bucket]}
+            data['failed_articles'] = {name: self.failed[name] for name in sorted(self.failed)}
+            data['dead_letter_articles'] = {name: self.dead_letters[name] for name in sorted(self.dead_letters)}
+            data['filtered_articles'] = {name: self.filtered[name] for name in sorted(self.filtered)}
+            data['unfiltered_articles'] = {name: self.unfiltered[name] for name in sorted(self.unfiltered)}
+            if self.compacted_before:
+                data['compacted_before'] = self.compacted_before
+            data['last_updated'] = datetime.now().isoformat()
+            
+            atomic_write_json(self.processed_file, data)
+            self.pending_ops = []
+    
+    def get_processed(self) -> Set[str]:
+        self._ensure_loaded()
+        return set(self.processed)
+    
+    def add_processed(self, filenames: List[str]):
+        self._record('add_processed', filenames, date_bucket())
+    
+    def get_failed(self) -> Set[str]:
+        self._ensure_loaded()
+        return set(self.failed)
+    
+    def get_failed_details(self) -> Dict:
+        self._ensure_loaded()
+        return {name: dict(record) for name, record in self.failed.items()}
+    
+    def add_failed(self, filenames: List[str], errors=None):
+        self._record('add_failed', filenames, failure_batch(filenames, errors))
+    
+    def clear_failed(self, filenames: List[str]):
+        self._ensure_loaded()
+        if set(self.failed) & set(filenames):
+            self._record('clear_failed', filenames)
+    
+    def get_dead_letters(self) -> Dict:
+        self._ensure_loaded()
+        return {name: dict(record) for name, record in self.dead_letters.items()}
+    
+    def requeue_dead_letters(self, filenames: List[str]):
+        self._record('requeue', filenames)
+    
+    def get_filtered(self) -> Dict:
+        self._ensure_loaded()
+        return {name: dict(record) for name, record in self.filtered.items()}
+    
+    def add_filtered(self, scores: Dict[str, float]):
+        now = datetime.now().isoformat()
+        self._record('add_filtered', list(scores), {name: {'score': score, 'filtered_at': now}
+                                                    for name, score in scores.items()})
+    
+    def unfilter(self, filenames: List[str]):
+        self._record('unfilter', filenames, datetime.now().isoformat())
+    
+    def get_unfiltered(self) -> Set[str]:
+        self._ensure_loaded()
+        return set(self.unfiltered)
+    
+    def select_pending(self, filenames: List[str]) -> Set[str]:
+        """Return the filenames that are new or whose retry is due"""
+        self._ensure_loaded()
+        now = time.time()
+        pending = set()
+        for name in filenames:
+            if name in self.dead_letters or name in self.filtered:
+                continue
+            record = self.failed.get(name)
+            if record is not None:
+                if record['next_eligible'] <= now:
+                    pending.add(name)
+            elif name not in self.processed:
+                pending.add(name)
+        return pending
+    
+    def compact(self, horizon: str) -> int:
+        """Drop processed buckets (and filtered and unfiltered entries) older than the horizon day, returning how many processed entries went"""
+        self._ensure_loaded()
+        before = len(self.processed)
+        self._record('compact', [], horizon)
+        return before - len(self.processed)
+    
+    def get_compacted_before(self):
+        """Day before which processed entries have been dropped, or None if compaction never dropped any"""
+        self._ensure_loaded()
+        return self.compacted_before
 
 class StateManager:
-    def __init__(self, state_dir):
+    def __init__(self, state_dir, backend='json', claim_ttl=1800, retention_days=None,
+                 bloom_prefilter=False, bloom_capacity=1000000, retry_policy=None):
         self.state_dir = state_dir
         self.last_run_file = os.path.join(state_dir, 'last_run.json')
         self.processed_file = os.path.join(state_dir, 'processed_articles.json')
+        self.claims_file = os.path.join(state_dir, 'claims.json')
+        self.bloom_file = os.path.join(state_dir, 'processed.bloom')
+        
+        # Processed entries older than this many days are dropped by compact_state()
+        self.retention_days = retention_days
+        
+        # Optional "definitely new" prefilter in front of the exact processed set
+        self.bloom_prefilter = bloom_prefilter
+        self.bloom_capacity = bloom_capacity
+        self.bloom = None
+        self.bloom_added = set()
+        
+        # Identifies this process when claiming articles
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.claim_ttl = claim_ttl
+        
+        # Articles left out of the last get_articles_to_process() because their
+        # processed entries may have been compacted away
+        self.skipped_compacted = 0
+        
+        # Nesting depth of batch() blocks; writes are deferred while > 0
+        self.batch_depth = 0
         
         # Ensure state directory exists
         os.makedirs(state_dir, exist_ok=True)
+        
+        # Serializes read-modify-write cycles across processes
+        self.lock = FileLock(os.path.join(state_dir, 'state.lock'))
+        
+        # Backoff schedule for failed articles
+        self.retry_policy = retry_policy or RetryPolicy()
+        
+        if backend == 'json':
+            self.store = JsonStateStore(self.processed_file, self.lock, self.retry_policy)
+        elif backend == 'sqlite':
+            from sqlite_state_store import SqliteStateStore
+            self.store = SqliteStateStore(
+                os.path.join(state_dir, 'state.db'),
+                legacy_json_file=self.processed_file,
+                retry_policy=self.retry_policy
+            )
+        else:
+            raise ValueError(f"Unknown state backend: {backend}")
     
     def get_last_run_time(self):
         """Get the timestamp of the last successful run"""
@@ -31,98 +365,256 @@ class StateManager:
             'date': datetime.now().strftime('%Y-%m-%d')
         }
         
-        with open(self.last_run_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_json(self.last_run_file, data)
+    
+    @contextmanager
+    def batch(self):
+        """Defer state writes until the outermost batch block exits"""
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.flush()
+    
+    def flush(self):
+        """Persist any pending state changes"""
+        self.store.flush()
+        self._flush_bloom()
+    
+    def refresh(self):
+        """Pick up state written by other processes"""
+        with self.lock:
+            self.store.refresh()
+            if self.bloom is not None:
+                self._load_bloom()
+    
+    def _load_bloom(self):
+        """Load the on-disk Bloom filter, building it from the exact store if missing"""
+        with self.lock:
+            bloom = BloomFilter.load(self.bloom_file)
+            if bloom is None:
+                bloom = self._build_bloom()
+            # Names added locally but not flushed yet must stay visible
+            bloom.update(self.bloom_added)
+            self.bloom = bloom
+    
+    def _build_bloom(self):
+        # Every name the exact store knows about, so none of them looks definitely new
+        known = (self.store.get_processed() | self.store.get_failed()
+                 | set(self.store.get_dead_letters()) | set(self.store.get_filtered()))
+        bloom = BloomFilter(max(self.bloom_capacity, 2 * len(known)))
+        bloom.update(known)
+        atomic_write(self.bloom_file, bloom.write, binary=True)
+        return bloom
+    
+    def _flush_bloom(self):
+        if not self.bloom_added:
+            return
+        
+        with self.lock:
+            # Add to whatever is on disk so other processes' additions survive
+            bloom = BloomFilter.load(self.bloom_file) or BloomFilter(self.bloom_capacity)
+            bloom.update(self.bloom_added)
+            atomic_write(self.bloom_file, bloom.write, binary=True)
+            self.bloom = bloom
+            self.bloom_added = set()
+    
+    def _add_to_bloom(self, filenames):
+        """Mark names as possibly known to the store, so the prefilter sends them to the exact lookup"""
+        if self.bloom_prefilter:
+            self._ensure_bloom()
+            self.bloom.update(filenames)
+            self.bloom_added.update(filenames)
+    
+    def _ensure_bloom(self):
+        if self.bloom_prefilter and self.bloom is None:
+            self._load_bloom()
+    
+    def retention_horizon(self):
+        """Oldest day bucket kept under the retention policy, or None to keep everything"""
+        if self.retention_days is None:
+            return None
+        return date_bucket(datetime.now() - timedelta(days=self.retention_days))
+    
+    def compact_state(self) -> Dict:
+        """Apply the retention policy and rebuild the Bloom prefilter"""
+        horizon = self.retention_horizon()
+        with self.lock:
+            self.store.refresh()
+            removed = self.store.compact(horizon) if horizon else 0
+            self.store.flush()
+            
+            remaining = len(self.store.get_processed())
+            if self.bloom_prefilter:
+                # Bloom filters can't forget, so start from a fresh one
+                self.bloom_added = set()
+                self.bloom = self._build_bloom()
+        
+        return {'removed': removed, 'remaining': remaining, 'horizon': horizon}
+    
+    def _autoflush(self):
+        if self.batch_depth == 0:
+            self.flush()
     
     def get_processed_articles(self) -> Set[str]:
         """Get set of already processed article filenames"""
-        if not os.path.exists(self.processed_file):
-            return set()
-        
-        try:
-            with open(self.processed_file, 'r') as f:
-                data = json.load(f)
-                return set(data.get('processed_articles', []))
-        except (json.JSONDecodeError, KeyError):
-            return set()
+        return self.store.get_processed()
     
     def add_processed_articles(self, article_filenames: List[str]):
         """Add article filenames to the processed list"""
-        processed = self.get_processed_articles()
-        processed.update(article_filenames)
-        
-        data = {
-            'processed_articles': list(processed),
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        with open(self.processed_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.store.add_processed(article_filenames)
+        self._add_to_bloom(article_filenames)
+        self._autoflush()
     
     def get_failed_articles(self) -> Set[str]:
         """Get set of articles that failed to process"""
-        if not os.path.exists(self.processed_file):
-            return set()
+        return self.store.get_failed()
+    
+    def add_failed_articles(self, article_filenames: List[str], errors=None):
+        """Record a failed attempt for each article and schedule its retry
         
+        `errors` optionally maps filenames to the class of error that made them
+        fail. Articles that reach the retry policy's attempt limit move to the
+        dead-letter list and are no longer retried.
+        """
+        self.store.add_failed(article_filenames, errors)
+        # Failed and dead-lettered names need the exact lookup so their backoff is honored
+        self._add_to_bloom(article_filenames)
+        self._autoflush()
+    
+    def get_failed_details(self) -> Dict:
+        """Get retry bookkeeping (attempts, last error, next eligible time) per failed article"""
+        return self.store.get_failed_details()
+    
+    def get_dead_letter_articles(self) -> Dict:
+        """Get articles that exhausted their retries, with their last failure details"""
+        return self.store.get_dead_letters()
+    
+    def requeue_dead_letter_articles(self, article_filenames: List[str] = None):
+        """Move dead-lettered articles (all by default) back to the retry queue"""
+        if article_filenames is None:
+            article_filenames = list(self.get_dead_letter_articles())
+        self.store.requeue_dead_letters(article_filenames)
+        self._autoflush()
+        return article_filenames
+    
+    def get_filtered_articles(self) -> Dict:
+        """Get articles the relevance filter kept from the model, with their scores"""
+        return self.store.get_filtered()
+    
+    def add_filtered_articles(self, scores: Dict[str, float]):
+        """Record articles that scored below the relevance threshold so they are not picked up again"""
+        self.store.add_filtered(scores)
+        self._add_to_bloom(scores)
+        self._autoflush()
+    
+    def unfilter_articles(self, article_filenames: List[str] = None):
+        """Queue filtered articles (all by default) for summarization, exempt from the relevance filter"""
+        if article_filenames is None:
+            article_filenames = list(self.get_filtered_articles())
+        self.store.unfilter(article_filenames)
+        self._autoflush()
+        return article_filenames
+    
+    def get_unfiltered_articles(self) -> Set[str]:
+        """Get articles a user released from the relevance filter, which must not be filtered again"""
+        return self.store.get_unfiltered()
+    
+    def clear_failed_articles(self, article_filenames: List[str]):
+        """Remove successfully processed articles from failed list"""
+        self.store.clear_failed(article_filenames)
+        self._autoflush()
+    
+    def _predates_compaction(self, filepath, compacted_before):
+        published = article_date(os.path.basename(filepath))
+        if not published or published >= compacted_before:
+            return False
         try:
-            with open(self.processed_file, 'r') as f:
-                data = json.load(f)
-                return set(data.get('failed_articles', []))
-        except (json.JSONDecodeError, KeyError):
-            return set()
+            fetched = date_bucket(datetime.fromtimestamp(os.path.getmtime(filepath)))
+        except OSError:
+            # No file to date it by; trust the publication date
+            return True
+        return fetched < compacted_before
     
-    def add_failed_articles(self, article_filenames: List[str]):
-        """Add article filenames to the failed list for retry"""
-        processed_data = {}
-        if os.path.exists(self.processed_file):
-            try:
-                with open(self.processed_file, 'r') as f:
-                    processed_data = json.load(f)
-            except (json.JSONDecodeError, KeyError):
-                pass
-        
-        failed = set(processed_data.get('failed_articles', []))
-        failed.update(article_filenames)
+    def get_articles_to_process(self, all_article_files: List[str]) -> List[str]:
+        """Get list of articles that need processing (new + failed retries that are due)"""
+        # Processed entries from before the compaction marker are gone, so an
+        # article published and fetched before it can't be told apart from a
+        # new one and is left alone. Backfilled or late-fetched files are newer
+        # on disk than the marker and still go through the exact lookup.
+        compacted_before = self.store.get_compacted_before()
+        names = []
+        self.skipped_compacted = 0
+        for filepath in all_article_files:
+            filename = os.path.basename(filepath)
+            if compacted_before and self._predates_compaction(filepath, compacted_before):
+                self.skipped_compacted += 1
+                continue
+            names.append(filename)
         
-        processed_data['failed_articles'] = list(failed)
-        processed_data['last_updated'] = datetime.now().isoformat()
+        if self.bloom_prefilter:
+            # Names the filter has never seen are definitely new; only the rest
+            # need an exact lookup
+            self._ensure_bloom()
+            maybe_seen = [name for name in names if name in self.bloom]
+            pending = set(names).difference(maybe_seen) | self.store.select_pending(maybe_seen)
+        else:
+            pending = self.store.select_pending(names)
         
-        with open(self.processed_file, 'w') as f:
-            json.dump(processed_data, f, indent=2)
+        # Include new articles and previously failed articles
+        return [filepath for filepath in all_article_files if os.path.basename(filepath) in pending]
     
-    def clear_failed_articles(self, article_filenames: List[str]):
-        """Remove successfully processed articles from failed list"""
-        if not os.path.exists(self.processed_file):
-            return
+    def _load_claims(self) -> Dict:
+        if not os.path.exists(self.claims_file):
+            return {}
         
         try:
-            with open(self.processed_file, 'r') as f:
-                data = json.load(f)
-            
-            failed = set(data.get('failed_articles', []))
-            failed -= set(article_filenames)
-            
-            data['failed_articles'] = list(failed)
-            data['last_updated'] = datetime.now().isoformat()
-            
-            with open(self.processed_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with open(self.claims_file, 'r') as f:
+                return json.load(f)
         except (json.JSONDecodeError, KeyError):
-            pass
+            return {}
     
-    def get_articles_to_process(self, all_article_files: List[str]) -> List[str]:
-        """Get list of articles that need processing (new + failed retries)"""
-        processed = self.get_processed_articles()
-        failed = self.get_failed_articles()
+    def claim_articles(self, article_files: List[str], limit=None) -> List[str]:
+        """Lease up to `limit` pending articles to this process
         
-        # Include new articles and previously failed articles
-        to_process = []
-        for filepath in all_article_files:
-            filename = os.path.basename(filepath)
-            if filename not in processed or filename in failed:
-                to_process.append(filepath)
+        Articles leased by another live worker, or already processed by one,
+        are skipped. Leases expire after claim_ttl seconds so a crashed
+        worker's articles are picked up again.
+        """
+        with self.lock:
+            self.refresh()
+            pending = self.get_articles_to_process(article_files)
+            
+            now = time.time()
+            claims = {name: claim for name, claim in self._load_claims().items()
+                      if claim['expires'] > now}
+            
+            claimed = []
+            for filepath in pending:
+                if limit is not None and len(claimed) >= limit:
+                    break
+                filename = os.path.basename(filepath)
+                claim = claims.get(filename)
+                if claim and claim['worker'] != self.worker_id:
+                    continue
+                claims[filename] = {'worker': self.worker_id, 'expires': now + self.claim_ttl}
+                claimed.append(filepath)
+            
+            atomic_write_json(self.claims_file, claims)
         
-        return to_process
+        return claimed
+    
+    def release_claims(self, article_files: List[str]):
+        """Release this process's leases on the given articles"""
+        with self.lock:
+            claims = self._load_claims()
+            for filepath in article_files:
+                filename = os.path.basename(filepath)
+                if claims.get(filename, {}).get('worker') == self.worker_id:
+                    del claims[filename]
+            atomic_write_json(self.claims_file, claims)
     
     def get_digest_info(self) -> Dict:
         """Get information about existing digests"""
@@ -0,0 +1,49 @@
+import json
+import re
+from typing import Dict, Optional
+
+# Field, digest heading and what the model should put there, in digest order
+SUMMARY_SECTIONS = [
+    ('insights', 'Key Technical Insights & Findings', 'main findings, methods, benchmarks and numbers'),
+    ('developments', 'Important Developments & Announcements', 'launches, releases, partnerships and roadmaps'),
+    ('implications', 'Practical Implications & Applications', 'what changes for engineers and real-world use cases'),
+    ('tools', 'Notable Tools, Frameworks & Methodologies', 'named technologies and libraries, with trade-offs'),
+    ('market', 'Market & Industry Context', 'business impact, competition, risks and limitations'),
+    ('takeaways', 'Actionable Takeaways', 'next steps and resources for readers'),
+]
+
+def describe_schema(max_items) -> str:
+    """The JSON shape requested from the model, as prompt text"""
+    fields = '\n'.join(f'"{field}": {description}' for field, _, description in SUMMARY_SECTIONS)
+    return f""""tldr": one or two sentences on what the article is about and why it matters
+{fields}
+
+Every key except tldr is a list of at most {max_items} short bullet strings (under 30 words each); use an empty list when the article has nothing for it."""
+
+def strip_code_fence(text) -> str:
+    # Models often wrap JSON in a markdown code fence
+    text = text.strip()
+    fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', text, re.DOTALL)
+    return fenced.group(1) if fenced else text
+
+def normalize_summary(data) -> Optional[Dict]:
+    """Coerce a decoded response to the schema, or None if it has no usable content"""
+    if not isinstance(data, dict):
+        return None
+    tldr = data.get('tldr')
+    summary = {'tldr': tldr.strip() if isinstance(tldr, str) else ''}
+    for field, _, _ in SUMMARY_SECTIONS:
+        items = data.get(field) or []
+        if isinstance(items, str):
+            items = [items]
+        summary[field] = [item.strip() for item in items if isinstance(item, str) and item.strip()]
+    if not summary['tldr'] and not any(summary[field] for field, _, _ in SUMMARY_SECTIONS):
+        return None
+    return summary
+
+def parse_structured_summary(text) -> Optional[Dict]:
+    """Decode one structured summary response, or None if it is not usable JSON"""
+    try:
+        return normalize_summary(json.loads(strip_code_fence(text)))
+    except json.JSONDecodeError:
+        return None
@@ -1,25 +1,219 @@
-import google.generativeai as genai
 import yaml
+import json
+import math
 import os
+import threading
+import time
 from datetime import datetime
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from state_manager import StateManager
+from fingerprint_index import FingerprintIndex
+from rate_limiter import RateLimiter
+from summary_cache import SummaryCache
+from token_budget import TokenEstimator, split_into_chunks
+from llm_backend import create_backend
+from model_policy import ModelCallPolicy, CircuitOpenError, QuotaExhaustedError, QUOTA, classify_error, retry_after
+from content_cleaner import clean_article_text
+from extractive import condense_text
+from telemetry import RunTelemetry
+from run_budget import BudgetExhaustedError
+from relevance_filter import RelevanceFilter
+from model_router import ModelRouter
+from key_pool import KeyPool
+from structured_summary import describe_schema, normalize_summary, parse_structured_summary, strip_code_fence
+
+# Part of the summary cache key: bump whenever the prompt template changes
+PROMPT_VERSION = 3
+
+# Failures that aren't the article's fault
+DEFERRAL_ERRORS = (CircuitOpenError, BudgetExhaustedError, QuotaExhaustedError)
+
+ANALYSIS_INSTRUCTIONS = """Please provide a comprehensive analysis of this AI/technology article. Extract and organize the most important information in detail:
+
+## Key Technical Insights & Findings
+- What are the main technical discoveries, research findings, or breakthrough insights?
+- What specific methodologies, algorithms, or approaches are discussed?
+- What are the technical specifications, performance metrics, or benchmarks mentioned?
+
+## Important Developments & Announcements
+- What new products, tools, frameworks, or services are being launched?
+- What partnerships, acquisitions, or strategic moves are announced?
+- What are the timelines, roadmaps, or future plans discussed?
+
+## Practical Implications & Applications
+- How will this impact developers, engineers, or technical professionals?
+- What are the real-world use cases and applications?
+- What are the implementation challenges, requirements, or considerations?
+- What skills, tools, or knowledge should practitioners acquire?
+
+## Notable Tools, Frameworks & Methodologies
+- What specific technologies, libraries, or platforms are mentioned?
+- What are the technical requirements, dependencies, or setup instructions?
+- What are the pros/cons, trade-offs, or comparisons with alternatives?
+
+## Market & Industry Context
+- What are the business implications, market trends, or industry impact?
+- What are the competitive advantages or differentiators?
+- What are the potential risks, challenges, or limitations?
+
+## Actionable Takeaways
+- What should readers do next or how can they get started?
+- What are the key resources, documentation, or learning materials?
+- What are the immediate next steps or recommendations?
+
+Be thorough, specific, and technical. Include concrete details, numbers, and specific examples. Organize information clearly with bullet points and sub-bullets where appropriate."""
+
+# summary_style "structured": a compact JSON object the digest renders field by field
+STRUCTURED_INSTRUCTIONS = f"""Analyze this AI/technology article for a daily digest read by engineers. Respond with only a JSON object with these keys:
+
+{describe_schema(4)}
+
+Be specific: keep concrete names, numbers and examples, and do not repeat a point under several keys."""
+
+SECTION_INSTRUCTIONS = """This is one section of a longer AI/technology article. Extract its key technical insights, findings, announcements, tools, numbers and practical implications as concise bullet points. Keep concrete names, figures and examples; they will be merged with notes on the other sections."""
+
+BATCH_INSTRUCTIONS = """Apply the analysis instructions to each of the {count} articles below separately.
+Respond with only a JSON object mapping each article's number to its analysis as a markdown string, e.g. {{"1": "## Key Technical Insights...", "2": "..."}}."""
+
+STRUCTURED_BATCH_INSTRUCTIONS = """Apply the analysis instructions to each of the {count} articles below separately.
+Respond with only a JSON object mapping each article's number to its analysis object, e.g. {{"1": {{"tldr": "...", "insights": ["..."]}}, "2": {{...}}}}."""
+
+def parse_batch_response(text, count):
+    """Split a batched JSON response into {article number: analysis}, or {} if it is unusable
+
+    An analysis is a markdown string or, for structured summaries, a dict.
+    """
+    try:
+        data = json.loads(strip_code_fence(text))
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    
+    analyses = {}
+    for key, value in data.items():
+        if key not in {str(i) for i in range(1, count + 1)}:
+            continue
+        if isinstance(value, dict):
+            value = normalize_summary(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        if value:
+            analyses[key] = value
+    return analyses
 
 class GeminiSummarizer:
-    def __init__(self, config_path, state_manager=None):
+    def __init__(self, config_path, state_manager=None, manifest=None, telemetry=None, budget=None):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
         
-        # Configure Gemini
-        genai.configure(api_key=self.config['gemini']['api_key'])
-        self.model = genai.GenerativeModel(self.config['gemini']['model'])
-        
         self.summary_config = self.config['summarization']
+        
+        # Several API keys (projects) each bring their own quota; requests go to the one with the most headroom
+        self.key_pool = KeyPool.from_config(
+            self.config,
+            requests_per_minute=self.summary_config.get('requests_per_minute'),
+            tokens_per_minute=self.summary_config.get('tokens_per_minute')
+        )
+        
+        # Configure the LLM backend (Gemini unless gemini.yaml selects another)
+        self.backend = create_backend(self.config, api_key=self.key_pool.keys[0]['api_key'] if self.key_pool else None)
+        
+        # Routing rules send short pieces to a small model and long or high-value ones to a larger one
+        self.router = ModelRouter(self.config.get('routing'), self.backend.model_name)
+        self.route_backends = {}
+        self.route_lock = threading.Lock()
+        
         self.state_manager = state_manager
+        self.manifest = manifest
+        self.failure_reasons = {}
+        
+        # Summaries are cached by content so lost results are never paid for twice
+        self.summary_cache = None
+        cache_mb = self.summary_config.get('summary_cache_max_mb', 50)
+        if state_manager and cache_mb:
+            self.summary_cache = SummaryCache(state_manager.state_dir, max_bytes=cache_mb * 1024 * 1024)
+        
+        # Near-duplicate detection persists fingerprints; the summaries it reuses live in the cache
+        self.fingerprint_index = None
+        threshold = self.summary_config.get('near_duplicate_threshold', 0.9)
+        if self.summary_cache and threshold is not None:
+            self.fingerprint_index = FingerprintIndex(
+                state_manager.state_dir,
+                threshold=threshold,
+                min_words=self.summary_config.get('near_duplicate_min_words', 100),
+                retention_days=state_manager.retention_days
+            )
+        
+        # Articles are summarized by a bounded worker pool, kept within the API quota
+        # (per key on the pooled path; routes with their own llm section use these)
+        self.max_concurrency = self.summary_config.get('max_concurrency', 1)
+        requests_per_minute = self.summary_config.get('requests_per_minute')
+        tokens_per_minute = self.summary_config.get('tokens_per_minute')
+        self.request_limiter = RateLimiter(requests_per_minute, 60) if requests_per_minute else None
+        self.token_limiter = RateLimiter(tokens_per_minute, 60) if tokens_per_minute else None
+        
+        # Token counts come from a ratio calibrated once against the model's tokenizer
+        self.token_estimator = TokenEstimator(
+            self.backend.model_name,
+            count_tokens=self.backend.count_tokens,
+            state_dir=state_manager.state_dir if state_manager else None
+        )
+        self.max_article_tokens = self.summary_config.get('max_article_tokens')
+        self.stream = self.summary_config.get('stream', False)
+        
+        # Compact JSON summaries by default; "detailed_analysis" keeps the free-form markdown essay
+        self.summary_style = self.summary_config.get('summary_style', 'structured')
+        self.structured = self.summary_style == 'structured'
+        self.instructions = STRUCTURED_INSTRUCTIONS if self.structured else ANALYSIS_INSTRUCTIONS
+        self.batch_instructions = STRUCTURED_BATCH_INSTRUCTIONS if self.structured else BATCH_INSTRUCTIONS
+        
+        # Generation settings from gemini.yaml: max_output_tokens caps each article's summary,
+        # gemini.max_tokens caps any single response
+        gemini_config = self.config.get('gemini') or {}
+        self.temperature = gemini_config.get('temperature')
+        self.max_response_tokens = gemini_config.get('max_tokens')
+        self.max_output_tokens = self.summary_config.get('max_output_tokens')
+        
+        # Transient and quota errors are retried; a throttling API trips the circuit breaker
+        self.call_policy = ModelCallPolicy.from_config(self.summary_config)
+        
+        # Articles left for the next run (throttling, or the run's time/token budget), with the reason
+        self.budget = budget
+        self.deferred = {}
+        
+        # Share bars, subscribe prompts and footers are stripped before they are billed as input
+        self.strip_boilerplate = self.summary_config.get('strip_boilerplate', True)
+        self.boilerplate_patterns = self.summary_config.get('boilerplate_patterns') or None
+        self.tokens_saved = 0
+        
+        # Very long articles are cut down to their most central sentences (TextRank) before summarizing;
+        # with map-reduce on, only what would not fit max_sections sections is cut
+        self.extractive_max_tokens = self.summary_config.get('extractive_max_tokens')
+        if self.extractive_max_tokens and self.max_article_tokens:
+            map_reduce_capacity = self.max_article_tokens * self.summary_config.get('max_sections', 8)
+            self.extractive_max_tokens = max(self.extractive_max_tokens, map_reduce_capacity)
+        self.condensed_count = 0
+        self.tokens_condensed = 0
+        
+        # Off-topic articles (sponsor posts, job listings, events) never reach the model
+        self.relevance_filter = RelevanceFilter.from_config(self.config.get('relevance'))
+        self.filtered_count = 0
+        
+        # Every model call is recorded for the run report
+        self.telemetry = telemetry or RunTelemetry()
+        self.telemetry.add_pricing(self.config.get('pricing'))
     
     def extract_article_metadata(self, filepath):
         """Extract metadata from article markdown file"""
         try:
+            # Indexed articles only need their body read back from disk
+            if self.manifest:
+                article = self.manifest.load_article(filepath)
+                if article:
+                    return article
+            
             with open(filepath, 'r', encoding='utf-8') as f:
                 content = f.read()
             
@@ -55,6 +249,125 @@ class GeminiSummarizer:
             print(f"Error extracting metadata from {filepath}: {e}")
             return None
     
+    def clean_content(self, article_metadata):
+        """Strip boilerplate from the article body, counting the input tokens saved"""
+        if not self.strip_boilerplate:
+            return article_metadata
+        
+        content = article_metadata['content']
+        cleaned = clean_article_text(content, self.boilerplate_patterns)
+        if cleaned != content:
+            self.tokens_saved += max(0, self.token_estimator.estimate(content) - self.token_estimator.estimate(cleaned))
+        return {**article_metadata, 'content': cleaned}
+    
+    def condense_content(self, article_metadata):
+        """Shrink an article over the extractive budget to its most central sentences, counting the tokens cut"""
+        if not self.extractive_max_tokens:
+            return article_metadata
+        
+        content = article_metadata['content']
+        tokens = self.token_estimator.estimate(content)
+        if tokens <= self.extractive_max_tokens:
+            return article_metadata
+        
+        condensed = condense_text(content, self.extractive_max_tokens, self.token_estimator.estimate)
+        self.condensed_count += 1
+        self.tokens_condensed += max(0, tokens - self.token_estimator.estimate(condensed))
+        return {**article_metadata, 'content': condensed}
+    
+    def wait_for_quota(self, prompt, system=None):
+        """Block until a request fits the requests- and tokens-per-minute limits"""
+        if self.request_limiter:
+            self.request_limiter.acquire()
+        if self.token_limiter:
+            # System instructions still count towards the input-token quota
+            tokens = self.token_estimator.estimate(prompt)
+            if system:
+                tokens += self.token_estimator.estimate(system)
+            self.token_limiter.acquire(tokens)
+    
+    def route_for(self, article_metadata):
+        """Pick the routing rule for an article by its estimated size and source"""
+        return self.router.route(article_metadata['source'], self.token_estimator.estimate(article_metadata['content']))
+    
+    def uses_key_pool(self, route):
+        # A route with its own llm section talks to another server, with its own key
+        return self.key_pool is not None and not (route and 'llm' in route)
+    
+    def backend_for(self, route, key=None):
+        """Backend serving a route (with a pooled key), created on first use (a route may name its own llm section)"""
+        route = route or self.router.default
+        if key is None and route is self.router.default:
+            return self.backend
+        name = route['name'] if key is None else (route['name'], key['name'])
+        with self.route_lock:
+            if name not in self.route_backends:
+                config = dict(self.config, llm=route['llm']) if 'llm' in route else self.config
+                self.route_backends[name] = create_backend(config, model=route['model'],
+                                                           api_key=key['api_key'] if key else None)
+            return self.route_backends[name]
+    
+    def output_token_cap(self, route=None, outputs=1):
+        """Output tokens allowed for a response covering this many articles"""
+        per_article = (route.get('max_output_tokens') if route else None) or self.max_output_tokens
+        cap = per_article * outputs if per_article else None
+        if self.max_response_tokens:
+            cap = min(cap or self.max_response_tokens, self.max_response_tokens)
+        return cap
+    
+    def generate(self, prompt, system=None, source=None, kind='article', route=None, outputs=1, json_output=False):
+        """Send a prompt to the routed model within the rate limits and return the response text
+
+        The fixed instructions go in as a system instruction, so backends that
+        support one can reuse it across calls; others have it inlined. The
+        output cap is per article, so batches pass outputs.
+        """
+        backend = self.backend_for(route)
+        max_output_tokens = self.output_token_cap(route, outputs)
+        input_tokens = self.token_estimator.estimate(prompt) + (self.token_estimator.estimate(system) if system else 0)
+        
+        attempts = []
+        def attempt():
+            nonlocal backend
+            while True:
+                key = None
+                if self.uses_key_pool(route):
+                    key = self.key_pool.acquire(input_tokens)
+                    backend = self.backend_for(route, key)
+                else:
+                    self.wait_for_quota(prompt, system)
+                attempts.append(time.monotonic())
+                try:
+                    return backend.generate(prompt, stream=self.stream, system=system, max_output_tokens=max_output_tokens,
+                                            temperature=self.temperature, json_output=json_output)
+                except Exception as e:
+                    if key is None or classify_error(e) != QUOTA:
+                        raise
+                    # The throttled key leaves the rotation and the request moves straight to another key
+                    self.key_pool.throttle(key, retry_after(e))
+                    if not self.key_pool.available():
+                        raise
+        
+        if self.budget:
+            self.budget.reserve(input_tokens)
+        try:
+            response = self.call_policy.call(attempt)
+        except Exception as e:
+            self.telemetry.record('summarize', kind, backend.model_name, source, input_tokens=input_tokens,
+                                  latency=time.monotonic() - attempts[-1] if attempts else 0.0,
+                                  retries=max(0, len(attempts) - 1), ok=False, error=type(e).__name__)
+            raise
+        
+        output_tokens = self.token_estimator.estimate(response)
+        if self.budget:
+            self.budget.charge(output_tokens)
+        
+        # Latency covers the final attempt only; retries and quota waits are counted separately
+        self.telemetry.record('summarize', kind, backend.model_name, source, input_tokens=input_tokens,
+                              output_tokens=output_tokens, latency=time.monotonic() - attempts[-1],
+                              retries=len(attempts) - 1)
+        return response
+    
     def truncate_content(self, content, max_length):
         """Truncate content if too long"""
         if len(content) <= max_length:
@@ -68,110 +381,388 @@ class GeminiSummarizer:
         else:
             return truncated + "\n\n[Content truncated...]"
     
-    def summarize_article(self, article_metadata):
-        """Summarize a single article using Gemini"""
-        try:
-            content = article_metadata['content']
-            
-            # Truncate if too long
-            max_length = self.summary_config['max_article_length']
-            content = self.truncate_content(content, max_length)
-            
-            # Create prompt for detailed summary
-            prompt = f"""Please provide a comprehensive analysis of this AI/technology article. Extract and organize the most important information in detail:
+    def prepare_content(self, content):
+        """Apply the character cap, unless token budgeting handles long articles instead
 
-## Key Technical Insights & Findings
-- What are the main technical discoveries, research findings, or breakthrough insights?
-- What specific methodologies, algorithms, or approaches are discussed?
-- What are the technical specifications, performance metrics, or benchmarks mentioned?
+        Over-long content keeps its most central sentences rather than its
+        beginning; the prefix cut only remains for text with no sentence breaks.
+        """
+        if self.max_article_tokens:
+            return content
+        max_length = self.summary_config['max_article_length']
+        return self.truncate_content(condense_text(content, max_length), max_length)
+    
+    def build_prompt(self, article_metadata, content):
+        """Create the analysis prompt for one article (sent with the summary style's instructions)"""
+        return f"""Article Title: {article_metadata['title']}
+Source: {article_metadata['source']}
 
-## Important Developments & Announcements
-- What new products, tools, frameworks, or services are being launched?
-- What partnerships, acquisitions, or strategic moves are announced?
-- What are the timelines, roadmaps, or future plans discussed?
+Article Content:
+{content}
 
-## Practical Implications & Applications
-- How will this impact developers, engineers, or technical professionals?
-- What are the real-world use cases and applications?
-- What are the implementation challenges, requirements, or considerations?
-- What skills, tools, or knowledge should practitioners acquire?
+Detailed Analysis:"""
+    
+    def build_section_prompt(self, article_metadata, section, number, total):
+        """Create the prompt condensing one section of a long article (sent with SECTION_INSTRUCTIONS)"""
+        return f"""Article Title: {article_metadata['title']}
+Source: {article_metadata['source']}
 
-## Notable Tools, Frameworks & Methodologies
-- What specific technologies, libraries, or platforms are mentioned?
-- What are the technical requirements, dependencies, or setup instructions?
-- What are the pros/cons, trade-offs, or comparisons with alternatives?
+Section {number} of {total}:
+{section}
 
-## Market & Industry Context
-- What are the business implications, market trends, or industry impact?
-- What are the competitive advantages or differentiators?
-- What are the potential risks, challenges, or limitations?
+Section Notes:"""
+    
+    def build_reduce_prompt(self, article_metadata, notes):
+        """Create the prompt merging section notes into the full analysis"""
+        sections = "\n\n".join(f"### Section {i}\n{note}" for i, note in enumerate(notes, 1))
+        return f"""The article was too long to analyze in one pass, so it was split into {len(notes)} sections and condensed into the notes below. Base your analysis on all of them.
 
-## Actionable Takeaways
-- What should readers do next or how can they get started?
-- What are the key resources, documentation, or learning materials?
-- What are the immediate next steps or recommendations?
+Article Title: {article_metadata['title']}
+Source: {article_metadata['source']}
 
-Be thorough, specific, and technical. Include concrete details, numbers, and specific examples. Organize information clearly with bullet points and sub-bullets where appropriate.
+{sections}
 
+Detailed Analysis:"""
+    
+    def build_batch_prompt(self, articles):
+        """Create one prompt covering several (metadata, content) pairs"""
+        sections = [
+            f"""=== Article {i} ===
 Article Title: {article_metadata['title']}
 Source: {article_metadata['source']}
 
 Article Content:
-{content}
+{content}"""
+            for i, (article_metadata, content) in enumerate(articles, 1)
+        ]
+        return f"""{self.batch_instructions.format(count=len(articles))}
 
-Detailed Analysis:"""
-
-            # Generate summary
-            response = self.model.generate_content(prompt)
-            summary = response.text.strip()
+""" + "\n\n".join(sections)
+    
+    def parse_summary(self, response):
+        """Decode a structured response, keeping the raw text if the model ignored the format"""
+        if not self.structured:
+            return response
+        structured = parse_structured_summary(response)
+        if structured is None:
+            print("    Response was not a structured summary; keeping it as text")
+            return response
+        return structured
+    
+    def build_summary(self, article_metadata, summary, route=None):
+        """Summary record for the digest; structured analyses keep their fields and use the tldr as text"""
+        route = route or self.router.default
+        result = {
+            'title': article_metadata['title'],
+            'source': article_metadata['source'],
+            'date': article_metadata['date'],
+            'url': article_metadata['url'],
+            'summary': summary,
+            'filename': article_metadata['filename'],
+            'route': route['name'],
+            'model': route['model']
+        }
+        if isinstance(summary, dict):
+            result['summary'] = summary['tldr']
+            result['structured'] = summary
+        return result
+    
+    def lookup_cached_summary(self, article_metadata, content, route=None):
+        """Return the cache key for the content and its cached summary, if any"""
+        if not self.summary_cache:
+            return None, None
+        model = (route or self.router.default)['model']
+        cache_key = SummaryCache.key(content, f'{PROMPT_VERSION}:{self.summary_style}', model)
+        summary = self.summary_cache.get(cache_key)
+        if summary is not None:
+            self.telemetry.record('summarize', 'article', model, article_metadata['source'], cache_hit=True)
+        return cache_key, summary
+    
+    def store_cached_summary(self, cache_key, summary):
+        if self.summary_cache:
+            self.summary_cache.put(cache_key, summary)
+    
+    def summarize_article(self, article_metadata, cache_miss=None):
+        """Summarize a single article using Gemini
+        
+        `cache_miss` is the (content, cache_key) of a cache lookup the caller
+        already made and missed, so it isn't repeated.
+        """
+        try:
+            route = self.route_for(article_metadata)
+            if cache_miss:
+                content, cache_key = cache_miss
+                summary = None
+            else:
+                content = self.prepare_content(article_metadata['content'])
+                # A cached summary of identical content skips the API call entirely
+                cache_key, summary = self.lookup_cached_summary(article_metadata, content, route)
             
-            return {
-                'title': article_metadata['title'],
-                'source': article_metadata['source'],
-                'date': article_metadata['date'],
-                'url': article_metadata['url'],
-                'summary': summary,
-                'filename': article_metadata['filename']
-            }
+            # Generate summary
+            if summary is None:
+                if self.max_article_tokens and self.token_estimator.estimate(content) > self.max_article_tokens:
+                    summary = self.map_reduce_summary(article_metadata, content, route)
+                else:
+                    summary = self.parse_summary(self.generate(
+                        self.build_prompt(article_metadata, content), system=self.instructions,
+                        source=article_metadata['source'], route=route, json_output=self.structured))
+                self.store_cached_summary(cache_key, summary)
             
+            return self.build_summary(article_metadata, summary, route)
+        
+        except DEFERRAL_ERRORS as e:
+            # Not the article's fault, so it is left for a later run without using up a retry
+            self.deferred[article_metadata['filename']] = str(e)
+            return None
         except Exception as e:
             print(f"Error summarizing article {article_metadata['title']}: {e}")
+            self.failure_reasons[article_metadata['filename']] = f"{type(e).__name__}: {e}"[:200]
             return None
     
-    def summarize_articles(self, article_files):
-        """Summarize multiple articles with retry logic"""
-        summaries = []
+    def map_reduce_summary(self, article_metadata, content, route=None):
+        """Summarize an oversized article section by section, then merge the section notes"""
+        total_tokens = self.token_estimator.estimate(content)
+        
+        # Very long articles get larger sections so the number of requests stays bounded
+        max_sections = self.summary_config.get('max_sections', 8)
+        section_tokens = max(self.max_article_tokens, math.ceil(total_tokens / max_sections))
+        sections = split_into_chunks(content, section_tokens, self.token_estimator)
+        print(f"    Long article (~{total_tokens} tokens): summarizing {len(sections)} sections")
+        
+        def summarize_section(numbered):
+            number, section = numbered
+            prompt = self.build_section_prompt(article_metadata, section, number, len(sections))
+            return self.generate(prompt, system=SECTION_INSTRUCTIONS, source=article_metadata['source'], kind='section',
+                                 route=route)
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            notes = list(executor.map(summarize_section, enumerate(sections, 1)))
+        
+        return self.parse_summary(self.generate(
+            self.build_reduce_prompt(article_metadata, notes), system=self.instructions,
+            source=article_metadata['source'], kind='reduce', route=route, json_output=self.structured))
+    
+    def plan_batches(self, articles):
+        """Group short articles on the same route into shared requests; everything else is sent on its own"""
+        max_words = self.summary_config.get('batch_max_words')
+        if not max_words:
+            return [[article] for article in articles]
+        
+        max_articles = self.summary_config.get('batch_max_articles', 5)
+        token_budget = self.summary_config.get('batch_token_budget', 8000)
+        units = []
+        batches = {}
+        for article in articles:
+            if len(article['content'].split()) > max_words:
+                units.append([article])
+                continue
+            
+            tokens = self.token_estimator.estimate(article['content'])
+            route = self.route_for(article)['name']
+            batch, batch_tokens = batches.get(route, ([], 0))
+            if batch and (len(batch) >= max_articles or batch_tokens + tokens > token_budget):
+                units.append(batch)
+                batch, batch_tokens = [], 0
+            batches[route] = (batch + [article], batch_tokens + tokens)
+        
+        units.extend(batch for batch, _ in batches.values())
+        return units
+    
+    def summarize_unit(self, articles):
+        """Summarize one planned unit of work, returning a summary (or None) per article"""
+        if len(articles) == 1:
+            return [self.summarize_article(articles[0])]
+        return self.summarize_batch(articles)
+    
+    def summarize_batch(self, articles):
+        """Summarize several short articles in one request, falling back to one request each"""
+        results = {}
+        pending = []
+        route = self.route_for(articles[0])
+        for article_metadata in articles:
+            content = self.prepare_content(article_metadata['content'])
+            cache_key, summary = self.lookup_cached_summary(article_metadata, content, route)
+            if summary is not None:
+                results[article_metadata['filename']] = self.build_summary(article_metadata, summary, route)
+            else:
+                pending.append((article_metadata, content, cache_key))
+        
+        if len(pending) > 1:
+            prompt = self.build_batch_prompt([(article_metadata, content) for article_metadata, content, _ in pending])
+            try:
+                # A batch is attributed to its source when all its articles share one
+                sources = {article_metadata['source'] for article_metadata, _, _ in pending}
+                source = sources.pop() if len(sources) == 1 else 'multiple'
+                response = self.generate(prompt, system=self.instructions, source=source, kind='batch',
+                                         route=route, outputs=len(pending), json_output=self.structured)
+                analyses = parse_batch_response(response, len(pending))
+            except DEFERRAL_ERRORS as e:
+                # Sending each article on its own would hit the same wall
+                for article_metadata, _, _ in pending:
+                    self.deferred[article_metadata['filename']] = str(e)
+                    results[article_metadata['filename']] = None
+                return [results[article_metadata['filename']] for article_metadata in articles]
+            except Exception as e:
+                print(f"Error summarizing batch of {len(pending)} articles: {e}")
+                analyses = {}
+            
+            for i, (article_metadata, content, cache_key) in enumerate(pending, 1):
+                summary = analyses.get(str(i))
+                if summary:
+                    results[article_metadata['filename']] = self.build_summary(article_metadata, summary, route)
+                    self.store_cached_summary(cache_key, summary)
+            
+            if len(analyses) < len(pending):
+                print(f"    Batch response covered {len(analyses)}/{len(pending)} articles; retrying the rest individually")
+        
+        # Anything the batch did not cover gets its own request, without a second cache lookup
+        for article_metadata, content, cache_key in pending:
+            if article_metadata['filename'] not in results:
+                results[article_metadata['filename']] = self.summarize_article(article_metadata, (content, cache_key))
+        return [results[article_metadata['filename']] for article_metadata in articles]
+    
+    def find_reusable_duplicate(self, fingerprint, filename):
+        """The closest indexed near-duplicate whose summary is still cached, with its similarity"""
+        for match in self.fingerprint_index.near_duplicates(fingerprint, exclude_filename=filename):
+            record = self.summary_cache.get_article(match['filename'])
+            if record:
+                return dict(record, similarity=match['similarity'])
+        return None
+    
+    def reuse_summary(self, article_metadata, duplicate):
+        """Build a summary for a near-duplicate article from the original's summary"""
+        self.telemetry.record('summarize', 'near_duplicate', self.backend.model_name, article_metadata['source'], cache_hit=True)
+        summary = {
+            'title': article_metadata['title'],
+            'source': article_metadata['source'],
+            'date': article_metadata['date'],
+            'url': article_metadata['url'],
+            'summary': duplicate['summary'],
+            'filename': article_metadata['filename'],
+            'duplicate_of': {
+                'title': duplicate['title'],
+                'source': duplicate['source'],
+                'url': duplicate['url'],
+                'filename': duplicate['filename'],
+                'similarity': round(duplicate['similarity'], 3)
+            }
+        }
+        if duplicate.get('structured'):
+            summary['structured'] = duplicate['structured']
+        return summary
+    
+    def summarize_articles(self, article_files, on_summary=None):
+        """Summarize multiple articles concurrently, within the configured rate limits
+
+        on_summary, if given, is called with each summary as soon as it is ready.
+        """
+        results = {}
         successful_files = []
         failed_files = []
+        failure_reasons = {}
+        filtered_scores = {}
         
-        for filepath in article_files:
+        # Articles released with --unfilter skip the relevance filter
+        unfiltered = self.state_manager.get_unfiltered_articles() if self.state_manager and self.relevance_filter else set()
+        
+        # Metadata and fingerprints are cheap, so they are prepared up front
+        pending = []
+        for position, filepath in enumerate(article_files):
             filename = os.path.basename(filepath)
-            print(f"  Summarizing: {filename}...")
-            
-            # Extract metadata
             metadata = self.extract_article_metadata(filepath)
             if not metadata:
-                print(f"    Failed to extract metadata")
+                print(f"  {filename}: failed to extract metadata")
                 failed_files.append(filename)
+                failure_reasons[filename] = 'Failed to extract metadata'
                 continue
+            metadata = self.clean_content(metadata)
             
-            # Summarize article
-            summary = self.summarize_article(metadata)
-            if summary:
-                summaries.append(summary)
-                successful_files.append(filename)
-                print(f"    ✅ Success")
-            else:
-                print(f"    ❌ Failed to summarize")
-                failed_files.append(filename)
+            if self.relevance_filter and filename not in unfiltered:
+                relevant, score = self.relevance_filter.check(metadata)
+                if not relevant:
+                    print(f"  🚫 {filename}: relevance {score:.1f} below threshold, skipped")
+                    filtered_scores[filename] = round(score, 2)
+                    continue
+            
+            fingerprint = None
+            if self.fingerprint_index:
+                fingerprint = self.fingerprint_index.fingerprint(metadata['content'])
+            pending.append((position, self.condense_content(metadata), fingerprint))
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while pending:
+                round_items, deferred = [], []
+                for item in pending:
+                    position, metadata, fingerprint = item
+                    if self.fingerprint_index:
+                        # Reuse the summary of a near-duplicate we have already paid for
+                        duplicate = self.find_reusable_duplicate(fingerprint, metadata['filename'])
+                        if duplicate:
+                            results[position] = self.reuse_summary(metadata, duplicate)
+                            successful_files.append(metadata['filename'])
+                            if on_summary:
+                                on_summary(results[position])
+                            print(f"  ♻️  {metadata['filename']}: near-duplicate of {duplicate['source']}: {duplicate['title'][:50]} (summary reused)")
+                            continue
+                        
+                        # A cross-post of an article in this round waits for that article's summary
+                        if self.fingerprint_index.matches_any(fingerprint, [other[2] for other in round_items]):
+                            deferred.append(item)
+                            continue
+                    round_items.append(item)
+                
+                # Short articles may share a request; each unit runs on one worker
+                units = self.plan_batches([metadata for _, metadata, _ in round_items])
+                for unit in units:
+                    if len(unit) > 1:
+                        print(f"  Summarizing batch: {', '.join(metadata['filename'] for metadata in unit)}...")
+                    else:
+                        print(f"  Summarizing: {unit[0]['filename']}...")
+                
+                outcomes = {}
+                futures = {executor.submit(self.summarize_unit, unit): unit for unit in units}
+                for future in as_completed(futures):
+                    for metadata, summary in zip(futures[future], future.result()):
+                        outcomes[metadata['filename']] = summary
+                        if summary and on_summary:
+                            on_summary(summary)
+                
+                for position, metadata, fingerprint in round_items:
+                    filename = metadata['filename']
+                    summary = outcomes[filename]
+                    if summary:
+                        results[position] = summary
+                        successful_files.append(filename)
+                        if self.fingerprint_index and fingerprint is not None:
+                            self.fingerprint_index.add(fingerprint, filename)
+                            self.summary_cache.put_article(summary)
+                        print(f"    ✅ {filename}")
+                    elif filename in self.deferred:
+                        print(f"    ⏸️  Deferred {filename}: {self.deferred.pop(filename)}")
+                    else:
+                        print(f"    ❌ Failed to summarize {filename}")
+                        failed_files.append(filename)
+                        failure_reasons[filename] = self.failure_reasons.pop(filename, None)
+                
+                pending = deferred
+        
+        if self.fingerprint_index:
+            self.fingerprint_index.save()
+        if self.summary_cache:
+            self.summary_cache.evict()
         
         # Update state tracking
         if self.state_manager:
-            if successful_files:
-                self.state_manager.add_processed_articles(successful_files)
-                self.state_manager.clear_failed_articles(successful_files)
+            with self.state_manager.batch():
+                if successful_files:
+                    self.state_manager.add_processed_articles(successful_files)
+                    self.state_manager.clear_failed_articles(successful_files)
             
-            if failed_files:
-                self.state_manager.add_failed_articles(failed_files)
+                if failed_files:
+                    self.state_manager.add_failed_articles(failed_files, failure_reasons)
+                
+                if filtered_scores:
+                    self.state_manager.add_filtered_articles(filtered_scores)
+        self.filtered_count += len(filtered_scores)
         
-        return summaries
+        return [results[position] for position in sorted(results)]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+from state_manager import atomic_write_json
+
+class SummaryCache:
+    """Persistent summaries keyed by a hash of the content, prompt version and model
+
+    Each entry is a small JSON file, so concurrent runs can share the cache
+    without locking. Hits refresh the file's mtime and eviction removes the
+    least recently used entries once the cache grows past max_bytes.
+    """
+    
+    def __init__(self, state_dir, max_bytes=50 * 1024 * 1024):
+        self.cache_dir = os.path.join(state_dir, 'summary_cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+    
+    @staticmethod
+    def key(content, prompt_version, model) -> str:
+        digest = hashlib.sha256()
+        for part in (str(prompt_version), model, content):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+    
+    def get(self, key) -> Optional[str]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)['summary']
+            os.utime(path)
+        except (OSError, json.JSONDecodeError, KeyError):
+            summary = None
+        
+        with self.lock:
+            if summary is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return summary
+    
+    def put(self, key, summary):
+        atomic_write_json(self._path(key), {'summary': summary})
+        with self.lock:
+            self.writes += 1
+    
+    @staticmethod
+    def article_key(filename) -> str:
+        return 'article-' + hashlib.sha256(filename.encode('utf-8')).hexdigest()
+    
+    def get_article(self, filename) -> Optional[Dict]:
+        """Full summary record of an indexed article, for near-duplicate reuse; not counted as a lookup"""
+        path = self._path(self.article_key(filename))
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)['summary']
+            os.utime(path)
+        except (OSError, json.JSONDecodeError, KeyError):
+            return None
+        return record
+    
+    def put_article(self, summary):
+        atomic_write_json(self._path(self.article_key(summary['filename'])), {'summary': summary})
+    
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+    
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'lookups': lookups,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
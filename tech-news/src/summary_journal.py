@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+class SummaryJournal:
+    """Append-only JSONL log of finished summaries, one file per digest day in .state/summary_journal/
+
+    Each summary is appended as soon as it is produced, with one write on an
+    O_APPEND descriptor so concurrent runs never interleave lines. fsync is
+    batched (every fsync_every summaries or fsync_interval seconds, and on
+    close), so a crash loses at most that many summaries to a power cut and
+    none to a killed process. A torn last line is skipped on read.
+    
+    A run passes its start date, so everything it journals lands in that
+    day's file even if the run goes past midnight.
+    """
+    
+    def __init__(self, state_dir, fsync_every=10, fsync_interval=5.0, retention_days=14, date=None):
+        self.journal_dir = os.path.join(state_dir, 'summary_journal')
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.retention_days = retention_days
+        self.date = date
+        self.fd = None
+        self.fd_path = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def today(self) -> str:
+        return self.date or datetime.now().strftime('%Y-%m-%d')
+    
+    def path(self, date=None) -> str:
+        return os.path.join(self.journal_dir, f"{date or self.today()}.jsonl")
+    
+    def append(self, summary: Dict):
+        """Durably record one summary in the run's (or today's) journal"""
+        line = (json.dumps(summary, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.lock:
+            path = self.path()
+            if self.fd_path != path:
+                self._close()
+                self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                self.fd_path = path
+            os.write(self.fd, line)
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+                self._sync()
+    
+    def _sync(self):
+        if self.fd is not None and self.unsynced:
+            os.fsync(self.fd)
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+    
+    def _close(self):
+        if self.fd is not None:
+            self._sync()
+            os.close(self.fd)
+        self.fd = self.fd_path = None
+    
+    def sync(self):
+        with self.lock:
+            self._sync()
+    
+    def close(self):
+        with self.lock:
+            self._close()
+    
+    @staticmethod
+    def read(path) -> List[Dict]:
+        """Summaries in a journal file, the latest entry per article winning"""
+        summaries = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        summary = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write from a crash
+                    if isinstance(summary, dict) and summary.get('filename'):
+                        summaries[summary['filename']] = summary
+        except FileNotFoundError:
+            pass
+        return list(summaries.values())
+    
+    def entries(self, date=None) -> List[Dict]:
+        """Summaries journaled for a digest day (the run's day by default)"""
+        return self.read(self.path(date))
+    
+    def dates(self) -> List[str]:
+        return sorted(name[:-len('.jsonl')] for name in os.listdir(self.journal_dir) if name.endswith('.jsonl'))
+    
+    def prune(self) -> int:
+        """Remove journals older than retention_days"""
+        if not self.retention_days:
+            return 0
+        horizon = (datetime.now() - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        old = [date for date in self.dates() if date < horizon]
+        for date in old:
+            os.remove(self.path(date))
+        return len(old)
+    
+    def recover(self, processed: Set[str]) -> List[Dict]:
+        """Summaries an interrupted run journaled but never recorded as processed
+
+        Those from earlier days are journaled again under the run's day, so
+        they reach its digest.
+        """
+        self.prune()
+        today = self.today()
+        recovered = {}
+        for date in self.dates():
+            for summary in self.read(self.path(date)):
+                if summary['filename'] not in processed:
+                    recovered[summary['filename']] = (date, summary)
+        
+        for date, summary in recovered.values():
+            if date != today:
+                self.append(summary)
+        self.sync()
+        return [summary for _, summary in recovered.values()]
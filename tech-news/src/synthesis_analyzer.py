@@ -1,18 +1,25 @@
 import os
 import yaml
-import google.generativeai as genai
 from datetime import datetime
 import json
+import time
+from llm_backend import create_backend
+from model_policy import ModelCallPolicy
+from telemetry import RunTelemetry
+from token_budget import TokenEstimator
 
 class SynthesisAnalyzer:
-    def __init__(self, config_path, state_manager):
+    def __init__(self, config_path, state_manager, telemetry=None):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
         
-        # Configure Gemini
-        genai.configure(api_key=self.config['gemini']['api_key'])
-        self.model = genai.GenerativeModel(self.config['gemini']['model'])
+        # Configure the LLM backend (Gemini unless gemini.yaml selects another)
+        self.backend = create_backend(self.config)
+        self.call_policy = ModelCallPolicy.from_config(self.config.get('summarization', {}))
         self.state_manager = state_manager
+        self.telemetry = telemetry or RunTelemetry()
+        self.telemetry.add_pricing(self.config.get('pricing'))
+        self.token_estimator = TokenEstimator(self.backend.model_name, state_dir=getattr(state_manager, 'state_dir', None))
     
     def analyze_all_articles(self):
         """Read all articles and analyze for common themes"""
@@ -70,13 +77,26 @@ Here are the recent articles you've been following:
 
 Write a comprehensive analysis piece that showcases your insights and analysis of the current technology landscape.
 """
-
+        
+        attempts = []
+        def attempt():
+            attempts.append(time.monotonic())
+            return self.backend.generate(prompt)
+        
+        input_tokens = self.token_estimator.estimate(prompt)
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            synthesis = self.call_policy.call(attempt)
         except Exception as e:
             print(f"Error generating synthesis: {e}")
+            self.telemetry.record('synthesis', 'synthesis', self.backend.model_name, 'all', input_tokens=input_tokens,
+                                  latency=time.monotonic() - attempts[-1] if attempts else 0.0,
+                                  retries=max(0, len(attempts) - 1), ok=False, error=type(e).__name__)
             return None
+        
+        self.telemetry.record('synthesis', 'synthesis', self.backend.model_name, 'all', input_tokens=input_tokens,
+                              output_tokens=self.token_estimator.estimate(synthesis),
+                              latency=time.monotonic() - attempts[-1], retries=len(attempts) - 1)
+        return synthesis
     
     def save_synthesis(self, synthesis_text):
         """Save the synthesized analysis to a file"""
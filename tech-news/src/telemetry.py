@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from state_manager import atomic_write, atomic_write_json
+
+METRIC_PREFIX = 'technews_llm_last_run'
+
+# Rolled-up counters, exported to Prometheus under the same names
+COUNTERS = ['calls', 'failures', 'cache_hits', 'retries', 'input_tokens', 'output_tokens', 'latency_seconds', 'cost_usd']
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prune_reports(reports_dir, retention_days) -> int:
+    """Remove run reports last written more than retention_days ago"""
+    horizon = time.time() - retention_days * 86400
+    removed = 0
+    for entry in os.scandir(reports_dir):
+        if not (entry.name.startswith('run_') and entry.name.endswith('.json')):
+            continue
+        try:
+            if entry.stat().st_mtime < horizon:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+class RunTelemetry:
+    """Per-call model metrics for one run, rolled up into a JSON report and a Prometheus textfile
+
+    Token counts are estimates from the calibrated TokenEstimator; cost uses
+    the per-model prices in the pricing section of gemini.yaml, if any.
+    """
+    
+    def __init__(self, pricing: Optional[Dict] = None):
+        self.pricing = dict(pricing or {})
+        self.calls: List[Dict] = []
+        self.started = time.time()
+        self.lock = threading.Lock()
+    
+    def add_pricing(self, pricing: Optional[Dict]):
+        """Merge a model -> {input_per_million, output_per_million} price table"""
+        with self.lock:
+            self.pricing.update(pricing or {})
+    
+    def cost(self, model, input_tokens, output_tokens) -> float:
+        prices = self.pricing.get(model) or {}
+        return (input_tokens * prices.get('input_per_million', 0.0)
+                + output_tokens * prices.get('output_per_million', 0.0)) / 1_000_000
+    
+    def record(self, component, kind, model, source=None, input_tokens=0, output_tokens=0,
+               latency=0.0, retries=0, cache_hit=False, ok=True, error=None):
+        """Record one model call (or one call avoided by a cache hit)"""
+        call = {
+            'timestamp': time.time(),
+            'component': component,
+            'kind': kind,
+            'model': model,
+            'source': source or 'unknown',
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'latency_seconds': round(latency, 3),
+            'retries': retries,
+            'cache_hit': cache_hit,
+            'ok': ok,
+            'error': error
+        }
+        with self.lock:
+            call['cost_usd'] = self.cost(model, input_tokens, output_tokens)
+            self.calls.append(call)
+    
+    def _rollup(self, calls) -> Dict:
+        totals = dict.fromkeys(COUNTERS, 0)
+        for call in calls:
+            totals['calls'] += 0 if call['cache_hit'] else 1
+            totals['failures'] += 0 if call['ok'] else 1
+            totals['cache_hits'] += 1 if call['cache_hit'] else 0
+            for field in ('retries', 'input_tokens', 'output_tokens', 'latency_seconds', 'cost_usd'):
+                totals[field] += call[field]
+        
+        latencies = [call['latency_seconds'] for call in calls if not call['cache_hit']]
+        totals['latency_p50_seconds'] = percentile(latencies, 0.5)
+        totals['latency_p95_seconds'] = percentile(latencies, 0.95)
+        totals['latency_seconds'] = round(totals['latency_seconds'], 3)
+        return totals
+    
+    def _group(self, calls, field) -> Dict:
+        groups = {}
+        for call in calls:
+            groups.setdefault(call[field], []).append(call)
+        return {name: self._rollup(members) for name, members in sorted(groups.items())}
+    
+    def summary(self) -> Dict:
+        with self.lock:
+            calls = list(self.calls)
+        return {
+            'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'duration_seconds': round(time.time() - self.started, 3),
+            'totals': self._rollup(calls),
+            'by_source': self._group(calls, 'source'),
+            'by_model': self._group(calls, 'model'),
+            'by_kind': self._group(calls, 'kind'),
+            'calls': calls
+        }
+    
+    def prometheus(self, summary) -> str:
+        """Render gauges labelled by source and model in the Prometheus text exposition format"""
+        groups = {}
+        for call in summary['calls']:
+            groups.setdefault((call['source'], call['model']), []).append(call)
+        rollups = {labels: self._rollup(calls) for labels, calls in sorted(groups.items())}
+        
+        lines = []
+        for counter in COUNTERS:
+            name = f'{METRIC_PREFIX}_{counter}'
+            lines.append(f'# HELP {name} Model {counter.replace("_", " ")} in the last run')
+            lines.append(f'# TYPE {name} gauge')
+            for (source, model), totals in rollups.items():
+                lines.append(f'{name}{{source="{escape_label(source)}",model="{escape_label(model)}"}} {totals[counter]}')
+        
+        lines.append(f'# HELP {METRIC_PREFIX}_timestamp_seconds When the last run finished')
+        lines.append(f'# TYPE {METRIC_PREFIX}_timestamp_seconds gauge')
+        lines.append(f'{METRIC_PREFIX}_timestamp_seconds {time.time():.0f}')
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, state_dir, retention_days=None) -> Optional[str]:
+        """Write the run report to .state/run_reports/ and the metrics to .state/llm_metrics.prom
+
+        Reports older than retention_days are removed.
+        """
+        if not self.calls:
+            return None
+        
+        summary = self.summary()
+        reports_dir = os.path.join(state_dir, 'run_reports')
+        os.makedirs(reports_dir, exist_ok=True)
+        report_path = os.path.join(reports_dir, f"run_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        atomic_write_json(report_path, summary)
+        if retention_days:
+            prune_reports(reports_dir, retention_days)
+        
+        # node_exporter's textfile collector usually runs as another user
+        metrics = self.prometheus(summary)
+        metrics_path = os.path.join(state_dir, 'llm_metrics.prom')
+        atomic_write(metrics_path, lambda f: f.write(metrics))
+        os.chmod(metrics_path, 0o644)
+        return report_path
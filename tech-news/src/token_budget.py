@@ -0,0 +1,95 @@
+import json
+import math
+import os
+import re
+import threading
+from typing import Callable, List, Optional
+from state_manager import atomic_write_json
+
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+# Calibration needs enough text for the ratio to be representative
+CALIBRATION_MIN_CHARS = 2000
+CALIBRATION_SAMPLE_CHARS = 20000
+
+class TokenEstimator:
+    """Estimates token counts from a characters-per-token ratio calibrated once per model
+
+    The ratio is measured with the model's own tokenizer the first time a
+    long enough text is seen and cached in the state directory, so later
+    estimates cost no API calls.
+    """
+    
+    def __init__(self, model_name, count_tokens: Optional[Callable] = None, state_dir=None):
+        self.model_name = model_name
+        self.count_tokens = count_tokens
+        self.cache_file = os.path.join(state_dir, 'token_calibration.json') if state_dir else None
+        self.lock = threading.Lock()
+        self.chars_per_token = self._load_ratio()
+    
+    def _load_ratio(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f).get(self.model_name)
+        except (OSError, json.JSONDecodeError):
+            return None
+    
+    def _calibrate(self, text):
+        """Measure the model's characters-per-token ratio on a sample of text"""
+        sample = text[:CALIBRATION_SAMPLE_CHARS]
+        try:
+            tokens = self.count_tokens(sample)
+            ratio = len(sample) / tokens
+        except Exception as e:
+            print(f"Token calibration failed, assuming {DEFAULT_CHARS_PER_TOKEN} characters per token: {e}")
+            self.count_tokens = None
+            return
+        
+        self.chars_per_token = ratio
+        if self.cache_file:
+            ratios = {}
+            if os.path.exists(self.cache_file):
+                try:
+                    with open(self.cache_file, 'r') as f:
+                        ratios = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    ratios = {}
+            ratios[self.model_name] = ratio
+            atomic_write_json(self.cache_file, ratios)
+    
+    def estimate(self, text) -> int:
+        if self.chars_per_token is None and self.count_tokens and len(text) >= CALIBRATION_MIN_CHARS:
+            with self.lock:
+                if self.chars_per_token is None and self.count_tokens:
+                    self._calibrate(text)
+        return math.ceil(len(text) / (self.chars_per_token or DEFAULT_CHARS_PER_TOKEN))
+
+def split_into_chunks(text, max_tokens, estimator: TokenEstimator) -> List[str]:
+    """Split text into chunks of at most max_tokens, preferring paragraph then sentence breaks"""
+    max_chars = max(1, int(max_tokens * (estimator.chars_per_token or DEFAULT_CHARS_PER_TOKEN)))
+    
+    # Break oversized paragraphs into sentences, and oversized sentences into slices
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+            pieces.extend(sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars))
+    
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        candidate = f'{current}\n\n{piece}' if current else piece
+        if len(candidate) > max_chars and current:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
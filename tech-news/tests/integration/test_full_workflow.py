@@ -13,7 +13,7 @@ from digest_builder import DigestBuilder
 
 class TestFullWorkflow:
     
-    @patch('summarizer.genai')
+    @patch('llm_backend.genai')
     @patch('requests.get')
     @patch('feedparser.parse')
     def test_complete_workflow(self, mock_feedparser, mock_requests, mock_genai, temp_dir):
@@ -0,0 +1,117 @@
+import pytest
+import os
+import sys
+import json
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from article_manifest import ArticleManifest, parse_article_header
+from fetcher import SubstackFetcher
+
+def make_fetcher(temp_dir, manifest):
+    """Build a fetcher that writes into temp_dir/articles"""
+    config_file = os.path.join(temp_dir, 'substacks.yaml')
+    with open(config_file, 'w') as f:
+        f.write('substacks: []\nsettings: {}\n')
+    fetcher = SubstackFetcher(config_file, manifest)
+    fetcher.articles_dir = manifest.articles_dir
+    return fetcher
+
+class TestArticleManifest:
+    
+    def test_fetcher_records_articles(self, temp_dir):
+        """Test that written articles are indexed with their metadata and body offset"""
+        manifest = ArticleManifest(os.path.join(temp_dir, '.state'), os.path.join(temp_dir, 'articles'))
+        fetcher = make_fetcher(temp_dir, manifest)
+        
+        path = fetcher.write_article('src', 'Source Name', 'Hello World', 'https://example.com/hello',
+                                     datetime(2025, 9, 19, 10, 0), 'Body text ✨')
+        
+        entry = manifest.get('src-2025-09-19-Hello-World.md')
+        assert entry['title'] == 'Hello World'
+        assert entry['source'] == 'Source Name'
+        assert entry['date'] == '2025-09-19 10:00'
+        assert manifest.get_by_url('https://example.com/hello') == entry
+        assert manifest.article_paths() == [path]
+        assert manifest.load_article(path)['content'] == 'Body text ✨'
+        
+        # The header parser used for rebuilds agrees with what the fetcher recorded
+        parsed = parse_article_header(path)
+        assert parsed == entry
+    
+    def test_refetch_does_not_grow_manifest(self, temp_dir):
+        """Test that rewriting an unchanged article appends nothing"""
+        manifest = ArticleManifest(os.path.join(temp_dir, '.state'), os.path.join(temp_dir, 'articles'))
+        fetcher = make_fetcher(temp_dir, manifest)
+        
+        for _ in range(3):
+            fetcher.write_article('src', 'Source', 'Title', 'https://example.com/t',
+                                  datetime(2025, 9, 19), 'Body')
+        
+        with open(manifest.manifest_file) as f:
+            assert len(f.readlines()) == 1
+    
+    def test_other_processes_see_new_entries(self, temp_dir):
+        """Test that refresh picks up entries appended by another manifest instance"""
+        state_dir = os.path.join(temp_dir, '.state')
+        articles_dir = os.path.join(temp_dir, 'articles')
+        reader = ArticleManifest(state_dir, articles_dir)
+        assert reader.article_paths() == []
+        
+        writer = ArticleManifest(state_dir, articles_dir)
+        make_fetcher(temp_dir, writer).write_article('src', 'Source', 'New', 'https://example.com/new',
+                                                     datetime(2025, 9, 19), 'Body')
+        
+        reader.refresh()
+        assert reader.get('src-2025-09-19-New.md')['url'] == 'https://example.com/new'
+    
+    def test_concurrent_first_load_sees_every_entry_once(self, temp_dir):
+        """Test that threads racing to load the manifest all see the complete index"""
+        state_dir = os.path.join(temp_dir, '.state')
+        os.makedirs(state_dir)
+        with open(os.path.join(state_dir, 'article_manifest.jsonl'), 'w') as f:
+            for i in range(2000):
+                f.write(json.dumps({'filename': f'a{i}.md', 'title': 'T', 'source': 'S', 'date': '2025-09-19',
+                                    'url': f'https://example.com/{i}', 'body_offset': 0}) + '\n')
+        
+        manifest = ArticleManifest(state_dir, os.path.join(temp_dir, 'articles'))
+        found = []
+        start = threading.Barrier(8)
+        
+        def lookup():
+            start.wait()
+            found.append(manifest.get_by_url('https://example.com/1999'))
+        
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert all(entry and entry['filename'] == 'a1999.md' for entry in found)
+        assert len(manifest.entries) == 2000
+        assert manifest.read_offset == os.path.getsize(manifest.manifest_file)
+    
+    def test_bootstraps_from_existing_articles(self, temp_dir, sample_article_content):
+        """Test that a missing manifest is built once from the articles directory"""
+        articles_dir = os.path.join(temp_dir, 'articles')
+        os.makedirs(articles_dir)
+        with open(os.path.join(articles_dir, 'test-2025-09-19-article.md'), 'w') as f:
+            f.write(sample_article_content)
+        
+        manifest = ArticleManifest(os.path.join(temp_dir, '.state'), articles_dir)
+        article = manifest.load_article(os.path.join(articles_dir, 'test-2025-09-19-article.md'))
+        
+        assert article['title'] == 'Test Article Title'
+        assert article['url'] == 'https://example.com/test-article'
+        assert article['content'].startswith('This is a test article')
+        
+        # Later instances read the manifest and never parse article files
+        with patch('article_manifest.parse_article_header') as parse:
+            reloaded = ArticleManifest(os.path.join(temp_dir, '.state'), articles_dir)
+            assert len(reloaded.article_paths()) == 1
+            parse.assert_not_called()
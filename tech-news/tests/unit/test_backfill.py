@@ -0,0 +1,144 @@
+import pytest
+import os
+import sys
+from unittest.mock import Mock, patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from backfill import ArchiveBackfiller
+
+def make_fetcher(articles_dir):
+    """Build a fetcher stand-in that writes articles into articles_dir"""
+    fetcher = Mock()
+    fetcher.articles_dir = articles_dir
+    fetcher.manifest = None
+    fetcher.substacks = [{
+        'name': 'Test Substack',
+        'slug': 'test-substack',
+        'base_url': 'https://test.substack.com'
+    }]
+    fetcher.format_article_filename.side_effect = \
+        lambda slug, title, pub_date: f"{slug}-{pub_date.strftime('%Y-%m-%d')}-{title}.md"
+    fetcher.extract_article_content.return_value = "Archived article content"
+    
+    def write_article(slug, source_name, title, link, pub_date, content):
+        path = os.path.join(articles_dir, fetcher.format_article_filename(slug, title, pub_date))
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+    
+    fetcher.write_article.side_effect = write_article
+    return fetcher
+
+def archive_page(start, count):
+    return [{
+        'title': f'Post{i}',
+        'canonical_url': f'https://test.substack.com/p/post-{i}',
+        'post_date': '2024-01-15T14:00:00.000Z'
+    } for i in range(start, start + count)]
+
+class TestArchiveBackfiller:
+    
+    def test_backfill_pages_until_archive_exhausted(self, temp_dir):
+        """Test that all archive pages are fetched and saved"""
+        fetcher = make_fetcher(temp_dir)
+        backfiller = ArchiveBackfiller(fetcher, os.path.join(temp_dir, '.state'),
+                                       requests_per_second=1000, page_size=2)
+        
+        pages = {0: archive_page(0, 2), 2: archive_page(2, 1), 3: []}
+        with patch.object(backfiller, 'fetch_archive_page', side_effect=lambda s, offset: pages[offset]):
+            results = backfiller.backfill()
+        
+        assert len(results['success']) == 3
+        assert results['failed'] == []
+        assert fetcher.extract_article_content.call_count == 3
+        
+        checkpoint = backfiller.load_checkpoint('test-substack')
+        assert checkpoint['complete'] is True
+        assert checkpoint['offset'] == 3
+    
+    def test_backfill_resumes_from_checkpoint(self, temp_dir):
+        """Test that a resumed backfill starts at the saved offset"""
+        fetcher = make_fetcher(temp_dir)
+        backfiller = ArchiveBackfiller(fetcher, os.path.join(temp_dir, '.state'),
+                                       requests_per_second=1000, page_size=2)
+        backfiller.save_checkpoint('test-substack', {
+            'offset': 2,
+            'done_urls': {'https://test.substack.com/p/post-0', 'https://test.substack.com/p/post-1'},
+            'complete': False
+        })
+        
+        requested_offsets = []
+        
+        def fetch_page(substack, offset):
+            requested_offsets.append(offset)
+            return archive_page(2, 2) if offset == 2 else []
+        
+        with patch.object(backfiller, 'fetch_archive_page', side_effect=fetch_page):
+            results = backfiller.backfill()
+        
+        assert requested_offsets == [2, 4]
+        assert [r['title'] for r in results['success']] == ['Post2', 'Post3']
+    
+    def test_backfill_skips_articles_already_on_disk(self, temp_dir):
+        """Test that posts already saved by the RSS fetch are not refetched"""
+        fetcher = make_fetcher(temp_dir)
+        backfiller = ArchiveBackfiller(fetcher, os.path.join(temp_dir, '.state'), requests_per_second=1000)
+        
+        post = archive_page(0, 1)[0]
+        existing = os.path.join(temp_dir, 'test-substack-2024-01-15-Post0.md')
+        with open(existing, 'w') as f:
+            f.write('existing')
+        
+        filepath = backfiller.backfill_post(post, fetcher.substacks[0])
+        
+        assert filepath == existing
+        fetcher.extract_article_content.assert_not_called()
+    
+    def test_completed_backfill_is_not_repeated(self, temp_dir):
+        """Test that a finished archive is skipped on later runs"""
+        fetcher = make_fetcher(temp_dir)
+        backfiller = ArchiveBackfiller(fetcher, os.path.join(temp_dir, '.state'))
+        backfiller.save_checkpoint('test-substack', {'offset': 10, 'done_urls': set(), 'complete': True})
+        
+        with patch.object(backfiller, 'fetch_archive_page') as mock_fetch:
+            backfiller.backfill()
+        
+        mock_fetch.assert_not_called()
+    
+    def test_failed_posts_are_retried_before_completing(self, temp_dir):
+        """Test that posts whose fetch or write failed are kept and retried on the next backfill"""
+        fetcher = make_fetcher(temp_dir)
+        write_article = fetcher.write_article.side_effect
+        failures = {'Post1'}
+        
+        def flaky_write(slug, source_name, title, link, pub_date, content):
+            if title in failures:
+                failures.remove(title)
+                raise OSError('disk full')
+            return write_article(slug, source_name, title, link, pub_date, content)
+        
+        # Post0's fetch fails, Post1's write raises; both succeed when retried
+        fetcher.write_article.side_effect = flaky_write
+        fetcher.extract_article_content.side_effect = [None] + ["Archived article content"] * 3
+        backfiller = ArchiveBackfiller(fetcher, os.path.join(temp_dir, '.state'),
+                                       requests_per_second=1000, page_size=2, max_workers=1)
+        
+        pages = {0: archive_page(0, 2), 2: []}
+        with patch.object(backfiller, 'fetch_archive_page', side_effect=lambda s, offset: pages[offset]):
+            first = backfiller.backfill()
+        
+        checkpoint = backfiller.load_checkpoint('test-substack')
+        assert first['success'] == []
+        assert checkpoint['complete'] is False
+        assert sorted(checkpoint['failed_posts']) == ['https://test.substack.com/p/post-0',
+                                                      'https://test.substack.com/p/post-1']
+        
+        with patch.object(backfiller, 'fetch_archive_page', side_effect=lambda s, offset: pages[offset]):
+            second = backfiller.backfill()
+        
+        checkpoint = backfiller.load_checkpoint('test-substack')
+        assert sorted(r['title'] for r in second['success']) == ['Post0', 'Post1']
+        assert checkpoint['failed_posts'] == {}
+        assert checkpoint['complete'] is True
@@ -0,0 +1,49 @@
+import pytest
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from bloom_filter import BloomFilter
+
+class TestBloomFilter:
+    
+    def test_added_items_are_always_found(self):
+        """Test that there are no false negatives"""
+        bloom = BloomFilter(capacity=1000)
+        names = [f'article-{i}.md' for i in range(1000)]
+        bloom.update(names)
+        
+        assert all(name in bloom for name in names)
+    
+    def test_false_positive_rate(self):
+        """Test that unseen items are mostly reported as new"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        bloom.update(f'article-{i}.md' for i in range(1000))
+        
+        false_positives = sum(f'unseen-{i}.md' in bloom for i in range(10000))
+        assert false_positives < 300
+    
+    def test_save_and_load(self, temp_dir):
+        """Test round-tripping a filter through a file"""
+        path = os.path.join(temp_dir, 'processed.bloom')
+        bloom = BloomFilter(capacity=100)
+        bloom.add('article.md')
+        
+        with open(path, 'wb') as f:
+            bloom.write(f)
+        loaded = BloomFilter.load(path)
+        
+        assert 'article.md' in loaded
+        assert loaded.num_bits == bloom.num_bits
+        assert loaded.num_hashes == bloom.num_hashes
+    
+    def test_load_missing_or_corrupt(self, temp_dir):
+        """Test that unreadable filters are treated as missing"""
+        path = os.path.join(temp_dir, 'processed.bloom')
+        assert BloomFilter.load(path) is None
+        
+        with open(path, 'wb') as f:
+            f.write(b'garbage')
+        assert BloomFilter.load(path) is None
@@ -0,0 +1,84 @@
+import pytest
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from content_cleaner import clean_article_text
+
+SUBSTACK_ARTICLE = """Agents are finally getting reliable tool use.
+Subscribe
+Share
+Like
+42
+Comment
+7
+Share Latent Space
+The new benchmark measures multi-step tool calls.
+
+Thanks for reading Latent Space! Subscribe for free to receive new posts and support my work.
+Type your email…
+Subscribe
+Latency dropped by 40% compared to the previous release.
+https://www.latent.space/subscribe?utm_source=post&utm_medium=web
+https://twitter.com/intent/tweet?url=https://www.latent.space/p/agents
+https://substack.com/app-link/post?publication_id=1084089
+Discussion about this post
+Great writeup!
+Ready for more?"""
+
+class TestContentCleaner:
+    
+    def test_strips_substack_boilerplate(self):
+        """Test removal of share bars, subscribe prompts, link lists and comments"""
+        cleaned = clean_article_text(SUBSTACK_ARTICLE)
+        
+        assert cleaned == (
+            "Agents are finally getting reliable tool use.\n"
+            "The new benchmark measures multi-step tool calls.\n\n"
+            "Latency dropped by 40% compared to the previous release."
+        )
+    
+    def test_keeps_content_that_resembles_boilerplate(self):
+        """Test that numbers and sentences in the article body survive"""
+        text = "Model\nScore\nGPT-4\n86.4\nLlama\n79.1\nShare prices fell 5%, analysts said.\nSign up rates doubled after launch."
+        
+        assert clean_article_text(text) == text
+    
+    def test_keeps_bare_resource_links(self):
+        """Test that a resource list of bare links (repos, papers) survives"""
+        text = "Code and paper:\nhttps://github.com/example/agent-bench\nhttps://arxiv.org/abs/2401.01234"
+        
+        assert clean_article_text(text) == text
+    
+    def test_extra_patterns(self):
+        """Test that configured patterns drop whole lines only"""
+        text = "Sponsored by Acme Cloud\nThe article body mentions Acme Cloud."
+        
+        assert clean_article_text(text, [r'sponsored by .+']) == "The article body mentions Acme Cloud."
+    
+    def test_collapses_blank_lines(self):
+        """Test that removed lines do not leave runs of blank lines"""
+        text = "First paragraph.\n\nShare\n\n\nSecond paragraph."
+        
+        assert clean_article_text(text) == "First paragraph.\n\nSecond paragraph."
+    
+    def test_keeps_inline_words_that_match_share_labels(self):
+        """Test that one-word link texts inside a sentence survive outside a share bar"""
+        text = "We benchmarked the\nlatest\nrelease against the\nprevious\none over the\nnext\n3\nweeks."
+        
+        assert clean_article_text(text) == text
+    
+    def test_drops_share_labels_next_to_chrome(self):
+        """Test that one-word labels go when they sit in a share bar or footer"""
+        text = "The article body.\nLike\nReply\nMore in the next issue.\n\nPrint\n\n© 2024 Example\nTop"
+        
+        assert clean_article_text(text) == "The article body.\nMore in the next issue."
+    
+    def test_keeps_repeated_code_lines(self):
+        """Test that repeated content lines are not collapsed as duplicate share buttons"""
+        text = "if (ready) {\n    if (done) {\n        return;\n    }\n}\n}"
+        
+        assert clean_article_text(text) == text
+        assert clean_article_text("Body.\n\nShare\nShare\n\nMore body.") == "Body.\n\nMore body."
@@ -60,6 +60,28 @@ class TestDigestBuilder:
         assert formatted.startswith('### [')
         assert '---' in formatted
     
+    def test_format_structured_summary(self, mock_gemini_config, sample_summary):
+        """Test that structured summaries are rendered from their fields, skipping empty sections"""
+        builder = DigestBuilder(mock_gemini_config['summarization'])
+        structured = {
+            'tldr': 'A new open-weight model tops coding benchmarks.',
+            'insights': ['Scores 71% on SWE-bench', 'Trained on 2T tokens'],
+            'developments': [],
+            'implications': [],
+            'tools': ['vLLM'],
+            'market': [],
+            'takeaways': ['Try it on internal evals']
+        }
+        article = dict(sample_summary, summary=structured['tldr'], structured=structured)
+        
+        formatted = builder.format_article_summary(article)
+        
+        assert 'A new open-weight model tops coding benchmarks.' in formatted
+        assert '**Key Technical Insights & Findings**\n  - Scores 71% on SWE-bench\n  - Trained on 2T tokens' in formatted
+        assert '**Notable Tools, Frameworks & Methodologies**\n  - vLLM' in formatted
+        assert 'Important Developments' not in formatted
+        assert '• A new open-weight model' not in formatted
+    
     def test_create_new_digest(self, mock_gemini_config, temp_dir, sample_summary):
         """Test creating a new daily digest"""
         builder = DigestBuilder(mock_gemini_config['summarization'])
@@ -172,3 +194,80 @@ class TestDigestBuilder:
         
         assert sample_summary['title'] in content
         assert new_summary['title'] in content
+
+    def test_build_daily_digest_never_clobbers_existing(self, mock_gemini_config, temp_dir, sample_summary):
+        """Test that a digest created by another run is merged rather than overwritten"""
+        builder = DigestBuilder(mock_gemini_config['summarization'])
+        
+        # Another run created today's digest after this run checked for it
+        first_result = builder.build_daily_digest([sample_summary], temp_dir, is_update=False)
+        
+        new_summary = sample_summary.copy()
+        new_summary['url'] = 'https://example.com/new-article'
+        new_summary['title'] = 'New Article Title'
+        second_result = builder.build_daily_digest([new_summary], temp_dir, is_update=False)
+        
+        assert second_result == first_result
+        with open(second_result, 'r') as f:
+            content = f.read()
+        
+        assert sample_summary['title'] in content
+        assert new_summary['title'] in content
+        assert [name for name in os.listdir(temp_dir) if name.endswith('.tmp')] == []
+
+    def test_format_near_duplicate_summary(self, mock_gemini_config, sample_summary):
+        """Test that reused summaries link to the original article"""
+        builder = DigestBuilder(mock_gemini_config['summarization'])
+        
+        duplicate = sample_summary.copy()
+        duplicate['duplicate_of'] = {
+            'title': 'Original Announcement',
+            'source': 'Latent Space',
+            'url': 'https://example.com/original',
+            'filename': 'original.md',
+            'similarity': 0.95
+        }
+        
+        formatted = builder.format_article_summary(duplicate)
+        
+        assert '[Original Announcement](https://example.com/original)' in formatted
+        assert 'summary reused' in formatted
+    
+    def test_append_article_builds_digest_incrementally(self, mock_gemini_config, temp_dir, sample_summary):
+        """Test that articles appended one at a time produce a complete digest"""
+        builder = DigestBuilder(mock_gemini_config['summarization'])
+        second = dict(sample_summary, title='Second Article', url='https://example.com/second')
+        
+        first_path = builder.append_article(sample_summary, temp_dir)
+        with open(first_path, 'r') as f:
+            partial = f.read()
+        second_path = builder.append_article(second, temp_dir)
+        
+        assert first_path == second_path == builder.digest_path(temp_dir)
+        assert sample_summary['title'] in partial and '## Sources' in partial
+        with open(second_path, 'r') as f:
+            content = f.read()
+        assert "Today's digest contains 2 articles" in content
+        assert content.index(sample_summary['title']) < content.index('Second Article') < content.index('## Sources')
+    
+    def test_build_from_journal(self, mock_gemini_config, temp_dir, sample_summary):
+        """Test that a day's digest can be rebuilt from the summary journal alone"""
+        from summary_journal import SummaryJournal
+        builder = DigestBuilder(mock_gemini_config['summarization'])
+        journal = SummaryJournal(os.path.join(temp_dir, '.state'))
+        journal.append(sample_summary)
+        journal.append(dict(sample_summary, title='Second Article', url='https://example.com/second', filename='second.md'))
+        journal.close()
+        
+        filepath = builder.build_from_journal(journal, temp_dir)
+        with open(filepath, 'w') as f:
+            f.write('corrupted')
+        today = datetime.now().strftime('%Y-%m-%d')
+        rebuilt = builder.build_from_journal(journal, temp_dir, date=today, rebuild=True)
+        
+        assert rebuilt == filepath == builder.digest_path(temp_dir, today)
+        with open(rebuilt, 'r') as f:
+            content = f.read()
+        assert f'# Daily Tech News Digest - {today}' in content
+        assert "Today's digest contains 2 articles" in content
+        assert 'Second Article' in content
@@ -0,0 +1,83 @@
+import pytest
+import os
+import random
+import sys
+import tracemalloc
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from extractive import (GAP_MARKER, MAX_VOCABULARY, condense_text, rank_sentences, sentence_vectors, split_sentences,
+                        textrank)
+
+ARTICLE = """Sparse attention cuts transformer inference cost on long contexts.
+
+The team benchmarked sparse attention against dense attention on long-context inference. Sparse attention kept accuracy while inference latency fell by half.
+
+Our office has a nice view. Lunch was pizza on Friday.
+
+Long-context inference with sparse attention also reduced GPU memory use. The transformer code and benchmark scripts are open source."""
+
+class TestExtractive:
+    
+    def test_split_sentences(self):
+        """Test splitting paragraphs into sentences, keeping decimal points intact"""
+        sentences = split_sentences("First sentence. Second one!\n\n## Heading\nThird (v2.1) sentence?")
+        
+        assert sentences == [(0, 'First sentence.'), (0, 'Second one!'), (1, '## Heading'), (1, 'Third (v2.1) sentence?')]
+    
+    def test_textrank_prefers_central_sentences(self):
+        """Test that sentences sharing vocabulary with the rest outrank unrelated ones"""
+        sentences = [sentence for _, sentence in split_sentences(ARTICLE)]
+        vectors = sentence_vectors(sentences)
+        scores = textrank(vectors @ vectors.T)
+        
+        assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+        assert vectors.dtype == scores.dtype == np.float32
+        assert scores.sum() == pytest.approx(1.0, rel=1e-5)
+        assert scores[sentences.index('Lunch was pizza on Friday.')] < scores[1]
+    
+    def test_condense_keeps_order_within_budget(self):
+        """Test that condensing drops off-topic sentences, keeps the original order and marks gaps"""
+        condensed = condense_text(ARTICLE, 300)
+        
+        assert len(condensed) <= 300
+        assert 'pizza' not in condensed
+        assert 'office' not in condensed
+        assert GAP_MARKER in condensed
+        kept = [sentence for _, sentence in split_sentences(condensed) if sentence != GAP_MARKER]
+        positions = [ARTICLE.index(sentence) for sentence in kept]
+        assert positions == sorted(positions)
+    
+    def test_condense_with_token_measure(self):
+        """Test budgets in tokens, and that short or unsplittable text is left alone"""
+        tokens = lambda text: len(text.split())
+        
+        assert tokens(condense_text(ARTICLE, 40, tokens)) <= 40
+        assert condense_text(ARTICLE, 10_000) == ARTICLE
+        assert condense_text('one very long sentence without any break', 10) == 'one very long sentence without any break'
+        assert condense_text('Apples are red. Skies look blue.', 5, tokens) == 'Apples are red. Skies look blue.'
+    
+    def test_memory_is_bounded_on_huge_articles(self):
+        """Test that a ~500k character article with a huge vocabulary is ranked in bounded memory"""
+        rng = random.Random(7)
+        vocabulary = [f'term{i}' for i in range(40000)]
+        article = ' '.join(' '.join(rng.choice(vocabulary) for _ in range(12)).capitalize() + '.'
+                           for _ in range(4000))
+        assert len(article) > 450_000
+        
+        sentences = [sentence for _, sentence in split_sentences(article)]
+        assert sentence_vectors(sentences[:1000]).shape == (1000, MAX_VOCABULARY)
+        
+        tracemalloc.start()
+        try:
+            scores, connected = rank_sentences(sentences)
+            condensed = condense_text(article, 20000)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        
+        assert scores.shape == connected.shape == (len(sentences),)
+        assert len(condensed) <= 20000
+        assert peak < 100 * 1024 * 1024
@@ -0,0 +1,35 @@
+import pytest
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from file_lock import FileLock
+
+class TestFileLock:
+    
+    def test_lock_excludes_other_holders(self, temp_dir):
+        """Test that a second lock on the same file times out while the first is held"""
+        path = os.path.join(temp_dir, 'state.lock')
+        holder = FileLock(path)
+        contender = FileLock(path, timeout=0.1)
+        
+        with holder:
+            with pytest.raises(TimeoutError):
+                contender.acquire()
+        
+        # Once released the lock can be taken again
+        with contender:
+            pass
+    
+    def test_lock_is_reentrant(self, temp_dir):
+        """Test that the holder can re-acquire its own lock"""
+        lock = FileLock(os.path.join(temp_dir, 'state.lock'), timeout=0.1)
+        
+        with lock:
+            with lock:
+                assert lock.depth == 2
+            assert lock.depth == 1
+        
+        assert lock.fd is None
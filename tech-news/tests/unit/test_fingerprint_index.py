@@ -0,0 +1,121 @@
+import pytest
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import json
+import random
+from fingerprint_index import FingerprintIndex, simhash, similarity
+
+ARTICLE_TEXT = " ".join(
+    f"Section {i} explains how the new open weights model improves reasoning benchmarks "
+    f"while cutting inference cost for developers deploying agents in production."
+    for i in range(20)
+)
+
+UNRELATED_TEXT = " ".join(
+    f"Paragraph {i} reviews vector database indexing strategies, comparing HNSW graphs "
+    f"with product quantization under heavy write workloads and strict recall targets."
+    for i in range(20)
+)
+
+class TestFingerprintIndex:
+    
+    def test_simhash_similarity(self):
+        """Test that near-identical texts score higher than unrelated ones"""
+        original = simhash(ARTICLE_TEXT)
+        cross_post = simhash("Originally published on The Sequence. " + ARTICLE_TEXT + " Subscribe for more.")
+        unrelated = simhash(UNRELATED_TEXT)
+        
+        assert similarity(original, original) == 1.0
+        assert similarity(original, cross_post) >= 0.9
+        assert similarity(original, unrelated) < 0.9
+    
+    def test_find_near_duplicate(self, temp_dir):
+        """Test finding an indexed near-duplicate above the threshold"""
+        index = FingerprintIndex(temp_dir, threshold=0.9, min_words=50)
+        index.add(index.fingerprint(ARTICLE_TEXT), 'original.md')
+        
+        duplicate = index.find_near_duplicate(index.fingerprint(ARTICLE_TEXT + " Thanks for reading!"))
+        unrelated = index.find_near_duplicate(index.fingerprint(UNRELATED_TEXT))
+        
+        assert duplicate['filename'] == 'original.md'
+        assert duplicate['similarity'] >= 0.9
+        assert unrelated is None
+    
+    def test_short_content_is_not_fingerprinted(self, temp_dir):
+        """Test that content below min_words is never matched"""
+        index = FingerprintIndex(temp_dir, min_words=50)
+        assert index.fingerprint("A short announcement.") is None
+        assert index.find_near_duplicate(None) is None
+    
+    def test_index_persists_and_merges(self, temp_dir):
+        """Test that entries from separate runs are merged on save"""
+        first = FingerprintIndex(temp_dir, min_words=50)
+        second = FingerprintIndex(temp_dir, min_words=50)
+        second.find_near_duplicate(second.fingerprint(UNRELATED_TEXT))
+        
+        first.add(first.fingerprint(ARTICLE_TEXT), 'a.md')
+        first.save()
+        second.add(second.fingerprint(UNRELATED_TEXT), 'b.md')
+        second.save()
+        
+        reloaded = FingerprintIndex(temp_dir, min_words=50)
+        assert reloaded.find_near_duplicate(reloaded.fingerprint(ARTICLE_TEXT))['filename'] == 'a.md'
+        assert reloaded.find_near_duplicate(reloaded.fingerprint(UNRELATED_TEXT))['filename'] == 'b.md'
+    
+    def test_banded_lookup_finds_every_match_within_threshold(self, temp_dir):
+        """Test that bucketing by bands never misses a fingerprint within the threshold"""
+        rng = random.Random(7)
+        index = FingerprintIndex(temp_dir, threshold=0.9)
+        stored = {f'{i}.md': rng.getrandbits(64) for i in range(200)}
+        for filename, fingerprint in stored.items():
+            index.add(fingerprint, filename)
+        
+        for filename, fingerprint in list(stored.items())[:50]:
+            # Flip up to 6 of 64 bits, the most a 0.9 match can differ by
+            probe = fingerprint
+            for bit in rng.sample(range(64), rng.randint(1, 6)):
+                probe ^= 1 << bit
+            assert filename in [match['filename'] for match in index.near_duplicates(probe)]
+    
+    def test_index_keeps_only_fingerprint_and_date(self, temp_dir):
+        """Test that saved entries carry no summary text, and legacy entries are slimmed on load"""
+        with open(os.path.join(temp_dir, 'fingerprints.json'), 'w') as f:
+            json.dump({'articles': {'old.md': {
+                'simhash': f'{simhash(UNRELATED_TEXT):016x}', 'summary': 'x' * 1000,
+                'title': 'Old', 'indexed_at': '2024-01-01T09:00:00'
+            }}}, f)
+        
+        index = FingerprintIndex(temp_dir, min_words=50)
+        index.add(index.fingerprint(ARTICLE_TEXT), 'a.md')
+        index.save()
+        
+        with open(os.path.join(temp_dir, 'fingerprints.json')) as f:
+            articles = json.load(f)['articles']
+        assert set(articles['a.md']) == {'simhash', 'date'}
+        assert articles['old.md'] == {'simhash': f'{simhash(UNRELATED_TEXT):016x}', 'date': '2024-01-01'}
+    
+    def test_prune_and_retention_drop_old_entries(self, temp_dir):
+        """Test that compaction and retention_days drop entries indexed before the horizon"""
+        with open(os.path.join(temp_dir, 'fingerprints.json'), 'w') as f:
+            json.dump({'articles': {
+                'old.md': {'simhash': f'{simhash(UNRELATED_TEXT):016x}', 'date': '2020-01-01'},
+                'recent.md': {'simhash': f'{simhash(ARTICLE_TEXT):016x}', 'date': '2099-01-01'}
+            }}, f)
+        
+        index = FingerprintIndex(temp_dir, min_words=50)
+        assert index.prune('2024-01-01') == 1
+        assert index.find_near_duplicate(index.fingerprint(UNRELATED_TEXT)) is None
+        assert index.find_near_duplicate(index.fingerprint(ARTICLE_TEXT))['filename'] == 'recent.md'
+        
+        with open(os.path.join(temp_dir, 'fingerprints.json'), 'w') as f:
+            json.dump({'articles': {'old.md': {'simhash': f'{simhash(UNRELATED_TEXT):016x}', 'date': '2020-01-01'}}}, f)
+        retained = FingerprintIndex(temp_dir, min_words=50, retention_days=30)
+        retained.add(retained.fingerprint(ARTICLE_TEXT), 'a.md')
+        retained.save()
+        
+        with open(os.path.join(temp_dir, 'fingerprints.json')) as f:
+            assert list(json.load(f)['articles']) == ['a.md']
@@ -0,0 +1,64 @@
+import pytest
+import os
+import sys
+import time
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from key_pool import KeyPool
+
+class TestKeyPool:
+    
+    def test_requests_go_to_the_key_with_most_headroom(self):
+        """Test that load spreads across keys by their remaining quota"""
+        pool = KeyPool(['key-a', {'name': 'big', 'api_key': 'key-b', 'requests_per_minute': 100}], requests_per_minute=10)
+        
+        names = [pool.acquire()['name'] for _ in range(10)]
+        
+        assert names[0] == 'key-1'
+        assert names.count('big') > names.count('key-1') > 0
+        assert pool.stats()['big']['requests'] == names.count('big')
+    
+    def test_keys_without_limits_take_turns(self):
+        """Test that keys with equal headroom are used round-robin rather than always the first"""
+        pool = KeyPool(['a', 'b', 'c'])
+        
+        assert [pool.acquire()['name'] for _ in range(6)] == ['key-1', 'key-2', 'key-3'] * 2
+    
+    def test_token_quota_is_per_key(self):
+        """Test that a request too large for one key's remaining tokens goes to another"""
+        pool = KeyPool(['a', 'b'], tokens_per_minute=1000)
+        
+        assert pool.acquire(900)['name'] == 'key-1'
+        assert pool.acquire(900)['name'] == 'key-2'
+        assert pool.stats() == {'key-1': {'requests': 1, 'tokens': 900, 'throttled': 0},
+                                'key-2': {'requests': 1, 'tokens': 900, 'throttled': 0}}
+    
+    def test_throttled_key_leaves_rotation_until_reset(self):
+        """Test that a throttled key is skipped until its window (or retry hint) has passed"""
+        pool = KeyPool(['a', 'b'], window=0.2)
+        first = pool.acquire()
+        pool.throttle(first)
+        
+        assert [pool.acquire()['name'] for _ in range(3)] == ['key-2'] * 3
+        
+        pool.throttle(pool.keys[1], retry_after=0.5)
+        assert not pool.available()
+        start = time.monotonic()
+        assert pool.acquire()['name'] == 'key-1'
+        assert time.monotonic() - start >= 0.1
+        assert pool.stats()['key-2']['throttled'] == 1
+    
+    def test_from_config(self):
+        """Test reading api_keys from the selected backend's section, and per-key defaults"""
+        pool = KeyPool.from_config({'gemini': {'api_keys': ['a', 'b'], 'model': 'gemini-1.5-flash'}},
+                                   requests_per_minute=15)
+        local = KeyPool.from_config({'llm': {'backend': 'openai_compatible', 'api_keys': [{'api_key': 'x', 'name': 'team'}]}})
+        
+        assert [key['api_key'] for key in pool.keys] == ['a', 'b']
+        assert pool.keys[1]['requests'].capacity == 15
+        assert local.keys[0]['name'] == 'team'
+        assert KeyPool.from_config({'gemini': {'api_key': 'a'}}) is None
+        with pytest.raises(ValueError):
+            KeyPool([{'name': 'empty'}])
@@ -0,0 +1,206 @@
+import pytest
+import json
+import os
+import sys
+from unittest.mock import Mock, patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from llm_backend import GeminiBackend, OpenAICompatibleBackend, StubBackend, create_backend
+
+class TestCreateBackend:
+    
+    @patch('llm_backend.genai')
+    def test_gemini_is_default(self, mock_genai, mock_gemini_config):
+        """Test that configs without an llm section keep using Gemini"""
+        backend = create_backend(mock_gemini_config)
+        
+        assert isinstance(backend, GeminiBackend)
+        assert backend.model_name == 'gemini-1.5-flash'
+        mock_genai.configure.assert_called_once_with(api_key='test-api-key')
+    
+    def test_selects_configured_backend(self):
+        """Test building the local and stub backends"""
+        local = create_backend({'llm': {'backend': 'openai_compatible', 'base_url': 'http://localhost:8080/v1/',
+                                        'model': 'qwen2.5-7b'}})
+        assert isinstance(local, OpenAICompatibleBackend)
+        assert local.base_url == 'http://localhost:8080/v1'
+        assert local.model_name == 'qwen2.5-7b'
+        
+        assert isinstance(create_backend({'llm': {'backend': 'stub'}}), StubBackend)
+        with pytest.raises(ValueError):
+            create_backend({'llm': {'backend': 'carrier-pigeon'}})
+
+class TestGeminiBackend:
+    
+    @patch('llm_backend.genai')
+    def test_system_instruction_reuses_model(self, mock_genai):
+        """Test that each system instruction gets one model, reused across calls"""
+        created = []
+        def generative_model(model_name, system_instruction=None):
+            model = Mock()
+            model.generate_content.return_value = Mock(text='Summary')
+            created.append((model_name, system_instruction))
+            return model
+        mock_genai.GenerativeModel = generative_model
+        
+        backend = GeminiBackend('key', 'gemini-1.5-flash')
+        assert backend.supports_system_instruction
+        
+        backend.generate('Article one', system='Instructions')
+        backend.generate('Article two', system='Instructions')
+        
+        system_model = backend.system_models['Instructions']
+        assert created == [('gemini-1.5-flash', None), ('gemini-1.5-flash', 'Instructions')]
+        assert [c.args[0] for c in system_model.generate_content.call_args_list] == ['Article one', 'Article two']
+    
+    @patch('llm_backend.genai')
+    def test_system_instruction_inlined_on_old_sdk(self, mock_genai):
+        """Test the fallback for SDK versions without system instructions"""
+        def generative_model(model_name):
+            return Mock()
+        mock_genai.GenerativeModel = generative_model
+        
+        backend = GeminiBackend('key', 'gemini-1.5-flash')
+        backend.model.generate_content.return_value = Mock(text='Summary')
+        
+        assert not backend.supports_system_instruction
+        assert backend.generate('Article', system='Instructions') == 'Summary'
+        backend.model.generate_content.assert_called_once_with('Instructions\n\nArticle')
+    
+    @patch('llm_backend.genai')
+    def test_output_budget_and_model_override(self, mock_genai):
+        """Test that routed models and output caps reach the SDK"""
+        backend = create_backend({'gemini': {'api_key': 'key', 'model': 'gemini-1.5-flash'}}, model='gemini-1.5-pro')
+        backend.generate('Article', max_output_tokens=512)
+        
+        assert backend.model_name == 'gemini-1.5-pro'
+        mock_genai.GenerativeModel.assert_called_with('gemini-1.5-pro')
+        backend.model.generate_content.assert_called_once_with('Article', generation_config={'max_output_tokens': 512})
+    
+    @patch('llm_backend.genai')
+    def test_generation_config_and_json_mode(self, mock_genai):
+        """Test that temperature and JSON mode are applied, and JSON mode is dropped on SDKs without it"""
+        backend = GeminiBackend('key', 'gemini-1.5-flash')
+        backend.generate('Article', max_output_tokens=512, temperature=0.3, json_output=True)
+        backend.model.generate_content.assert_called_once_with('Article', generation_config={
+            'max_output_tokens': 512, 'temperature': 0.3, 'response_mime_type': 'application/json'})
+        
+        def generation_config(candidate_count=None, max_output_tokens=None, temperature=None):
+            pass
+        mock_genai.types.GenerationConfig = generation_config
+        old_sdk = GeminiBackend('key', 'gemini-1.5-flash')
+        old_sdk.generate('Article', temperature=0.3, json_output=True)
+        
+        assert not old_sdk.supports_json_output
+        old_sdk.model.generate_content.assert_called_with('Article', generation_config={'temperature': 0.3})
+    
+    @patch('llm_backend.glm')
+    @patch('llm_backend.genai')
+    def test_pooled_key_gets_its_own_client(self, mock_genai, mock_glm):
+        """Test that pooled keys get dedicated clients instead of reconfiguring the process-wide key"""
+        config = {'gemini': {'api_keys': ['key-a', {'api_key': 'key-b'}], 'model': 'gemini-1.5-flash'}}
+        
+        backend = create_backend(config, api_key='key-b')
+        
+        mock_genai.configure.assert_not_called()
+        mock_glm.GenerativeServiceClient.assert_called_once_with(client_options={'api_key': 'key-b'})
+        assert backend.model._client is mock_glm.GenerativeServiceClient.return_value
+        
+        # A pool-only config still works for one-off calls such as synthesis
+        create_backend(config)
+        mock_genai.configure.assert_called_once_with(api_key='key-a')
+    
+    @patch('llm_backend.glm')
+    @patch('llm_backend.genai')
+    def test_pooled_key_needs_a_bindable_client(self, mock_genai, mock_glm):
+        """Test that an SDK whose models hide their client fails clearly instead of using the wrong key"""
+        mock_genai.GenerativeModel.return_value = Mock(spec=['generate_content', 'count_tokens'])
+        
+        with pytest.raises(RuntimeError, match='_client'):
+            GeminiBackend('key-b', 'gemini-1.5-flash', dedicated_client=True)
+
+class TestOpenAICompatibleBackend:
+    
+    @patch('llm_backend.requests.post')
+    def test_generate(self, mock_post):
+        """Test a plain chat completion request"""
+        mock_post.return_value.json.return_value = {'choices': [{'message': {'content': ' Local summary \n'}}]}
+        backend = OpenAICompatibleBackend('http://localhost:8080/v1', 'local', api_key='secret')
+        
+        assert backend.generate('Summarize this') == 'Local summary'
+        url = mock_post.call_args.args[0]
+        body = mock_post.call_args.kwargs['json']
+        assert url == 'http://localhost:8080/v1/chat/completions'
+        assert body['messages'] == [{'role': 'user', 'content': 'Summarize this'}]
+        assert mock_post.call_args.kwargs['headers']['Authorization'] == 'Bearer secret'
+        
+        backend.generate('Summarize this', system='Instructions', max_output_tokens=256)
+        assert mock_post.call_args.kwargs['json']['max_tokens'] == 256
+        assert mock_post.call_args.kwargs['json']['messages'] == [
+            {'role': 'system', 'content': 'Instructions'},
+            {'role': 'user', 'content': 'Summarize this'}
+        ]
+        
+        backend.generate('Summarize this', temperature=0.3, json_output=True)
+        assert mock_post.call_args.kwargs['json']['temperature'] == 0.3
+        assert mock_post.call_args.kwargs['json']['response_format'] == {'type': 'json_object'}
+    
+    @patch('llm_backend.requests.post')
+    def test_generate_streaming(self, mock_post):
+        """Test assembling a server-sent event stream"""
+        events = [{'choices': [{'delta': {'role': 'assistant'}}]},
+                  {'choices': [{'delta': {'content': 'Streamed '}}]},
+                  {'choices': [{'delta': {'content': 'summary'}}]}]
+        mock_post.return_value.iter_lines.return_value = \
+            [f'data: {json.dumps(event)}' for event in events] + ['', 'data: [DONE]']
+        
+        backend = OpenAICompatibleBackend('http://localhost:8080/v1', 'local')
+        
+        assert backend.generate('Summarize this', stream=True) == 'Streamed summary'
+        assert mock_post.call_args.kwargs['json']['stream'] is True
+        # Stopping at [DONE] must not leave the connection open
+        mock_post.return_value.close.assert_called_once()
+    
+    def test_token_estimates_skip_calibration(self, temp_dir, capsys):
+        """Test that a backend without a tokenizer uses the default ratio without attempting calibration"""
+        from token_budget import TokenEstimator
+        backend = OpenAICompatibleBackend('http://localhost:8080/v1', 'local')
+        estimator = TokenEstimator(backend.model_name, count_tokens=backend.count_tokens, state_dir=temp_dir)
+        
+        assert backend.count_tokens is None
+        assert estimator.estimate('x' * 4000) == 1000
+        assert 'calibration' not in capsys.readouterr().out
+
+class TestStubBackend:
+    
+    def test_deterministic_output(self):
+        """Test that the stub answers the same prompt the same way"""
+        backend = StubBackend()
+        prompt = 'Instructions\n\nArticle Title: Hello\nSource: Test'
+        
+        assert backend.generate(prompt) == backend.generate(prompt)
+        assert 'Hello' in backend.generate(prompt)
+        assert backend.generate(prompt) != backend.generate(prompt + ' more')
+        assert backend.calls == 5
+    
+    def test_batched_prompt_returns_json(self):
+        """Test that the stub answers batched prompts with one analysis per article"""
+        prompt = ('Instructions\n\n=== Article 1 ===\nArticle Title: First\n\nBody\n\n'
+                  '=== Article 2 ===\nArticle Title: Second\n\nBody')
+        
+        analyses = json.loads(StubBackend().generate(prompt))
+        
+        assert set(analyses) == {'1', '2'}
+        assert 'Second' in analyses['2']
+    
+    def test_json_output(self):
+        """Test that the stub answers JSON-mode prompts with structured summaries"""
+        backend = StubBackend()
+        
+        summary = json.loads(backend.generate('Article Title: Hello\nSource: Test', json_output=True))
+        batch = json.loads(backend.generate('=== Article 1 ===\nArticle Title: First\n\nBody', json_output=True))
+        
+        assert 'Hello' in summary['tldr']
+        assert 'First' in batch['1']['tldr']
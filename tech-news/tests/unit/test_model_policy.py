@@ -0,0 +1,120 @@
+import pytest
+import os
+import sys
+from unittest.mock import Mock, patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from model_policy import (CircuitBreaker, CircuitOpenError, ModelCallPolicy, QuotaExhaustedError, classify_error,
+                          retry_after, FATAL, QUOTA, RETRYABLE)
+
+class ApiError(Exception):
+    """Stand-in for google.api_core errors, which carry the HTTP status as .code"""
+    
+    def __init__(self, code, message=''):
+        super().__init__(message)
+        self.code = code
+
+class ResourceExhausted(Exception):
+    pass
+
+class TestErrorClassification:
+    
+    def test_classify_by_status(self):
+        """Test classification from HTTP status codes"""
+        assert classify_error(ApiError(429)) == QUOTA
+        assert classify_error(ApiError(503)) == RETRYABLE
+        assert classify_error(ApiError(500)) == RETRYABLE
+        assert classify_error(ApiError(400)) == FATAL
+        assert classify_error(ApiError(403)) == FATAL
+        
+        http_error = Exception('Too Many Requests')
+        http_error.response = Mock(status_code=429)
+        assert classify_error(http_error) == QUOTA
+    
+    def test_classify_without_status(self):
+        """Test classification of transport errors and unknown failures"""
+        assert classify_error(TimeoutError()) == RETRYABLE
+        assert classify_error(ConnectionResetError()) == RETRYABLE
+        assert classify_error(ResourceExhausted()) == QUOTA
+        assert classify_error(ValueError('bad prompt')) == FATAL
+        assert classify_error(CircuitOpenError()) == FATAL
+    
+    def test_retry_after_hints(self):
+        """Test reading retry hints from headers and error messages"""
+        http_error = Exception('429')
+        http_error.response = Mock(headers={'Retry-After': '7'})
+        assert retry_after(http_error) == 7
+        
+        assert retry_after(ApiError(429, 'Quota exceeded. Please retry in 12.5s.')) == 12.5
+        assert retry_after(ApiError(429, 'quota exceeded [retry_delay { seconds: 30 }]')) == 30
+        assert retry_after(ApiError(503, 'Service unavailable')) is None
+
+class TestModelCallPolicy:
+    
+    @patch('model_policy.time.sleep')
+    def test_retries_transient_errors(self, mock_sleep):
+        """Test that retryable errors are retried with backoff until success"""
+        fn = Mock(side_effect=[ApiError(503), ApiError(429, 'retry in 3s'), 'summary'])
+        policy = ModelCallPolicy(max_retries=3, base_delay=1)
+        
+        assert policy.call(fn) == 'summary'
+        assert fn.call_count == 3
+        assert mock_sleep.call_args_list[1].args == (3.0,)
+        assert 0.5 <= mock_sleep.call_args_list[0].args[0] <= 1
+    
+    @patch('model_policy.time.sleep')
+    def test_fatal_errors_are_not_retried(self, mock_sleep):
+        """Test that fatal errors surface immediately"""
+        fn = Mock(side_effect=ApiError(400, 'Invalid argument'))
+        
+        with pytest.raises(ApiError):
+            ModelCallPolicy().call(fn)
+        assert fn.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    @patch('model_policy.time.sleep')
+    def test_long_quota_hint_is_not_waited_out(self, mock_sleep):
+        """Test that a hint beyond max_delay gives up instead of sleeping"""
+        fn = Mock(side_effect=ApiError(429, 'retry in 3600s'))
+        
+        with pytest.raises(QuotaExhaustedError):
+            ModelCallPolicy(max_delay=60).call(fn)
+        assert fn.call_count == 1
+        mock_sleep.assert_not_called()
+    
+    @patch('model_policy.time.sleep')
+    def test_exhausted_retries_keep_error_kind(self, mock_sleep):
+        """Test that running out of retries on quota errors is reported as a quota problem"""
+        with pytest.raises(QuotaExhaustedError):
+            ModelCallPolicy(max_retries=1).call(Mock(side_effect=ApiError(429)))
+        with pytest.raises(ApiError):
+            ModelCallPolicy(max_retries=1).call(Mock(side_effect=ApiError(503)))
+    
+    @patch('model_policy.time.sleep')
+    def test_circuit_breaker_stops_calls(self, mock_sleep):
+        """Test that repeated failures open the circuit and later calls fail fast"""
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+        policy = ModelCallPolicy(max_retries=5, breaker=breaker)
+        fn = Mock(side_effect=ApiError(429))
+        
+        with pytest.raises(CircuitOpenError):
+            policy.call(fn)
+        assert fn.call_count == 2
+        assert breaker.is_open
+        
+        with pytest.raises(CircuitOpenError):
+            policy.call(Mock())
+    
+    def test_circuit_breaker_recovers_after_cooldown(self):
+        """Test that the circuit closes again once the cooldown has passed"""
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+        with patch('model_policy.time.monotonic', return_value=1000):
+            breaker.record_failure()
+            with pytest.raises(CircuitOpenError):
+                breaker.before_call()
+        
+        with patch('model_policy.time.monotonic', return_value=1061):
+            breaker.before_call()
+            assert not breaker.is_open
@@ -0,0 +1,37 @@
+import pytest
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from model_router import ModelRouter
+
+ROUTES = [
+    {'name': 'priority', 'sources': ['Latent Space'], 'min_tokens': 2000, 'model': 'gemini-1.5-pro'},
+    {'name': 'short', 'max_tokens': 1500, 'model': 'gemini-1.5-flash-8b', 'max_output_tokens': 1024},
+    {'model': 'gemini-1.5-pro', 'min_tokens': 8000}
+]
+
+class TestModelRouter:
+    
+    def test_first_matching_rule_wins(self):
+        """Test routing by token count and source"""
+        router = ModelRouter(ROUTES, 'gemini-1.5-flash')
+        
+        assert router.route('The Sequence', 500)['name'] == 'short'
+        assert router.route('Latent Space', 500)['name'] == 'short'
+        assert router.route('Latent Space', 3000)['name'] == 'priority'
+        assert router.route('The Sequence', 3000) == {'name': 'default', 'model': 'gemini-1.5-flash'}
+        assert router.route('The Sequence', 9000) == {'name': 'route-3', 'model': 'gemini-1.5-pro', 'min_tokens': 8000}
+    
+    def test_without_rules_everything_uses_default(self):
+        """Test that configs without routing keep the single configured model"""
+        router = ModelRouter(None, 'gemini-1.5-flash')
+        
+        assert router.route('Any', 100000) is router.default
+    
+    def test_rule_needs_model(self):
+        """Test that a rule without a model is rejected at startup"""
+        with pytest.raises(ValueError):
+            ModelRouter([{'name': 'broken', 'max_tokens': 100}], 'gemini-1.5-flash')
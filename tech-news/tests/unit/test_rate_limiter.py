@@ -0,0 +1,38 @@
+import pytest
+import os
+import sys
+from datetime import datetime
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from rate_limiter import RateLimiter
+
+class TestRateLimiter:
+    
+    def test_acquire_within_capacity_does_not_block(self):
+        """Test that calls within the bucket capacity return immediately"""
+        limiter = RateLimiter(5, 60)
+        start = datetime.now()
+        for _ in range(5):
+            limiter.acquire()
+        assert (datetime.now() - start).total_seconds() < 0.5
+    
+    def test_acquire_blocks_when_exhausted(self):
+        """Test that the limiter waits once the bucket is empty"""
+        limiter = RateLimiter(20, 1.0)
+        limiter.acquire(20)
+        start = datetime.now()
+        limiter.acquire(2)
+        assert (datetime.now() - start).total_seconds() >= 0.05
+    
+    def test_try_acquire_does_not_block(self):
+        """Test the non-blocking checks used by the key pool"""
+        limiter = RateLimiter(10, 60)
+        
+        assert limiter.try_acquire(6) == 0
+        assert limiter.headroom() == pytest.approx(0.4, abs=0.01)
+        assert limiter.wait_time(4) == 0
+        assert limiter.try_acquire(8) > 0
+        assert limiter.wait_time(8) > 0
+        assert limiter.headroom() == pytest.approx(0.4, abs=0.01)
@@ -0,0 +1,54 @@
+import pytest
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from relevance_filter import RelevanceFilter
+
+class TestRelevanceFilter:
+    
+    def test_technical_article_passes(self):
+        """Test that an on-topic article clears the default threshold"""
+        relevant, score = RelevanceFilter().check({
+            'title': 'Fine-tuning small LLMs for tool use',
+            'content': 'We benchmark fine-tuning of open-weight language models on agent tasks. '
+                       'Inference latency on a single GPU dropped by 40%.'
+        })
+        
+        assert relevant
+        assert score >= 2.0
+    
+    def test_off_topic_posts_are_filtered(self):
+        """Test that sponsor posts, job listings and event announcements score low"""
+        relevance_filter = RelevanceFilter()
+        
+        for title, content in [
+            ("We're hiring!", 'Job openings for a founding engineer. Apply now through our job board.'),
+            ('Join our webinar', 'Register now for next week\'s webinar. Early bird tickets are available.'),
+            ('A word from our sponsor', 'This post is sponsored. Use promo code TECH for 20% off.')
+        ]:
+            relevant, score = relevance_filter.check({'title': title, 'content': content})
+            assert not relevant, title
+    
+    def test_sublinear_term_frequency(self):
+        """Test that repeating one term does not outweigh several distinct ones"""
+        relevance_filter = RelevanceFilter(topics={'ai': ['llm', 'inference', 'benchmark']}, exclude={})
+        
+        repeated = relevance_filter.score('Notes', 'llm ' * 5)
+        varied = relevance_filter.score('Notes', 'llm inference benchmark')
+        
+        assert varied > repeated
+        assert relevance_filter.score('LLM notes', 'llm') > relevance_filter.score('Notes', 'llm')
+    
+    def test_from_config(self):
+        """Test that the filter is off unless enabled, with configurable profiles"""
+        assert RelevanceFilter.from_config(None) is None
+        assert RelevanceFilter.from_config({'enabled': False}) is None
+        
+        relevance_filter = RelevanceFilter.from_config({
+            'enabled': True, 'threshold': 1.0, 'topics': {'rust': {'rust': 1, 'borrow checker': 2}}
+        })
+        assert relevance_filter.check({'title': 'Taming the borrow checker', 'content': ''})[0]
+        assert not relevance_filter.check({'title': 'LLM news', 'content': 'llm'})[0]
@@ -0,0 +1,92 @@
+import pytest
+import os
+import sys
+import time
+from datetime import datetime
+from unittest.mock import Mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from run_budget import BudgetExhaustedError, RunBudget, parse_deadline, prioritize, source_priorities
+
+class TestRunBudget:
+    
+    def test_parse_deadline(self):
+        """Test minutes-from-now and clock-time deadlines"""
+        now = datetime(2025, 9, 19, 6, 0)
+        
+        assert parse_deadline('30', now) == datetime(2025, 9, 19, 6, 30).timestamp()
+        assert parse_deadline('07:45', now) == datetime(2025, 9, 19, 7, 45).timestamp()
+        with pytest.raises(ValueError):
+            parse_deadline('soon', now)
+    
+    def test_past_clock_time_rolls_over_to_tomorrow(self):
+        """Test that a clock time earlier than now means that time the next day"""
+        now = datetime(2025, 9, 19, 23, 0)
+        
+        assert parse_deadline('07:30', now) == datetime(2025, 9, 20, 7, 30).timestamp()
+        assert parse_deadline('23:00', now) == datetime(2025, 9, 20, 23, 0).timestamp()
+    
+    def test_token_budget(self):
+        """Test that calls are refused once they would exceed the token budget"""
+        budget = RunBudget(token_budget=1000)
+        
+        budget.reserve(600)
+        budget.charge(200)
+        assert not budget.exhausted
+        with pytest.raises(BudgetExhaustedError):
+            budget.reserve(300)
+        
+        # A refused call ends the run even though smaller calls would still fit
+        assert budget.exhausted
+        assert budget.reason() == 'token budget spent'
+        with pytest.raises(BudgetExhaustedError):
+            budget.reserve(100)
+    
+    def test_deadline(self):
+        """Test that no calls start after the deadline"""
+        assert not RunBudget(deadline=time.time() + 60).exhausted
+        
+        budget = RunBudget(deadline=time.time() - 1)
+        assert budget.exhausted
+        with pytest.raises(BudgetExhaustedError):
+            budget.reserve(0)
+
+class TestPrioritize:
+    
+    def test_orders_by_day_then_source_priority(self):
+        """Test that newer days come first and priority sources lead within a day"""
+        priorities = source_priorities({
+            'substacks': [{'name': 'Latent Space', 'slug': 'latent-space', 'priority': 2},
+                          {'name': 'The Sequence', 'slug': 'the-sequence'}],
+            'blogs': [{'name': "Hamel's Blog", 'slug': 'hamel-blog', 'priority': 1}]
+        })
+        files = [
+            '/articles/latent-space-2025-09-17-old-news.md',
+            '/articles/the-sequence-2025-09-19-fresh.md',
+            '/articles/hamel-blog-2025-09-19-evals.md',
+            '/articles/latent-space-2025-09-19-agents.md',
+            '/articles/unknown-2025-09-18-misc.md'
+        ]
+        
+        assert [os.path.basename(f) for f in prioritize(files, priorities)] == [
+            'latent-space-2025-09-19-agents.md',
+            'hamel-blog-2025-09-19-evals.md',
+            'the-sequence-2025-09-19-fresh.md',
+            'unknown-2025-09-18-misc.md',
+            'latent-space-2025-09-17-old-news.md'
+        ]
+    
+    def test_uses_manifest_metadata(self):
+        """Test that manifest dates and source names take precedence over filenames"""
+        entries = {
+            'a.md': {'source': 'The Sequence', 'date': '2025-09-19 08:00'},
+            'b.md': {'source': 'The Sequence', 'date': '2025-09-19 17:30'},
+            'c.md': {'source': 'Latent Space', 'date': '2025-09-19 06:00'}
+        }
+        manifest = Mock()
+        manifest.get.side_effect = entries.get
+        priorities = {'Latent Space': 1, 'The Sequence': 0}
+        
+        assert prioritize(['a.md', 'b.md', 'c.md'], priorities, manifest) == ['c.md', 'b.md', 'a.md']
@@ -0,0 +1,170 @@
+import pytest
+import json
+import os
+import sqlite3
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from sqlite_state_store import SqliteStateStore
+from state_manager import StateManager, RetryPolicy
+
+class TestSqliteStateStore:
+    
+    def test_uses_wal_mode(self, temp_dir):
+        """Test that the database is opened in WAL journal mode"""
+        store = SqliteStateStore(os.path.join(temp_dir, 'state.db'))
+        mode = store.conn.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+        store.close()
+    
+    def test_processed_and_failed_tracking(self, temp_dir):
+        """Test adding, reading and clearing articles"""
+        store = SqliteStateStore(os.path.join(temp_dir, 'state.db'))
+        
+        store.add_processed(['a.md', 'b.md'])
+        store.add_processed(['a.md'])
+        store.add_failed(['c.md', 'd.md'])
+        store.clear_failed(['c.md'])
+        
+        assert store.get_processed() == {'a.md', 'b.md'}
+        assert store.get_failed() == {'d.md'}
+        store.close()
+    
+    def test_select_pending(self, temp_dir):
+        """Test selecting new and failed articles for processing"""
+        store = SqliteStateStore(os.path.join(temp_dir, 'state.db'))
+        store.add_processed(['done.md', 'retry.md'])
+        store.add_failed(['retry.md'])
+        
+        pending = store.select_pending(['done.md', 'retry.md', 'new.md'])
+        
+        assert pending == {'retry.md', 'new.md'}
+        store.close()
+    
+    def test_state_persists_across_connections(self, temp_dir):
+        """Test that committed state is visible to a new connection"""
+        db_path = os.path.join(temp_dir, 'state.db')
+        store = SqliteStateStore(db_path)
+        store.add_processed(['a.md'])
+        store.close()
+        
+        reopened = SqliteStateStore(db_path)
+        assert reopened.get_processed() == {'a.md'}
+        reopened.close()
+    
+    def test_migrates_json_state_once(self, temp_dir):
+        """Test one-time import of the legacy JSON state file"""
+        json_file = os.path.join(temp_dir, 'processed_articles.json')
+        with open(json_file, 'w') as f:
+            json.dump({'processed_articles': ['old1.md', 'old2.md'], 'failed_articles': ['bad.md'],
+                       'last_updated': '2024-03-05T10:00:00'}, f)
+        
+        db_path = os.path.join(temp_dir, 'state.db')
+        store = SqliteStateStore(db_path, json_file)
+        assert store.get_processed() == {'old1.md', 'old2.md'}
+        # Bucketed by the last_updated day, like the JSON store
+        assert {row[0] for row in store.conn.execute('SELECT processed_at FROM processed_articles')} == {'2024-03-05'}
+        assert store.get_failed() == {'bad.md'}
+        
+        # Later changes to the database must not be overwritten by re-importing the JSON
+        store.clear_failed(['bad.md'])
+        store.close()
+        
+        reopened = SqliteStateStore(db_path, json_file)
+        assert reopened.get_failed() == set()
+        reopened.close()
+    
+    def test_state_manager_sqlite_backend(self, temp_dir):
+        """Test the StateManager API on top of the SQLite backend"""
+        state_manager = StateManager(temp_dir, backend='sqlite')
+        
+        state_manager.add_processed_articles(['processed1.md'])
+        state_manager.add_failed_articles(['failed1.md'])
+        
+        to_process = state_manager.get_articles_to_process([
+            '/path/to/processed1.md',
+            '/path/to/failed1.md',
+            '/path/to/new1.md'
+        ])
+        
+        assert [os.path.basename(f) for f in to_process] == ['failed1.md', 'new1.md']
+        assert os.path.exists(os.path.join(temp_dir, 'state.db'))
+    
+    def test_unknown_backend(self, temp_dir):
+        """Test that an unknown backend name is rejected"""
+        with pytest.raises(ValueError):
+            StateManager(temp_dir, backend='redis')
+    
+    def test_compact_removes_old_entries(self, temp_dir):
+        """Test that compaction deletes entries processed before the horizon"""
+        store = SqliteStateStore(os.path.join(temp_dir, 'state.db'))
+        store.conn.execute("INSERT INTO processed_articles VALUES ('old.md', '2020-01-01T00:00:00')")
+        store.add_processed(['new.md'])
+        
+        removed = store.compact('2021-01-01')
+        
+        assert removed == 1
+        assert store.get_processed() == {'new.md'}
+        assert store.get_compacted_before() == '2021-01-01'
+        
+        # A later compaction that drops nothing leaves the marker alone
+        store.compact('2021-06-01')
+        assert store.get_compacted_before() == '2021-01-01'
+        store.close()
+    
+    def test_retry_scheduling_and_dead_letters(self, temp_dir):
+        """Test backoff, dead-lettering and requeueing in the SQLite store"""
+        store = SqliteStateStore(
+            os.path.join(temp_dir, 'state.db'),
+            retry_policy=RetryPolicy(base_delay=3600, max_attempts=3)
+        )
+        store.add_failed(['flaky.md'], {'flaky.md': 'TimeoutError: slow'})
+        assert store.select_pending(['flaky.md']) == {'flaky.md'}
+        
+        store.add_failed(['flaky.md'])
+        assert store.select_pending(['flaky.md']) == set()
+        assert store.get_failed_details()['flaky.md']['attempts'] == 2
+        
+        store.add_failed(['flaky.md'])
+        assert store.get_failed() == set()
+        assert store.get_dead_letters()['flaky.md']['attempts'] == 3
+        assert store.select_pending(['flaky.md']) == set()
+        
+        store.requeue_dead_letters(['flaky.md'])
+        assert store.get_dead_letters() == {}
+        assert store.select_pending(['flaky.md']) == {'flaky.md'}
+        store.close()
+    
+    def test_filtered_articles(self, temp_dir):
+        """Test recording, skipping and compacting filtered articles"""
+        store = SqliteStateStore(os.path.join(temp_dir, 'state.db'))
+        store.add_filtered({'jobs.md': 1.25, 'event.md': -2.0})
+        
+        assert store.get_filtered()['jobs.md']['score'] == 1.25
+        assert store.select_pending(['jobs.md', 'event.md', 'new.md']) == {'new.md'}
+        
+        store.unfilter(['jobs.md'])
+        assert store.select_pending(['jobs.md', 'event.md']) == {'jobs.md'}
+        assert store.get_unfiltered() == {'jobs.md'}
+        
+        store.compact('9999-01-01')
+        assert store.get_filtered() == {}
+        assert store.get_unfiltered() == set()
+        store.close()
+    
+    def test_upgrades_pre_retry_schema(self, temp_dir):
+        """Test that a database created before retry scheduling gains the new columns"""
+        db_path = os.path.join(temp_dir, 'state.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute('CREATE TABLE failed_articles (filename TEXT PRIMARY KEY, failed_at TEXT NOT NULL)')
+        conn.execute("INSERT INTO failed_articles VALUES ('old.md', '2024-01-01T00:00:00')")
+        conn.commit()
+        conn.close()
+        
+        store = SqliteStateStore(db_path)
+        
+        assert store.get_failed_details()['old.md']['attempts'] == 1
+        assert store.select_pending(['old.md']) == {'old.md'}
+        store.close()
@@ -1,13 +1,14 @@
 import pytest
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
+from unittest.mock import patch
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from state_manager import StateManager
+from state_manager import StateManager, RetryPolicy
 
 class TestStateManager:
     
@@ -138,3 +139,277 @@ class TestStateManager:
         # Cleanup
         os.remove(digest_file)
         os.rmdir(digests_dir)
+
+    def test_state_loaded_once(self, temp_dir):
+        """Test that queries are served from memory after the first load"""
+        state_manager = StateManager(temp_dir)
+        state_manager.add_processed_articles(['processed1.md'])
+        state_manager.add_failed_articles(['failed1.md'])
+        
+        reloaded = StateManager(temp_dir)
+        with patch('state_manager.json.load', wraps=json.load) as mock_load:
+            reloaded.get_articles_to_process(['/path/to/processed1.md', '/path/to/new1.md'])
+            reloaded.get_processed_articles()
+            reloaded.get_failed_articles()
+            assert mock_load.call_count == 1
+            
+            # Flushing re-reads once to merge with changes from other processes
+            reloaded.add_processed_articles(['new1.md'])
+            assert mock_load.call_count == 2
+    
+    def test_batch_defers_writes(self, temp_dir):
+        """Test that writes inside a batch are flushed once on exit"""
+        state_manager = StateManager(temp_dir)
+        
+        with patch('state_manager.atomic_write_json') as mock_write:
+            with state_manager.batch():
+                state_manager.add_processed_articles(['a.md'])
+                state_manager.add_failed_articles(['b.md'])
+                state_manager.clear_failed_articles(['b.md'])
+                assert mock_write.call_count == 0
+        
+        assert mock_write.call_count == 1
+    
+    def test_flush_is_atomic(self, temp_dir):
+        """Test that a failed write leaves the previous state file intact"""
+        state_manager = StateManager(temp_dir)
+        state_manager.add_processed_articles(['a.md'])
+        
+        with patch('state_manager.json.dump', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                state_manager.add_processed_articles(['b.md'])
+        
+        with open(state_manager.processed_file, 'r') as f:
+            data = json.load(f)
+        assert data['processed_articles'] == {datetime.now().strftime('%Y-%m-%d'): ['a.md']}
+        assert [name for name in os.listdir(temp_dir) if name.endswith('.tmp')] == []
+
+    def test_concurrent_flushes_merge(self, temp_dir):
+        """Test that two processes' updates are merged instead of overwritten"""
+        first = StateManager(temp_dir)
+        second = StateManager(temp_dir)
+        
+        # Both load the same (empty) state before either writes
+        first.get_processed_articles()
+        second.get_processed_articles()
+        
+        first.add_processed_articles(['a.md'])
+        first.add_failed_articles(['x.md'])
+        second.add_processed_articles(['b.md'])
+        second.clear_failed_articles(['x.md'])
+        
+        merged = StateManager(temp_dir)
+        assert merged.get_processed_articles() == {'a.md', 'b.md'}
+        # The second process's clear is replayed after the first process's add
+        assert merged.get_failed_articles() == set()
+    
+    def test_claims_split_work_between_workers(self, temp_dir):
+        """Test that articles leased by one worker are skipped by another"""
+        all_articles = [f'/path/to/article{i}.md' for i in range(4)]
+        
+        first = StateManager(temp_dir)
+        second = StateManager(temp_dir)
+        second.worker_id = 'other-host:1'
+        
+        first_batch = first.claim_articles(all_articles, limit=2)
+        second_batch = second.claim_articles(all_articles)
+        
+        assert first_batch == all_articles[:2]
+        assert second_batch == all_articles[2:]
+    
+    def test_claims_skip_articles_processed_elsewhere(self, temp_dir):
+        """Test that released articles processed by another worker are not reclaimed"""
+        all_articles = ['/path/to/article1.md', '/path/to/article2.md']
+        
+        first = StateManager(temp_dir)
+        second = StateManager(temp_dir)
+        second.worker_id = 'other-host:1'
+        second.get_processed_articles()
+        
+        first.claim_articles(all_articles, limit=1)
+        first.add_processed_articles(['article1.md'])
+        first.release_claims(['/path/to/article1.md'])
+        
+        assert second.claim_articles(all_articles) == ['/path/to/article2.md']
+    
+    def test_expired_claims_are_reclaimed(self, temp_dir):
+        """Test that leases from a crashed worker expire"""
+        crashed = StateManager(temp_dir, claim_ttl=-1)
+        crashed.worker_id = 'crashed-host:1'
+        crashed.claim_articles(['/path/to/article1.md'])
+        
+        state_manager = StateManager(temp_dir)
+        assert state_manager.claim_articles(['/path/to/article1.md']) == ['/path/to/article1.md']
+    
+    def test_legacy_processed_list_is_bucketed(self, temp_dir):
+        """Test that a flat processed list from older versions is still read"""
+        with open(os.path.join(temp_dir, 'processed_articles.json'), 'w') as f:
+            json.dump({'processed_articles': ['old.md'], 'last_updated': '2025-01-02T10:00:00'}, f)
+        
+        state_manager = StateManager(temp_dir)
+        assert state_manager.get_processed_articles() == {'old.md'}
+        
+        state_manager.add_processed_articles(['new.md'])
+        with open(state_manager.processed_file, 'r') as f:
+            data = json.load(f)
+        assert data['processed_articles']['2025-01-02'] == ['old.md']
+    
+    def test_compact_state_applies_retention(self, temp_dir):
+        """Test that compaction drops buckets older than the retention window"""
+        with open(os.path.join(temp_dir, 'processed_articles.json'), 'w') as f:
+            json.dump({'processed_articles': {
+                '2020-01-01': ['src-2020-01-01-ancient.md'],
+                datetime.now().strftime('%Y-%m-%d'): ['src-2025-09-19-recent.md']
+            }}, f)
+        
+        state_manager = StateManager(temp_dir, retention_days=30)
+        stats = state_manager.compact_state()
+        
+        assert stats['removed'] == 1
+        assert StateManager(temp_dir).get_processed_articles() == {'src-2025-09-19-recent.md'}
+        
+        # Articles older than the horizon are not resurrected as new work
+        to_process = state_manager.get_articles_to_process(['/path/to/src-2020-01-01-ancient.md'])
+        assert to_process == []
+        assert state_manager.skipped_compacted == 1
+    
+    def test_backfill_with_retention(self, temp_dir):
+        """Test that old-dated articles fetched after compaction are still processed"""
+        articles_dir = os.path.join(temp_dir, 'articles')
+        os.makedirs(articles_dir)
+        old_fetch = os.path.join(articles_dir, 'src-2020-01-01-stale.md')
+        backfilled = os.path.join(articles_dir, 'src-2020-01-02-backfilled.md')
+        for path in (old_fetch, backfilled):
+            with open(path, 'w') as f:
+                f.write('# Article')
+        old_time = (datetime.now() - timedelta(days=400)).timestamp()
+        os.utime(old_fetch, (old_time, old_time))
+        
+        state_manager = StateManager(temp_dir, retention_days=30)
+        
+        # Without any compaction nothing is skipped, however old its publication date
+        assert state_manager.get_articles_to_process([old_fetch, backfilled]) == [old_fetch, backfilled]
+        
+        with open(state_manager.processed_file, 'w') as f:
+            json.dump({'processed_articles': {'2020-01-01': ['src-2019-12-31-done.md']}}, f)
+        state_manager.refresh()
+        assert state_manager.compact_state()['removed'] == 1
+        
+        # A backfilled file is newer on disk than the compaction marker
+        reloaded = StateManager(temp_dir, retention_days=30)
+        assert reloaded.get_articles_to_process([old_fetch, backfilled]) == [backfilled]
+        assert reloaded.skipped_compacted == 1
+    
+    def test_bloom_prefilter(self, temp_dir):
+        """Test that the Bloom prefilter gives the same answers as the exact store"""
+        state_manager = StateManager(temp_dir, bloom_prefilter=True, bloom_capacity=1000)
+        state_manager.add_processed_articles(['processed1.md', 'failed1.md'])
+        state_manager.add_failed_articles(['failed1.md'])
+        
+        reloaded = StateManager(temp_dir, bloom_prefilter=True, bloom_capacity=1000)
+        to_process = reloaded.get_articles_to_process([
+            '/path/to/processed1.md',
+            '/path/to/failed1.md',
+            '/path/to/new1.md'
+        ])
+        
+        assert {os.path.basename(f) for f in to_process} == {'failed1.md', 'new1.md'}
+        assert 'processed1.md' in reloaded.bloom
+        assert os.path.exists(os.path.join(temp_dir, 'processed.bloom'))
+    
+    def test_bloom_prefilter_honors_backoff_and_dead_letters(self, temp_dir):
+        """Test that failed articles never seen as processed still wait out their backoff under the prefilter"""
+        policy = RetryPolicy(base_delay=3600, max_attempts=3)
+        state_manager = StateManager(temp_dir, bloom_prefilter=True, bloom_capacity=1000, retry_policy=policy)
+        for _ in range(2):
+            state_manager.add_failed_articles(['flaky.md'])
+        for _ in range(3):
+            state_manager.add_failed_articles(['broken.md'])
+        
+        reloaded = StateManager(temp_dir, bloom_prefilter=True, bloom_capacity=1000, retry_policy=policy)
+        assert reloaded.get_articles_to_process(['/path/to/flaky.md', '/path/to/broken.md', '/path/to/new.md']) \
+            == ['/path/to/new.md']
+    
+    def test_rebuilt_bloom_covers_filtered_failed_and_dead_letters(self, temp_dir):
+        """Test that a Bloom filter rebuilt by compaction or from scratch still holds back skipped articles"""
+        policy = RetryPolicy(base_delay=3600, max_attempts=2)
+        state_manager = StateManager(temp_dir, bloom_prefilter=True, bloom_capacity=1000, retry_policy=policy)
+        state_manager.add_filtered_articles({'sponsor.md': 0.5})
+        state_manager.add_failed_articles(['broken.md'])
+        state_manager.add_failed_articles(['broken.md'])
+        state_manager.compact_state()
+        paths = ['/path/to/sponsor.md', '/path/to/broken.md', '/path/to/new.md']
+        
+        assert StateManager(temp_dir, bloom_prefilter=True, retry_policy=policy).get_articles_to_process(paths) \
+            == ['/path/to/new.md']
+        
+        os.remove(os.path.join(temp_dir, 'processed.bloom'))
+        assert StateManager(temp_dir, bloom_prefilter=True, retry_policy=policy).get_articles_to_process(paths) \
+            == ['/path/to/new.md']
+    
+    def test_retry_backoff_schedule(self):
+        """Test exponential backoff with jitter and the delay cap"""
+        policy = RetryPolicy(base_delay=100, max_delay=1000, max_attempts=6)
+        
+        assert policy.delay(1, 0.5) == 0
+        assert policy.delay(2, 1.0) == 100
+        assert policy.delay(3, 1.0) == 200
+        assert policy.delay(3, 0.0) == 100
+        assert policy.delay(10, 1.0) == 1000
+    
+    def test_failed_articles_wait_for_retry(self, temp_dir):
+        """Test that repeatedly failing articles are held back until their retry is due"""
+        state_manager = StateManager(temp_dir, retry_policy=RetryPolicy(base_delay=3600))
+        state_manager.add_failed_articles(['flaky.md'], {'flaky.md': 'TimeoutError: slow'})
+        
+        # The first failure is retried straight away
+        assert state_manager.get_articles_to_process(['/path/to/flaky.md']) == ['/path/to/flaky.md']
+        
+        state_manager.add_failed_articles(['flaky.md'], {'flaky.md': 'TimeoutError: slow'})
+        assert state_manager.get_articles_to_process(['/path/to/flaky.md']) == []
+        
+        details = StateManager(temp_dir).get_failed_details()['flaky.md']
+        assert details['attempts'] == 2
+        assert details['last_error'] == 'TimeoutError: slow'
+        
+        with patch('state_manager.time.time', return_value=details['next_eligible']):
+            assert state_manager.get_articles_to_process(['/path/to/flaky.md']) == ['/path/to/flaky.md']
+    
+    def test_dead_letter_after_max_attempts(self, temp_dir):
+        """Test that articles are dead-lettered after exhausting retries and can be requeued"""
+        state_manager = StateManager(temp_dir, retry_policy=RetryPolicy(base_delay=0, max_attempts=3))
+        for _ in range(3):
+            state_manager.add_failed_articles(['broken.md'], {'broken.md': 'ValueError: bad'})
+        
+        assert state_manager.get_failed_articles() == set()
+        assert state_manager.get_dead_letter_articles()['broken.md']['attempts'] == 3
+        assert state_manager.get_articles_to_process(['/path/to/broken.md']) == []
+        
+        assert state_manager.requeue_dead_letter_articles() == ['broken.md']
+        reloaded = StateManager(temp_dir)
+        assert reloaded.get_dead_letter_articles() == {}
+        assert reloaded.get_failed_details()['broken.md']['attempts'] == 0
+        assert reloaded.get_articles_to_process(['/path/to/broken.md']) == ['/path/to/broken.md']
+    
+    def test_filtered_articles(self, temp_dir):
+        """Test that filtered articles are skipped until unfiltered"""
+        state_manager = StateManager(temp_dir, bloom_prefilter=True)
+        state_manager.add_filtered_articles({'sponsor.md': 0.5})
+        
+        reloaded = StateManager(temp_dir, bloom_prefilter=True)
+        assert reloaded.get_filtered_articles()['sponsor.md']['score'] == 0.5
+        assert reloaded.get_articles_to_process(['/path/to/sponsor.md', '/path/to/new.md']) == ['/path/to/new.md']
+        
+        assert reloaded.unfilter_articles() == ['sponsor.md']
+        assert StateManager(temp_dir).get_articles_to_process(['/path/to/sponsor.md']) == ['/path/to/sponsor.md']
+        assert StateManager(temp_dir).get_unfiltered_articles() == {'sponsor.md'}
+    
+    def test_legacy_failed_list_is_converted(self, temp_dir):
+        """Test that a pre-retry failed list is read as first failures"""
+        with open(os.path.join(temp_dir, 'processed_articles.json'), 'w') as f:
+            json.dump({'processed_articles': [], 'failed_articles': ['old.md']}, f)
+        
+        state_manager = StateManager(temp_dir)
+        
+        assert state_manager.get_failed_details()['old.md']['attempts'] == 1
+        assert state_manager.get_articles_to_process(['/path/to/old.md']) == ['/path/to/old.md']
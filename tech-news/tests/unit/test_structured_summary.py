@@ -0,0 +1,40 @@
+import pytest
+import os
+import sys
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from structured_summary import SUMMARY_SECTIONS, describe_schema, normalize_summary, parse_structured_summary
+
+class TestStructuredSummary:
+    
+    def test_parse_fenced_response(self):
+        """Test decoding a response wrapped in a code fence"""
+        summary = parse_structured_summary('```json\n{"tldr": " New model ", "insights": ["Faster", ""]}\n```')
+        
+        assert summary['tldr'] == 'New model'
+        assert summary['insights'] == ['Faster']
+        assert all(summary[field] == [] for field, _, _ in SUMMARY_SECTIONS if field != 'insights')
+    
+    def test_normalize_coerces_fields(self):
+        """Test that single strings become lists and non-string items are dropped"""
+        summary = normalize_summary({'tldr': 42, 'tools': 'vLLM', 'takeaways': ['Read the paper', None]})
+        
+        assert summary['tldr'] == ''
+        assert summary['tools'] == ['vLLM']
+        assert summary['takeaways'] == ['Read the paper']
+    
+    def test_unusable_responses(self):
+        """Test that prose, non-objects and empty objects are rejected"""
+        assert parse_structured_summary('## Key Technical Insights\n- Prose') is None
+        assert parse_structured_summary('["tldr"]') is None
+        assert parse_structured_summary('{"tldr": "", "insights": []}') is None
+    
+    def test_describe_schema(self):
+        """Test that the prompt text names every field"""
+        description = describe_schema(4)
+        
+        assert '"tldr"' in description
+        assert all(f'"{field}"' in description for field, _, _ in SUMMARY_SECTIONS)
+        assert 'at most 4' in description
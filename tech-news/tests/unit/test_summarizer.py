@@ -2,16 +2,19 @@ import pytest
 import os
 import tempfile
 import sys
+import re
+import threading
+import time
 from unittest.mock import Mock, patch
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
 
-from summarizer import GeminiSummarizer
+from summarizer import GeminiSummarizer, parse_batch_response
 
 class TestGeminiSummarizer:
     
-    @patch('summarizer.genai')
+    @patch('llm_backend.genai')
     def test_initialization(self, mock_genai, temp_dir, mock_gemini_config):
         """Test GeminiSummarizer initialization"""
         config_file = os.path.join(temp_dir, 'config.yaml')
@@ -96,7 +99,7 @@ class TestGeminiSummarizer:
         assert len(result) <= 100 + 50  # Allow some buffer for truncation message
         assert "[Content truncated...]" in result
     
-    @patch('summarizer.genai')
+    @patch('llm_backend.genai')
     def test_summarize_article(self, mock_genai, temp_dir, sample_article_metadata):
         """Test summarizing a single article"""
         from state_manager import StateManager
@@ -132,7 +135,7 @@ class TestGeminiSummarizer:
         # Verify the model was called
         mock_model.generate_content.assert_called_once()
     
-    @patch('summarizer.genai')
+    @patch('llm_backend.genai')
     def test_summarize_articles(self, mock_genai, temp_dir, sample_article_content):
         """Test summarizing multiple articles"""
         from state_manager import StateManager
@@ -176,3 +179,701 @@ class TestGeminiSummarizer:
         assert 'test-article-0.md' in processed
         assert 'test-article-1.md' in processed
         assert 'test-article-2.md' in processed
+    
+    @patch('llm_backend.genai')
+    def test_summarize_articles_reuses_near_duplicates(self, mock_genai, temp_dir, sample_article_content):
+        """Test that a cross-posted article reuses the earlier summary"""
+        from state_manager import StateManager
+        state_manager = StateManager(temp_dir)
+        
+        mock_model = Mock()
+        mock_response = Mock()
+        mock_response.text = "• Original summary"
+        mock_model.generate_content.return_value = mock_response
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000, 'near_duplicate_min_words': 20}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file, state_manager)
+        
+        # The same announcement cross-posted by two sources
+        header, body = sample_article_content.split('---')
+        article_files = []
+        for i, source in enumerate(['Latent Space', 'The Sequence']):
+            article_file = os.path.join(temp_dir, f'cross-post-{i}.md')
+            with open(article_file, 'w') as f:
+                f.write(header.replace('Test Source', source).replace('test-article', f'cross-post-{i}'))
+                f.write('---' + body * 4)
+            article_files.append(article_file)
+        
+        summaries = summarizer.summarize_articles(article_files)
+        
+        assert len(summaries) == 2
+        mock_model.generate_content.assert_called_once()
+        assert summaries[1]['summary'] == summaries[0]['summary']
+        assert summaries[1]['source'] == 'The Sequence'
+        assert summaries[1]['duplicate_of']['filename'] == 'cross-post-0.md'
+        assert state_manager.get_processed_articles() == {'cross-post-0.md', 'cross-post-1.md'}
+    
+    @patch('llm_backend.genai')
+    def test_near_duplicate_from_earlier_run_reuses_cached_summary(self, mock_genai, temp_dir, sample_article_content):
+        """Test that a cross-post in a later run gets the summary from the cache, not the fingerprint index"""
+        from state_manager import StateManager
+        state_manager = StateManager(temp_dir)
+        
+        mock_model = Mock()
+        mock_response = Mock()
+        mock_response.text = "• Original summary"
+        mock_model.generate_content.return_value = mock_response
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000, 'near_duplicate_min_words': 20}
+            }, f)
+        
+        header, body = sample_article_content.split('---')
+        article_files = []
+        for i, source in enumerate(['Latent Space', 'The Sequence']):
+            article_file = os.path.join(temp_dir, f'cross-post-{i}.md')
+            with open(article_file, 'w') as f:
+                f.write(header.replace('Test Source', source).replace('test-article', f'cross-post-{i}'))
+                f.write('---' + body * 4 + (' Thanks for reading!' if i else ''))
+            article_files.append(article_file)
+        
+        GeminiSummarizer(config_file, state_manager).summarize_articles(article_files[:1])
+        summaries = GeminiSummarizer(config_file, state_manager).summarize_articles(article_files[1:])
+        
+        mock_model.generate_content.assert_called_once()
+        assert summaries[0]['duplicate_of']['filename'] == 'cross-post-0.md'
+        assert summaries[0]['summary'] == '• Original summary'
+        with open(os.path.join(temp_dir, 'fingerprints.json')) as f:
+            assert 'summary' not in f.read()
+    
+    @patch('llm_backend.genai')
+    def test_summarize_articles_concurrently(self, mock_genai, temp_dir, sample_article_content):
+        """Test that articles are summarized in parallel with results kept in order"""
+        from state_manager import StateManager
+        state_manager = StateManager(temp_dir)
+        
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def generate_content(prompt, generation_config=None):
+            with lock:
+                active.append(prompt)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(prompt)
+            if 'Test Article 2' in prompt:
+                raise TimeoutError('deadline exceeded')
+            return Mock(text=f"Summary of {re.search(r'Article Title: (.+)', prompt).group(1)}")
+        
+        mock_model = Mock()
+        mock_model.generate_content.side_effect = generate_content
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000, 'max_concurrency': 4, 'model_retries': 0,
+                                  'requests_per_minute': 600, 'tokens_per_minute': 1000000}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file, state_manager)
+        
+        article_files = []
+        for i in range(6):
+            article_file = os.path.join(temp_dir, f'test-article-{i}.md')
+            with open(article_file, 'w') as f:
+                f.write(sample_article_content.replace('Test Article Title', f'Test Article {i}'))
+            article_files.append(article_file)
+        
+        summaries = summarizer.summarize_articles(article_files)
+        
+        assert max(peak) > 1
+        assert [s['title'] for s in summaries] == [f'Test Article {i}' for i in [0, 1, 3, 4, 5]]
+        assert all(s['summary'] == f"Summary of {s['title']}" for s in summaries)
+        assert len(state_manager.get_processed_articles()) == 5
+        failed = state_manager.get_failed_details()
+        assert set(failed) == {'test-article-2.md'}
+        assert failed['test-article-2.md']['last_error'] == 'TimeoutError: deadline exceeded'
+    
+    @patch('llm_backend.genai')
+    def test_wait_for_quota(self, mock_genai, temp_dir):
+        """Test that each request draws from the request and token budgets"""
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000,
+                                  'requests_per_minute': 10, 'tokens_per_minute': 1000}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file)
+        summarizer.wait_for_quota('x' * 400)
+        
+        assert summarizer.request_limiter.available == pytest.approx(9, abs=0.1)
+        assert summarizer.token_limiter.available == pytest.approx(900, abs=1)
+    
+    @patch('llm_backend.genai')
+    def test_summary_cache_skips_api_call(self, mock_genai, temp_dir, sample_article_metadata):
+        """Test that re-summarizing identical content is served from the cache"""
+        from state_manager import StateManager
+        
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text="• Cached summary")
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000}
+            }, f)
+        
+        first = GeminiSummarizer(config_file, StateManager(temp_dir))
+        first.summarize_article(sample_article_metadata)
+        
+        # Same content re-fetched under a new filename in a later run
+        second = GeminiSummarizer(config_file, StateManager(temp_dir))
+        result = second.summarize_article(dict(sample_article_metadata, filename='refetched.md'))
+        
+        assert result['summary'] == '• Cached summary'
+        assert result['filename'] == 'refetched.md'
+        mock_model.generate_content.assert_called_once()
+        assert second.summary_cache.stats()['hits'] == 1
+    
+    def test_parse_batch_response(self):
+        """Test splitting batched responses, including fenced and partial ones"""
+        assert parse_batch_response('{"1": "First", "2": "Second"}', 2) == {'1': 'First', '2': 'Second'}
+        assert parse_batch_response('```json\n{"1": "First"}\n```', 2) == {'1': 'First'}
+        assert parse_batch_response('{"1": "First", "7": "Extra", "2": ""}', 2) == {'1': 'First'}
+        assert parse_batch_response('Sorry, here are the analyses:', 2) == {}
+        assert parse_batch_response('["First", "Second"]', 2) == {}
+        
+        structured = parse_batch_response('{"1": {"tldr": "First", "tools": "vLLM"}, "2": {"tldr": ""}}', 2)
+        assert list(structured) == ['1']
+        assert structured['1']['tldr'] == 'First'
+        assert structured['1']['tools'] == ['vLLM']
+    
+    @patch('llm_backend.genai')
+    def test_short_articles_are_batched(self, mock_genai, temp_dir, sample_article_content):
+        """Test that short articles share a request and fall back individually on a bad response"""
+        from state_manager import StateManager
+        
+        def generate_content(prompt, generation_config=None):
+            if '=== Article' in prompt:
+                return Mock(text=batch_response)
+            return Mock(text='Individual summary')
+        
+        mock_model = Mock()
+        mock_model.generate_content.side_effect = generate_content
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000, 'batch_max_words': 400,
+                                  'batch_max_articles': 3, 'summary_cache_max_mb': 10}
+            }, f)
+        
+        article_files = []
+        for i in range(3):
+            article_file = os.path.join(temp_dir, f'short-{i}.md')
+            with open(article_file, 'w') as f:
+                f.write(sample_article_content.replace('Test Article Title', f'Short {i}') + f'\nUnique note {i}.\n')
+            article_files.append(article_file)
+        
+        batch_response = '```json\n{"1": "Batch summary 1", "2": "Batch summary 2", "3": "Batch summary 3"}\n```'
+        summarizer = GeminiSummarizer(config_file, StateManager(os.path.join(temp_dir, 'a')))
+        summaries = summarizer.summarize_articles(article_files)
+        
+        assert mock_model.generate_content.call_count == 1
+        assert [s['summary'] for s in summaries] == ['Batch summary 1', 'Batch summary 2', 'Batch summary 3']
+        
+        # Only the first article survives a truncated response; the rest get their own requests
+        mock_model.generate_content.reset_mock()
+        batch_response = '{"1": "Batch summary 1"}'
+        summarizer = GeminiSummarizer(config_file, StateManager(os.path.join(temp_dir, 'b')))
+        summaries = summarizer.summarize_articles(article_files)
+        
+        assert mock_model.generate_content.call_count == 3
+        assert [s['summary'] for s in summaries] == ['Batch summary 1', 'Individual summary', 'Individual summary']
+        # The individual fallback reuses the batch's cache lookup instead of missing twice
+        assert summarizer.summary_cache.misses == 3
+    
+    @patch('llm_backend.genai')
+    def test_long_articles_are_map_reduced(self, mock_genai, temp_dir, sample_article_metadata):
+        """Test that oversized articles are summarized in sections and merged without truncation"""
+        prompts = []
+        
+        def generate_content(prompt, generation_config=None):
+            prompts.append(prompt)
+            section = re.search(r'Section \d+ of', prompt)
+            if 'Section Notes:' in prompt:
+                return Mock(text=f"Notes on {section.group(0)}")
+            return Mock(text='Merged analysis')
+        
+        mock_model = Mock()
+        mock_model.generate_content.side_effect = generate_content
+        mock_model.count_tokens.side_effect = RuntimeError('offline')
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 1000, 'max_article_tokens': 500,
+                                  'max_sections': 4, 'max_concurrency': 2}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file)
+        paragraphs = [f'Paragraph {i} ' + 'detail ' * 60 for i in range(20)]
+        article = dict(sample_article_metadata, content='\n\n'.join(paragraphs) + '\n\nThe final word.')
+        result = summarizer.summarize_article(article)
+        
+        assert result['summary'] == 'Merged analysis'
+        section_prompts = [p for p in prompts if 'Section Notes:' in p]
+        assert 1 < len(section_prompts) <= 5
+        assert any('The final word.' in p for p in section_prompts)
+        assert all(f'Notes on Section {i} of' in prompts[-1] for i in range(1, len(section_prompts) + 1))
+    
+    @patch('llm_backend.genai')
+    def test_streaming_reports_each_summary(self, mock_genai, temp_dir, sample_article_content):
+        """Test that streamed responses are joined and each summary is handed over as it completes"""
+        mock_model = Mock()
+        mock_model.generate_content.side_effect = lambda prompt, stream=False, generation_config=None: [
+            Mock(text='• Streamed '), Mock(text='summary')
+        ]
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000, 'stream': True, 'max_concurrency': 2}
+            }, f)
+        
+        article_files = []
+        for i in range(3):
+            article_file = os.path.join(temp_dir, f'test-article-{i}.md')
+            with open(article_file, 'w') as f:
+                f.write(sample_article_content.replace('Test Article Title', f'Test Article {i}'))
+            article_files.append(article_file)
+        
+        delivered = []
+        summaries = GeminiSummarizer(config_file).summarize_articles(article_files, on_summary=delivered.append)
+        
+        assert all(call.kwargs['stream'] is True for call in mock_model.generate_content.call_args_list)
+        assert [s['summary'] for s in summaries] == ['• Streamed summary'] * 3
+        assert sorted(s['title'] for s in delivered) == [s['title'] for s in summaries]
+    
+    @patch('llm_backend.genai')
+    def test_throttled_articles_are_deferred(self, mock_genai, temp_dir, sample_article_content):
+        """Test that articles skipped by an open circuit are not marked as failed"""
+        from state_manager import StateManager
+        from model_policy import CircuitOpenError
+        state_manager = StateManager(temp_dir)
+        
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text='Summary')
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000}
+            }, f)
+        
+        article_file = os.path.join(temp_dir, 'test-article.md')
+        with open(article_file, 'w') as f:
+            f.write(sample_article_content)
+        
+        summarizer = GeminiSummarizer(config_file, state_manager)
+        with patch.object(summarizer.call_policy.breaker, 'before_call', side_effect=CircuitOpenError('throttled')):
+            summaries = summarizer.summarize_articles([article_file])
+        
+        assert summaries == []
+        mock_model.generate_content.assert_not_called()
+        assert state_manager.get_failed_articles() == set()
+        assert state_manager.get_processed_articles() == set()
+    
+    @patch('model_policy.time.sleep')
+    @patch('llm_backend.genai')
+    def test_quota_exhausted_articles_are_deferred(self, mock_genai, mock_sleep, temp_dir, sample_article_content):
+        """Test that an article still over quota after its retries is deferred rather than failed"""
+        from state_manager import StateManager
+        state_manager = StateManager(temp_dir)
+        
+        class ResourceExhausted(Exception):
+            code = 429
+        
+        mock_model = Mock()
+        mock_model.generate_content.side_effect = ResourceExhausted('quota exceeded')
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000, 'model_retries': 2}
+            }, f)
+        
+        article_file = os.path.join(temp_dir, 'test-article.md')
+        with open(article_file, 'w') as f:
+            f.write(sample_article_content)
+        
+        summarizer = GeminiSummarizer(config_file, state_manager)
+        summaries = summarizer.summarize_articles([article_file])
+        
+        assert summaries == []
+        assert mock_model.generate_content.call_count == 3
+        assert state_manager.get_failed_articles() == set()
+        assert state_manager.get_articles_to_process([article_file]) == [article_file]
+    
+    @patch('llm_backend.genai')
+    def test_boilerplate_is_stripped_before_prompting(self, mock_genai, temp_dir, sample_article_content):
+        """Test that subscribe prompts never reach the model and the savings are counted"""
+        mock_model = Mock()
+        mock_model.generate_content.return_value = Mock(text='Summary')
+        mock_genai.GenerativeModel.return_value = mock_model
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test'},
+                'summarization': {'max_article_length': 50000}
+            }, f)
+        
+        article_file = os.path.join(temp_dir, 'test-article.md')
+        with open(article_file, 'w') as f:
+            f.write(sample_article_content + "\nSubscribe\nShare\nLeave a comment\n" * 20)
+        
+        summarizer = GeminiSummarizer(config_file)
+        summaries = summarizer.summarize_articles([article_file])
+        
+        assert len(summaries) == 1
+        prompt = mock_model.generate_content.call_args.args[0]
+        assert 'frameworks and methodologies' in prompt
+        assert 'Subscribe' not in prompt.split('Article Content:')[1]
+        assert summarizer.tokens_saved > 0
+    
+    def test_instructions_sent_as_system_instruction(self, temp_dir, sample_article_metadata):
+        """Test that the fixed instructions are kept out of the per-article prompt"""
+        from summarizer import STRUCTURED_INSTRUCTIONS
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub'},
+                'summarization': {'max_article_length': 50000}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file)
+        with patch.object(summarizer.backend, 'generate', return_value='Summary') as mock_generate:
+            result = summarizer.summarize_article(sample_article_metadata)
+        
+        assert result['summary'] == 'Summary'
+        prompt = mock_generate.call_args.args[0]
+        assert mock_generate.call_args.kwargs['system'] == STRUCTURED_INSTRUCTIONS
+        assert STRUCTURED_INSTRUCTIONS not in prompt
+        assert sample_article_metadata['title'] in prompt
+    
+    def test_model_calls_are_recorded(self, temp_dir, sample_article_metadata):
+        """Test that calls and cache hits land in the run telemetry"""
+        from state_manager import StateManager
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub'},
+                'pricing': {'stub': {'input_per_million': 1.0}},
+                'summarization': {'max_article_length': 50000}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file, StateManager(temp_dir))
+        summarizer.summarize_article(sample_article_metadata)
+        summarizer.summarize_article(sample_article_metadata)
+        
+        summary = summarizer.telemetry.summary()
+        source = summary['by_source'][sample_article_metadata['source']]
+        assert source['calls'] == 1
+        assert source['cache_hits'] == 1
+        assert source['input_tokens'] > 0
+        assert source['output_tokens'] > 0
+        assert summary['totals']['cost_usd'] > 0
+    
+    def test_budget_defers_remaining_articles(self, temp_dir, sample_article_content):
+        """Test that articles beyond the token budget stay queued instead of failing"""
+        from state_manager import StateManager
+        from run_budget import RunBudget
+        state_manager = StateManager(temp_dir)
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub'},
+                'summarization': {'max_article_length': 50000, 'max_concurrency': 1}
+            }, f)
+        
+        article_files = []
+        for i in range(3):
+            article_file = os.path.join(temp_dir, f'test-article-{i}.md')
+            with open(article_file, 'w') as f:
+                f.write(sample_article_content.replace('Test Article Title', f'Test Article {i}')
+                        .replace('test article', f'test article number {i} of three'))
+            article_files.append(article_file)
+        
+        # Enough for roughly one prompt and its response
+        budget = RunBudget(token_budget=700)
+        summarizer = GeminiSummarizer(config_file, state_manager, budget=budget)
+        summaries = summarizer.summarize_articles(article_files)
+        
+        assert len(summaries) == 1
+        assert summarizer.backend.calls == 1
+        assert budget.exhausted
+        assert state_manager.get_failed_articles() == set()
+        assert len(state_manager.get_articles_to_process(article_files)) == 2
+    
+    def test_off_topic_articles_are_filtered(self, temp_dir, sample_article_content):
+        """Test that articles below the relevance threshold skip the model and are recorded"""
+        from state_manager import StateManager
+        state_manager = StateManager(temp_dir)
+        
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub'},
+                'relevance': {'enabled': True, 'threshold': 2.0},
+                'summarization': {'max_article_length': 50000}
+            }, f)
+        
+        relevant_file = os.path.join(temp_dir, 'test-article.md')
+        with open(relevant_file, 'w') as f:
+            f.write(sample_article_content)
+        hiring_file = os.path.join(temp_dir, 'hiring.md')
+        with open(hiring_file, 'w') as f:
+            f.write("# We're hiring\n\n**Source:** Test Source\n\n---\n\nJob openings in our office. Apply now!\n")
+        
+        summarizer = GeminiSummarizer(config_file, state_manager)
+        summaries = summarizer.summarize_articles([relevant_file, hiring_file])
+        
+        assert [summary['filename'] for summary in summaries] == ['test-article.md']
+        assert summarizer.backend.calls == 1
+        assert summarizer.filtered_count == 1
+        assert set(state_manager.get_filtered_articles()) == {'hiring.md'}
+        assert state_manager.get_articles_to_process([hiring_file]) == []
+        
+        # Once unfiltered, the article reaches the model instead of being filtered again
+        assert state_manager.unfilter_articles() == ['hiring.md']
+        summarizer = GeminiSummarizer(config_file, state_manager)
+        summaries = summarizer.summarize_articles(state_manager.get_articles_to_process([hiring_file]))
+        
+        assert [summary['filename'] for summary in summaries] == ['hiring.md']
+        assert summarizer.backend.calls == 1
+        assert summarizer.filtered_count == 0
+        assert state_manager.get_filtered_articles() == {}
+    
+    def test_articles_are_routed_by_length_and_source(self, temp_dir, sample_article_metadata):
+        """Test that routing rules pick the model and output budget, and the route is recorded"""
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub', 'model': 'stub-default'},
+                'routing': [
+                    {'name': 'flagship', 'sources': ['Flagship Source'], 'model': 'stub-large'},
+                    {'name': 'short', 'max_tokens': 1000, 'model': 'stub-small', 'max_output_tokens': 300}
+                ],
+                'summarization': {'max_article_length': 50000}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file)
+        
+        short = summarizer.summarize_article(sample_article_metadata)
+        assert (short['route'], short['model']) == ('short', 'stub-small')
+        assert summarizer.route_backends['short'].calls == 1
+        assert summarizer.backend.calls == 0
+        
+        flagship = summarizer.summarize_article(dict(sample_article_metadata, source='Flagship Source'))
+        assert (flagship['route'], flagship['model']) == ('flagship', 'stub-large')
+        
+        long_article = dict(sample_article_metadata, content='word ' * 2000)
+        long_summary = summarizer.summarize_article(long_article)
+        assert (long_summary['route'], long_summary['model']) == ('default', 'stub-default')
+        assert summarizer.backend.calls == 1
+        
+        with patch.object(summarizer.route_backends['short'], 'generate', return_value='Summary') as mock_generate:
+            summarizer.summarize_article(dict(sample_article_metadata, title='Another title'))
+        assert mock_generate.call_args.kwargs['max_output_tokens'] == 300
+    
+    def test_structured_summary_with_generation_config(self, temp_dir, sample_article_metadata):
+        """Test that summaries come back as structured fields under the configured output cap and temperature"""
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'gemini': {'api_key': 'test', 'model': 'test', 'max_tokens': 2048, 'temperature': 0.3},
+                'llm': {'backend': 'stub'},
+                'summarization': {'max_article_length': 50000, 'max_output_tokens': 800}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file)
+        with patch.object(summarizer.backend, 'generate', wraps=summarizer.backend.generate) as mock_generate:
+            result = summarizer.summarize_article(sample_article_metadata)
+        
+        assert mock_generate.call_args.kwargs['max_output_tokens'] == 800
+        assert mock_generate.call_args.kwargs['temperature'] == 0.3
+        assert mock_generate.call_args.kwargs['json_output'] is True
+        assert result['structured']['tldr'].startswith(f"Stub analysis of {sample_article_metadata['title']}")
+        assert result['summary'] == result['structured']['tldr']
+        
+        # Batches get the per-article cap for each article, within gemini.max_tokens
+        assert summarizer.output_token_cap(outputs=2) == 1600
+        assert summarizer.output_token_cap(outputs=5) == 2048
+        
+        with patch.object(summarizer.backend, 'generate', return_value='Free-form analysis'):
+            fallback = summarizer.summarize_article(dict(sample_article_metadata, title='Another title'))
+        assert fallback['summary'] == 'Free-form analysis'
+        assert 'structured' not in fallback
+    
+    def test_long_articles_are_condensed(self, temp_dir, sample_article_content):
+        """Test that articles over extractive_max_tokens reach the model as their most central sentences"""
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub'},
+                'summarization': {'max_article_length': 50000, 'extractive_max_tokens': 200}
+            }, f)
+        
+        paragraphs = [f'Sparse attention cut inference latency in benchmark run {i} on long-context models.' for i in range(100)]
+        paragraphs.insert(50, 'Our office dog is called Biscuit.')
+        article_file = os.path.join(temp_dir, 'long-article.md')
+        with open(article_file, 'w') as f:
+            f.write(sample_article_content.split('---')[0] + '---\n\n' + '\n\n'.join(paragraphs))
+        
+        summarizer = GeminiSummarizer(config_file)
+        with patch.object(summarizer.backend, 'generate', wraps=summarizer.backend.generate) as mock_generate:
+            summaries = summarizer.summarize_articles([article_file])
+        
+        content = mock_generate.call_args.args[0].split('Article Content:')[1]
+        assert len(summaries) == 1
+        assert summarizer.token_estimator.estimate(content) <= 220
+        assert 'Biscuit' not in content
+        assert summarizer.condensed_count == 1
+        assert summarizer.tokens_condensed > 1000
+    
+    def test_example_config_map_reduces_long_articles_without_condensing(self, temp_dir, sample_article_content):
+        """Test that with the shipped config a 20k-token article is summarized in sections, not cut down"""
+        import yaml
+        example = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'gemini.yaml.example')
+        with open(example) as f:
+            config = yaml.safe_load(f)
+        config['llm'] = {'backend': 'stub'}
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        with open(config_file, 'w') as f:
+            yaml.dump(config, f)
+        
+        paragraphs = [f'Paragraph {i}: the new LLM inference stack cut model latency on GPU clusters '
+                      + 'while agents kept their benchmark accuracy. ' * 10 for i in range(160)]
+        article_file = os.path.join(temp_dir, 'long-article.md')
+        with open(article_file, 'w') as f:
+            f.write(sample_article_content.split('---')[0] + '---\n\n' + '\n\n'.join(paragraphs) + '\n\nThe final word.')
+        
+        summarizer = GeminiSummarizer(config_file)
+        assert 15000 < summarizer.token_estimator.estimate('\n\n'.join(paragraphs)) < 30000
+        with patch.object(summarizer.backend, 'generate', wraps=summarizer.backend.generate) as mock_generate:
+            summaries = summarizer.summarize_articles([article_file])
+        
+        section_prompts = [call.args[0] for call in mock_generate.call_args_list if 'Section Notes:' in call.args[0]]
+        assert len(summaries) == 1
+        assert summarizer.condensed_count == 0
+        assert len(section_prompts) >= 2
+        assert any('The final word.' in prompt for prompt in section_prompts)
+    
+    def test_character_cap_keeps_central_sentences(self, temp_dir):
+        """Test that the character cap no longer keeps just the beginning of the article"""
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({'llm': {'backend': 'stub'}, 'summarization': {'max_article_length': 400}}, f)
+        
+        intro = 'Welcome back to the newsletter. Thanks to everyone who wrote in last week.'
+        body = ' '.join(f'Quantized models served with speculative decoding in test {i}.' for i in range(30))
+        prepared = GeminiSummarizer(config_file).prepare_content(intro + '\n\n' + body)
+        
+        assert len(prepared) <= 400
+        assert 'Welcome back' not in prepared
+        assert 'speculative decoding' in prepared
+        assert '[Content truncated...]' not in prepared
+    
+    def test_key_pool_moves_throttled_requests_to_another_key(self, temp_dir, sample_article_metadata):
+        """Test that a throttled key leaves the rotation and its request is served by another key"""
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub', 'api_keys': ['key-a', 'key-b']},
+                'summarization': {'max_article_length': 50000, 'requests_per_minute': 10}
+            }, f)
+        
+        class TooManyRequests(Exception):
+            pass
+        
+        summarizer = GeminiSummarizer(config_file)
+        throttled = summarizer.backend_for(None, summarizer.key_pool.keys[0])
+        with patch.object(throttled, 'generate', side_effect=TooManyRequests('retry in 30s')):
+            result = summarizer.summarize_article(sample_article_metadata)
+            second = summarizer.summarize_article(dict(sample_article_metadata, title='Another title'))
+        
+        assert result is not None and second is not None
+        stats = summarizer.key_pool.stats()
+        assert (stats['key-1']['requests'], stats['key-1']['throttled']) == (1, 1)
+        assert stats['key-2']['requests'] == 2
+        assert summarizer.route_backends[('default', 'key-2')].calls == 2
+        # Pooled requests are limited per key, not by the global limiter
+        assert summarizer.request_limiter.available == pytest.approx(10, abs=0.1)
+    
+    def test_global_rate_limits_apply_to_routes_outside_the_key_pool(self, temp_dir, sample_article_metadata):
+        """Test that a route with its own llm section is throttled by the global limits when keys are pooled"""
+        config_file = os.path.join(temp_dir, 'config.yaml')
+        import yaml
+        with open(config_file, 'w') as f:
+            yaml.dump({
+                'llm': {'backend': 'stub', 'api_keys': ['key-a', 'key-b']},
+                'routing': [{'name': 'local', 'model': 'local', 'llm': {'backend': 'stub'}}],
+                'summarization': {'max_article_length': 50000, 'requests_per_minute': 10}
+            }, f)
+        
+        summarizer = GeminiSummarizer(config_file)
+        assert summarizer.summarize_article(sample_article_metadata) is not None
+        
+        assert summarizer.request_limiter.available == pytest.approx(9, abs=0.1)
+        assert all(stats['requests'] == 0 for stats in summarizer.key_pool.stats().values())
@@ -0,0 +1,52 @@
+import pytest
+import os
+import sys
+import time
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from summary_cache import SummaryCache
+
+class TestSummaryCache:
+    
+    def test_key_depends_on_content_prompt_and_model(self):
+        """Test that changing any key component changes the key"""
+        base = SummaryCache.key('content', 1, 'gemini-1.5-flash')
+        
+        assert base == SummaryCache.key('content', 1, 'gemini-1.5-flash')
+        assert base != SummaryCache.key('content!', 1, 'gemini-1.5-flash')
+        assert base != SummaryCache.key('content', 2, 'gemini-1.5-flash')
+        assert base != SummaryCache.key('content', 1, 'gemini-1.5-pro')
+    
+    def test_hits_and_misses(self, temp_dir):
+        """Test lookups, persistence and hit-rate stats"""
+        cache = SummaryCache(temp_dir)
+        key = SummaryCache.key('content', 1, 'model')
+        
+        assert cache.get(key) is None
+        cache.put(key, 'A summary')
+        assert SummaryCache(temp_dir).get(key) == 'A summary'
+        assert cache.get(key) == 'A summary'
+        
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+    
+    def test_evicts_least_recently_used(self, temp_dir):
+        """Test that eviction drops the stalest entries once over the size limit"""
+        cache = SummaryCache(temp_dir, max_bytes=2500)
+        keys = [SummaryCache.key(str(i), 1, 'model') for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.put(key, 'x' * 1000)
+            os.utime(cache._path(key), (time.time() - 100 + i, time.time() - 100 + i))
+        
+        # Reading the oldest entry makes it the most recently used
+        cache.get(keys[0])
+        removed = cache.evict()
+        
+        assert removed == 1
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
@@ -0,0 +1,86 @@
+import pytest
+import os
+import sys
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from summary_journal import SummaryJournal
+
+def summary(filename, text='Summary'):
+    return {'title': filename, 'source': 'Test Source', 'date': '2025-09-19 10:00',
+            'url': f'https://example.com/{filename}', 'summary': text, 'filename': filename}
+
+class TestSummaryJournal:
+    
+    def test_append_and_read(self, temp_dir):
+        """Test that summaries are readable before close, the latest entry per article winning"""
+        journal = SummaryJournal(temp_dir)
+        journal.append(summary('a.md', 'First try'))
+        journal.append(summary('b.md'))
+        journal.append(summary('a.md', 'Second try'))
+        
+        entries = {entry['filename']: entry['summary'] for entry in SummaryJournal(temp_dir).entries()}
+        
+        assert entries == {'a.md': 'Second try', 'b.md': 'Summary'}
+        journal.close()
+    
+    def test_run_date_is_kept_past_midnight(self, temp_dir):
+        """Test that a journal pinned to the run's start date keeps every summary in that day's file"""
+        journal = SummaryJournal(temp_dir, date='2025-09-19')
+        journal.append(summary('before.md'))
+        with patch('summary_journal.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2025, 9, 20, 0, 30)
+            journal.append(summary('after.md'))
+        journal.close()
+        
+        assert journal.dates() == ['2025-09-19']
+        assert {entry['filename'] for entry in journal.entries()} == {'before.md', 'after.md'}
+    
+    def test_fsync_is_batched(self, temp_dir):
+        """Test that fsync runs once per fsync_every summaries and on close"""
+        journal = SummaryJournal(temp_dir, fsync_every=3, fsync_interval=3600)
+        with patch('summary_journal.os.fsync') as mock_fsync:
+            for i in range(7):
+                journal.append(summary(f'{i}.md'))
+            assert mock_fsync.call_count == 2
+            journal.close()
+            assert mock_fsync.call_count == 3
+    
+    def test_torn_last_line_is_skipped(self, temp_dir):
+        """Test that a write cut short by a crash does not hide the rest of the journal"""
+        journal = SummaryJournal(temp_dir)
+        journal.append(summary('a.md'))
+        journal.close()
+        with open(journal.path(), 'a') as f:
+            f.write('{"title": "Half writ')
+        
+        assert [entry['filename'] for entry in journal.entries()] == ['a.md']
+    
+    def test_recover_unrecorded_summaries(self, temp_dir):
+        """Test that summaries missing from state are recovered, and earlier days move to today's journal"""
+        journal = SummaryJournal(temp_dir)
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        with open(journal.path(yesterday), 'w') as f:
+            f.write('{"filename": "old.md", "url": "https://example.com/old", "summary": "Old"}\n')
+        journal.append(summary('done.md'))
+        journal.append(summary('lost.md'))
+        
+        recovered = journal.recover({'done.md'})
+        
+        assert sorted(entry['filename'] for entry in recovered) == ['lost.md', 'old.md']
+        assert sorted(entry['filename'] for entry in journal.entries()) == ['done.md', 'lost.md', 'old.md']
+        journal.close()
+    
+    def test_prune_old_journals(self, temp_dir):
+        """Test that journals past retention_days are removed"""
+        journal = SummaryJournal(temp_dir, retention_days=7)
+        old = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        open(journal.path(old), 'w').close()
+        journal.append(summary('a.md'))
+        
+        assert journal.prune() == 1
+        assert journal.dates() == [datetime.now().strftime('%Y-%m-%d')]
+        journal.close()
@@ -0,0 +1,74 @@
+import pytest
+import json
+import os
+import sys
+import time
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from telemetry import RunTelemetry
+
+class TestRunTelemetry:
+    
+    def make_telemetry(self):
+        telemetry = RunTelemetry({'flash': {'input_per_million': 1.0, 'output_per_million': 4.0}})
+        telemetry.record('summarize', 'article', 'flash', 'Source A', input_tokens=1000, output_tokens=500, latency=2.0)
+        telemetry.record('summarize', 'article', 'flash', 'Source A', input_tokens=2000, output_tokens=500,
+                         latency=4.0, retries=2)
+        telemetry.record('summarize', 'article', 'flash', 'Source B', cache_hit=True)
+        telemetry.record('summarize', 'batch', 'flash', 'Source B', input_tokens=500, latency=1.0, ok=False,
+                         error='TimeoutError')
+        return telemetry
+    
+    def test_rollups(self):
+        """Test totals and per-source rollups, with cache hits not counted as calls"""
+        summary = self.make_telemetry().summary()
+        
+        totals = summary['totals']
+        assert totals['calls'] == 3
+        assert totals['cache_hits'] == 1
+        assert totals['failures'] == 1
+        assert totals['retries'] == 2
+        assert totals['input_tokens'] == 3500
+        assert totals['output_tokens'] == 1000
+        assert totals['cost_usd'] == pytest.approx((3500 * 1.0 + 1000 * 4.0) / 1_000_000)
+        assert totals['latency_p95_seconds'] == 4.0
+        
+        assert summary['by_source']['Source A']['calls'] == 2
+        assert summary['by_source']['Source B']['cache_hits'] == 1
+        assert summary['by_kind']['batch']['failures'] == 1
+        assert len(summary['calls']) == 4
+    
+    def test_write_report_and_metrics(self, temp_dir):
+        """Test writing the JSON run report and the Prometheus textfile"""
+        report_path = self.make_telemetry().write(temp_dir)
+        
+        with open(report_path) as f:
+            assert json.load(f)['totals']['calls'] == 3
+        
+        with open(os.path.join(temp_dir, 'llm_metrics.prom')) as f:
+            metrics = f.read()
+        assert '# TYPE technews_llm_last_run_calls gauge' in metrics
+        assert 'technews_llm_last_run_calls{source="Source A",model="flash"} 2' in metrics
+        assert 'technews_llm_last_run_input_tokens{source="Source B",model="flash"} 500' in metrics
+    
+    def test_old_reports_are_pruned(self, temp_dir):
+        """Test that reports past the retention window are removed when a new one is written"""
+        reports_dir = os.path.join(temp_dir, 'run_reports')
+        os.makedirs(reports_dir)
+        old_report = os.path.join(reports_dir, 'run_2020-01-01_00-00-00.json')
+        recent_report = os.path.join(reports_dir, 'run_2099-01-01_00-00-00.json')
+        for path in (old_report, recent_report):
+            with open(path, 'w') as f:
+                f.write('{}')
+        os.utime(old_report, (time.time() - 40 * 86400,) * 2)
+        
+        report_path = self.make_telemetry().write(temp_dir, retention_days=30)
+        
+        assert sorted(os.listdir(reports_dir)) == sorted([os.path.basename(recent_report), os.path.basename(report_path)])
+    
+    def test_nothing_written_without_calls(self, temp_dir):
+        """Test that runs without model calls leave no report behind"""
+        assert RunTelemetry().write(temp_dir) is None
+        assert not os.path.exists(os.path.join(temp_dir, 'llm_metrics.prom'))
@@ -0,0 +1,58 @@
+import pytest
+import os
+import re
+import sys
+from unittest.mock import Mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from token_budget import TokenEstimator, split_into_chunks
+
+class TestTokenEstimator:
+    
+    def test_default_ratio(self):
+        """Test the fallback of four characters per token"""
+        estimator = TokenEstimator('model')
+        assert estimator.estimate('x' * 400) == 100
+        assert estimator.estimate('') == 0
+    
+    def test_calibrates_once_and_caches(self, temp_dir):
+        """Test that the tokenizer is consulted once per model and the ratio persisted"""
+        count_tokens = Mock(side_effect=lambda text: len(text) // 3)
+        estimator = TokenEstimator('model', count_tokens=count_tokens, state_dir=temp_dir)
+        
+        assert estimator.estimate('x' * 30) == 8  # too short to calibrate on
+        assert estimator.estimate('x' * 3000) == 1000
+        assert estimator.estimate('y' * 6000) == 2000
+        count_tokens.assert_called_once()
+        
+        reloaded = TokenEstimator('model', count_tokens=Mock(), state_dir=temp_dir)
+        assert reloaded.estimate('x' * 3000) == 1000
+        reloaded.count_tokens.assert_not_called()
+    
+    def test_calibration_failure_falls_back(self, temp_dir):
+        """Test that a failing tokenizer call leaves the default ratio in place"""
+        estimator = TokenEstimator('model', count_tokens=Mock(side_effect=RuntimeError('offline')), state_dir=temp_dir)
+        
+        assert estimator.estimate('x' * 4000) == 1000
+        assert not os.path.exists(os.path.join(temp_dir, 'token_calibration.json'))
+
+class TestSplitIntoChunks:
+    
+    def test_chunks_respect_budget_and_keep_all_content(self):
+        """Test that chunks fit the budget and nothing is dropped"""
+        paragraphs = [f'Paragraph {i}. ' + 'word ' * 30 for i in range(20)]
+        paragraphs.append('Run-on sentence ' * 100)
+        text = '\n\n'.join(paragraphs)
+        estimator = TokenEstimator('model')
+        
+        chunks = split_into_chunks(text, 100, estimator)
+        
+        assert len(chunks) > 1
+        assert all(estimator.estimate(chunk) <= 100 for chunk in chunks)
+        assert re.sub(r'\s+', '', ''.join(chunks)) == re.sub(r'\s+', '', text)
+    
+    def test_short_text_is_one_chunk(self):
+        """Test that text within budget is left intact"""
+        assert split_into_chunks('Short.\n\nText.', 100, TokenEstimator('model')) == ['Short.\n\nText.']